@@ -0,0 +1,105 @@
+"""Time signing one event for every subscription it fans out to.
+
+For each ``--payload-bytes`` size, an event is signed for ``--subscriptions``
+subscriptions, each with its own secret. Every run covers the worker's whole
+"sign" stage: the signature plus the rendered envelope. Three runs are compared:
+
+- ``per_call`` reproduces the original code, an ``hmac.new`` then
+  ``render_envelope``. It keys a fresh HMAC for every delivery and signs a new
+  ``{timestamp}.{payload}`` string.
+- ``cached`` signs from the subscription's cached signer, straight out of the
+  cached envelope.
+- ``cached_rotating`` does the same while every subscription is in a secret
+  rotation, so each delivery carries two signatures.
+
+``us_per_delivery`` is the mean time per subscription. No database is needed.
+
+    python benchmarks/bench_signing.py --payload-bytes 256 65536 1048576 --subscriptions 1000
+"""
+
+import argparse
+import hashlib
+import hmac
+import json
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from integrations_hub.models.tables import EventType, OutboxEvent, WebhookSubscription
+from integrations_hub.services.envelope import render_envelope, render_signed_envelope
+from integrations_hub.services.signing import signer_for
+
+TIMESTAMP = 1_700_000_000
+
+
+def per_call(event: OutboxEvent, subscriptions: list[WebhookSubscription]) -> None:
+    for sub in subscriptions:
+        message = f"{TIMESTAMP}.{event.payload}".encode()
+        hmac.new(sub.secret.encode(), message, hashlib.sha256).hexdigest()
+        render_envelope(event, TIMESTAMP)
+
+
+def cached(event: OutboxEvent, subscriptions: list[WebhookSubscription]) -> None:
+    for sub in subscriptions:
+        render_signed_envelope(event, TIMESTAMP, signer_for(sub))
+
+
+def make_subscriptions(count: int, rotating: bool) -> list[WebhookSubscription]:
+    expires_at = datetime.now(timezone.utc) + timedelta(days=1)
+    return [
+        WebhookSubscription(
+            id=uuid.uuid4(),
+            secret=f"secret-{n:06d}-{uuid.uuid4().hex}",
+            secret_version=2 if rotating else 1,
+            previous_secret=f"previous-{n:06d}-{uuid.uuid4().hex}" if rotating else None,
+            previous_secret_expires_at=expires_at if rotating else None,
+        )
+        for n in range(count)
+    ]
+
+
+def measure(label: str, sign, payload_bytes: int, subscriptions: list, rounds: int) -> dict:
+    # A fresh event per round, as the worker signs each new event once per
+    # subscription; the first round warms the signer cache.
+    events = [
+        OutboxEvent(
+            id=uuid.uuid4(),
+            event_type=EventType.request_submitted,
+            payload=json.dumps({"blob": "x" * max(0, payload_bytes - 12)}),
+        )
+        for _ in range(rounds + 1)
+    ]
+    sign(events[0], subscriptions)
+    started = time.perf_counter()
+    for event in events[1:]:
+        sign(event, subscriptions)
+    elapsed = time.perf_counter() - started
+    deliveries = rounds * len(subscriptions)
+    return {
+        "strategy": label,
+        "payload_bytes": payload_bytes,
+        "subscriptions": len(subscriptions),
+        "us_per_delivery": round(elapsed / deliveries * 1e6, 3),
+        "deliveries_per_second": round(deliveries / elapsed),
+    }
+
+
+def main(payload_sizes: list[int], subscriptions: int, rounds: int) -> None:
+    plain = make_subscriptions(subscriptions, rotating=False)
+    rotating = make_subscriptions(subscriptions, rotating=True)
+    for payload_bytes in payload_sizes:
+        for label, sign, subs in (
+            ("per_call", per_call, plain),
+            ("cached", cached, plain),
+            ("cached_rotating", cached, rotating),
+        ):
+            print(json.dumps(measure(label, sign, payload_bytes, subs, rounds)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--payload-bytes", type=int, nargs="+", default=[256, 65536, 1048576])
+    parser.add_argument("--subscriptions", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    main(args.payload_bytes, args.subscriptions, args.rounds)
@@ -0,0 +1,123 @@
+"""A local webhook receiver with configurable latency, errors and throttling.
+
+Each request is answered after ``--latency-ms``. A ``--throttle-rate`` share of
+requests gets a 429 with ``Retry-After``, and an ``--error-rate`` share gets a
+500. Accepted requests are answered with ``--response-bytes`` of HTML (a
+misbehaving receiver's error page, say), streamed over ``--slow-body-ms``. Every event
+accepted is recorded with its arrival time, keyed by event id and request path,
+so a load test can tell when each delivery landed. Batched deliveries (JSON
+arrays of envelopes) are understood too.
+
+``bench_load.py`` runs it in-process. To point a hub at it by hand:
+
+    python benchmarks/fake_receiver.py --port 9000 --latency-ms 20 --error-rate 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass, field
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+
+
+@dataclass
+class ReceiverConfig:
+    latency_ms: float = 0.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after_seconds: int = 1
+    slow_body_ms: float = 0.0
+    response_bytes: int = 0
+    seed: int = 19
+
+
+@dataclass
+class Receiver:
+    """The receiver's behaviour, and what it has seen so far."""
+
+    config: ReceiverConfig = field(default_factory=ReceiverConfig)
+    # (event id, request path) -> perf_counter() at first acceptance
+    accepted: dict[tuple[str, str], float] = field(default_factory=dict)
+    requests: int = 0
+    errors: int = 0
+    throttled: int = 0
+
+    def __post_init__(self):
+        self._rng = random.Random(self.config.seed)
+
+    async def handle(self, request: Request) -> Response:
+        self.requests += 1
+        body = await request.body()
+        if self.config.latency_ms:
+            await asyncio.sleep(self.config.latency_ms / 1000)
+        roll = self._rng.random()
+        if roll < self.config.throttle_rate:
+            self.throttled += 1
+            return Response(
+                status_code=429, headers={"Retry-After": str(self.config.retry_after_seconds)}
+            )
+        if roll < self.config.throttle_rate + self.config.error_rate:
+            self.errors += 1
+            return Response("simulated failure", status_code=500)
+
+        received_at = time.perf_counter()
+        envelopes = json.loads(body)
+        for envelope in envelopes if isinstance(envelopes, list) else [envelopes]:
+            self.accepted.setdefault((envelope["event_id"], request.url.path), received_at)
+        if self.config.slow_body_ms:
+            return StreamingResponse(self._slow_body(), media_type="text/html")
+        if self.config.response_bytes:
+            return Response(b"x" * self.config.response_bytes, media_type="text/html")
+        return Response("OK")
+
+    async def _slow_body(self):
+        chunks = 10
+        size = max(self.config.response_bytes // chunks, 1)
+        for _ in range(chunks):
+            await asyncio.sleep(self.config.slow_body_ms / 1000 / chunks)
+            yield b"x" * size
+
+    def app(self) -> Starlette:
+        return Starlette(routes=[Route("/{path:path}", self.handle, methods=["POST"])])
+
+
+def make_server(receiver: Receiver, port: int) -> uvicorn.Server:
+    config = uvicorn.Config(
+        receiver.app(), host="127.0.0.1", port=port, log_level="warning", access_log=False
+    )
+    return uvicorn.Server(config)
+
+
+def add_receiver_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after-seconds", type=int, default=1)
+    parser.add_argument("--slow-body-ms", type=float, default=0.0)
+    parser.add_argument("--response-bytes", type=int, default=0)
+
+
+def receiver_config(args: argparse.Namespace) -> ReceiverConfig:
+    return ReceiverConfig(
+        latency_ms=args.latency_ms,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after_seconds=args.retry_after_seconds,
+        slow_body_ms=args.slow_body_ms,
+        response_bytes=args.response_bytes,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=9000)
+    add_receiver_arguments(parser)
+    args = parser.parse_args()
+    asyncio.run(make_server(Receiver(receiver_config(args)), args.port).serve())
@@ -0,0 +1,136 @@
+"""Fan-out-on-write delivery jobs
+
+Revision ID: 003
+Revises: 002
+Create Date: 2024-02-15 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "003"
+down_revision: Union[str, None] = "002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    delivery_status_enum = postgresql.ENUM(name="delivery_status_enum", create_type=False)
+
+    op.create_table(
+        "delivery_jobs",
+        sa.Column(
+            "id",
+            sa.dialects.postgresql.UUID(as_uuid=True),
+            primary_key=True,
+            server_default=sa.text("gen_random_uuid()"),
+        ),
+        sa.Column(
+            "event_id",
+            sa.dialects.postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("outbox_events.id"),
+            nullable=False,
+        ),
+        sa.Column(
+            "subscription_id",
+            sa.dialects.postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("webhook_subscriptions.id"),
+            nullable=False,
+        ),
+        sa.Column(
+            "status",
+            delivery_status_enum,
+            nullable=False,
+            server_default="pending",
+        ),
+        sa.Column("attempt_count", sa.Integer, nullable=False, server_default="0"),
+        sa.Column(
+            "next_attempt_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+        sa.Column("locked_by", sa.String(128), nullable=True),
+        sa.Column("last_error", sa.Text, nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+        ),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+        ),
+        sa.UniqueConstraint("event_id", "subscription_id", name="uq_delivery_job_event_sub"),
+    )
+
+    # Derive each existing pair's job from its attempt history and dead letters.
+    # A pair that was never attempted only gets a (pending) job if the event came
+    # after the subscription; older events were never owed to it. Event types are
+    # matched against whole elements of the comma-separated list.
+    op.execute(
+        """
+        INSERT INTO delivery_jobs
+            (event_id, subscription_id, status, attempt_count, next_attempt_at, last_error,
+             updated_at)
+        SELECT
+            e.id,
+            s.id,
+            CASE
+                WHEN dl.id IS NOT NULL THEN 'dead_lettered'
+                WHEN latest.status = 'delivered' THEN 'delivered'
+                ELSE 'pending'
+            END::delivery_status_enum,
+            COALESCE(latest.attempt_number, 0),
+            COALESCE(latest.next_retry_at, now()),
+            latest.error_message,
+            COALESCE(dl.created_at, latest.created_at, now())
+        FROM outbox_events e
+        JOIN webhook_subscriptions s
+            ON e.event_type::text = ANY (string_to_array(replace(s.events, ' ', ''), ','))
+        LEFT JOIN LATERAL (
+            SELECT a.attempt_number, a.status, a.next_retry_at, a.error_message, a.created_at
+            FROM delivery_attempts a
+            WHERE a.event_id = e.id AND a.subscription_id = s.id
+            ORDER BY a.attempt_number DESC
+            LIMIT 1
+        ) latest ON true
+        LEFT JOIN dead_letters dl
+            ON dl.event_id = e.id AND dl.subscription_id = s.id
+        WHERE latest.attempt_number IS NOT NULL
+            OR dl.id IS NOT NULL
+            OR (s.enabled AND e.created_at >= s.created_at)
+        """
+    )
+
+    op.create_index(
+        "ix_delivery_jobs_due",
+        "delivery_jobs",
+        ["next_attempt_at"],
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+
+    # Due state now lives on the job; attempts are an append-only audit log and
+    # leases moved from events to jobs.
+    op.drop_index("ix_delivery_attempts_pending", table_name="delivery_attempts")
+    op.drop_column("outbox_events", "locked_until")
+    op.drop_column("outbox_events", "locked_by")
+
+
+def downgrade() -> None:
+    op.add_column("outbox_events", sa.Column("locked_by", sa.String(128), nullable=True))
+    op.add_column(
+        "outbox_events",
+        sa.Column("locked_until", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        "ix_delivery_attempts_pending",
+        "delivery_attempts",
+        ["status", "next_retry_at"],
+    )
+    op.drop_index("ix_delivery_jobs_due", table_name="delivery_jobs")
+    op.drop_table("delivery_jobs")
@@ -0,0 +1,64 @@
+"""Outbox event completion tracking
+
+Revision ID: 004
+Revises: 003
+Create Date: 2024-03-01 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "004"
+down_revision: Union[str, None] = "003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "outbox_events",
+        sa.Column("pending_jobs", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.add_column(
+        "outbox_events",
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.execute(
+        """
+        UPDATE outbox_events e
+        SET pending_jobs = j.pending
+        FROM (
+            SELECT event_id, count(*) AS pending
+            FROM delivery_jobs
+            WHERE status = 'pending'
+            GROUP BY event_id
+        ) j
+        WHERE j.event_id = e.id
+        """
+    )
+    # An event with nothing left to deliver completed when its last job finished, or
+    # on publication if it never had one.
+    op.execute(
+        """
+        UPDATE outbox_events e
+        SET completed_at = COALESCE(
+            (SELECT max(j.updated_at) FROM delivery_jobs j WHERE j.event_id = e.id),
+            e.created_at
+        )
+        WHERE pending_jobs = 0
+        """
+    )
+    op.create_index(
+        "ix_outbox_events_pending",
+        "outbox_events",
+        ["created_at"],
+        postgresql_where=sa.text("completed_at IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_outbox_events_pending", table_name="outbox_events")
+    op.drop_column("outbox_events", "completed_at")
+    op.drop_column("outbox_events", "pending_jobs")
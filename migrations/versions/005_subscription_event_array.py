@@ -0,0 +1,46 @@
+"""Store subscription event types as an indexed array
+
+Revision ID: 005
+Revises: 004
+Create Date: 2024-03-15 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "005"
+down_revision: Union[str, None] = "004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.alter_column(
+        "webhook_subscriptions",
+        "events",
+        type_=postgresql.ARRAY(sa.Text()),
+        existing_type=sa.Text(),
+        existing_nullable=False,
+        postgresql_using="array_remove(string_to_array(replace(events, ' ', ''), ','), '')",
+    )
+    op.create_index(
+        "ix_webhook_subscriptions_events",
+        "webhook_subscriptions",
+        ["events"],
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_webhook_subscriptions_events", table_name="webhook_subscriptions")
+    op.alter_column(
+        "webhook_subscriptions",
+        "events",
+        type_=sa.Text(),
+        existing_type=postgresql.ARRAY(sa.Text()),
+        existing_nullable=False,
+        postgresql_using="array_to_string(events, ',')",
+    )
@@ -0,0 +1,28 @@
+"""Connector-backed subscriptions
+
+Revision ID: 006
+Revises: 005
+Create Date: 2024-04-01 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "006"
+down_revision: Union[str, None] = "005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "webhook_subscriptions", sa.Column("connector", sa.String(32), nullable=True)
+    )
+
+
+def downgrade() -> None:
+    # Rows with history can't be deleted; keep them from being POSTed to as webhooks.
+    op.execute("UPDATE webhook_subscriptions SET enabled = false WHERE connector IS NOT NULL")
+    op.drop_column("webhook_subscriptions", "connector")
@@ -0,0 +1,198 @@
+"""Partition outbox_events and delivery_attempts by month
+
+Revision ID: 007
+Revises: 006
+Create Date: 2024-04-15 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "007"
+down_revision: Union[str, None] = "006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PARTITIONED_TABLES = ("outbox_events", "delivery_attempts")
+EVENT_REFERENCES = ("delivery_jobs", "delivery_attempts", "dead_letters")
+
+# Months created ahead of the current one; the maintenance job keeps this up
+PREMAKE_MONTHS = 2
+
+
+def _outbox_events(name: str, partitioned: bool) -> None:
+    op.create_table(
+        name,
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column(
+            "event_type",
+            postgresql.ENUM(name="event_type_enum", create_type=False),
+            nullable=False,
+        ),
+        sa.Column("payload", sa.Text, nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=not partitioned,
+            server_default=sa.func.now(),
+        ),
+        sa.Column("pending_jobs", sa.Integer, nullable=False, server_default="0"),
+        sa.Column("completed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint(
+            *(("id", "created_at") if partitioned else ("id",)), name="outbox_events_pkey"
+        ),
+        **({"postgresql_partition_by": "RANGE (created_at)"} if partitioned else {}),
+    )
+
+
+def _delivery_attempts(name: str, partitioned: bool) -> None:
+    op.create_table(
+        name,
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("event_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column(
+            "subscription_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("webhook_subscriptions.id"),
+            nullable=False,
+        ),
+        sa.Column("attempt_number", sa.Integer, nullable=False, server_default="1"),
+        sa.Column(
+            "status",
+            postgresql.ENUM(name="delivery_status_enum", create_type=False),
+            nullable=False,
+            server_default="pending",
+        ),
+        sa.Column("http_status_code", sa.Integer, nullable=True),
+        sa.Column("response_body", sa.Text, nullable=True),
+        sa.Column("error_message", sa.Text, nullable=True),
+        sa.Column("next_retry_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=not partitioned,
+            server_default=sa.func.now(),
+        ),
+        sa.PrimaryKeyConstraint(
+            *(("id", "created_at") if partitioned else ("id",)),
+            name="delivery_attempts_pkey",
+        ),
+        **({"postgresql_partition_by": "RANGE (created_at)"} if partitioned else {}),
+    )
+
+
+def _copy_rows(source: str, target: str) -> None:
+    columns = [c["name"] for c in sa.inspect(op.get_bind()).get_columns(target)]
+    selected = [
+        "coalesce(created_at, now())" if column == "created_at" else column
+        for column in columns
+    ]
+    op.execute(
+        f"INSERT INTO {target} ({', '.join(columns)}) "
+        f"SELECT {', '.join(selected)} FROM {source}"
+    )
+
+
+def _set_aside(table: str, suffix: str) -> None:
+    """Rename a table and its primary key out of the way of its replacement."""
+    op.rename_table(table, f"{table}_{suffix}")
+    op.execute(
+        f"ALTER TABLE {table}_{suffix} RENAME CONSTRAINT {table}_pkey TO {table}_{suffix}_pkey"
+    )
+
+
+def upgrade() -> None:
+    # Foreign keys can't point at a partitioned table's id alone.
+    for table in EVENT_REFERENCES:
+        op.drop_constraint(f"{table}_event_id_fkey", table, type_="foreignkey")
+    op.drop_index("ix_outbox_events_created_at", table_name="outbox_events")
+    op.drop_index("ix_outbox_events_pending", table_name="outbox_events")
+
+    for table, create in (
+        ("outbox_events", _outbox_events),
+        ("delivery_attempts", _delivery_attempts),
+    ):
+        _set_aside(table, "unpartitioned")
+        create(table, partitioned=True)
+        # One partition per month from the oldest row through the premade months.
+        op.execute(
+            f"""
+            DO $$
+            DECLARE
+                month timestamptz;
+            BEGIN
+                FOR month IN
+                    SELECT generate_series(
+                        date_trunc('month', coalesce(min(created_at), now()), 'UTC'),
+                        date_trunc('month', now(), 'UTC') + interval '{PREMAKE_MONTHS} months',
+                        interval '1 month'
+                    )
+                    FROM {table}_unpartitioned
+                LOOP
+                    EXECUTE format(
+                        'CREATE TABLE %I PARTITION OF {table} FOR VALUES FROM (%L) TO (%L)',
+                        '{table}_p' || to_char(month AT TIME ZONE 'UTC', 'YYYY_MM'),
+                        month,
+                        month + interval '1 month'
+                    );
+                END LOOP;
+            END $$
+            """
+        )
+        op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+        _copy_rows(f"{table}_unpartitioned", table)
+        op.drop_table(f"{table}_unpartitioned")
+
+    op.create_index("ix_outbox_events_created_at", "outbox_events", ["created_at"])
+    op.create_index(
+        "ix_outbox_events_pending",
+        "outbox_events",
+        ["created_at"],
+        postgresql_where=sa.text("completed_at IS NULL"),
+    )
+    op.create_index(
+        "ix_delivery_attempts_event_sub",
+        "delivery_attempts",
+        ["event_id", "subscription_id", "attempt_number"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_delivery_attempts_event_sub", table_name="delivery_attempts")
+    op.drop_index("ix_outbox_events_pending", table_name="outbox_events")
+    op.drop_index("ix_outbox_events_created_at", table_name="outbox_events")
+
+    for table, create in (
+        ("outbox_events", _outbox_events),
+        ("delivery_attempts", _delivery_attempts),
+    ):
+        _set_aside(table, "partitioned")
+        create(table, partitioned=False)
+        _copy_rows(f"{table}_partitioned", table)
+        # Drops the monthly partitions with it; detached archives are left alone.
+        op.drop_table(f"{table}_partitioned")
+
+    op.create_index("ix_outbox_events_created_at", "outbox_events", ["created_at"])
+    op.create_index(
+        "ix_outbox_events_pending",
+        "outbox_events",
+        ["created_at"],
+        postgresql_where=sa.text("completed_at IS NULL"),
+    )
+    op.create_unique_constraint(
+        "uq_delivery_idempotency",
+        "delivery_attempts",
+        ["event_id", "subscription_id", "attempt_number"],
+    )
+    # Pruning may have dropped events that other rows still point at.
+    for table in EVENT_REFERENCES:
+        op.execute(
+            f"DELETE FROM {table} t WHERE NOT EXISTS "
+            f"(SELECT 1 FROM outbox_events e WHERE e.id = t.event_id)"
+        )
+        op.create_foreign_key(
+            f"{table}_event_id_fkey", table, "outbox_events", ["event_id"], ["id"]
+        )
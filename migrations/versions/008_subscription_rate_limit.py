@@ -0,0 +1,32 @@
+"""Per-subscription delivery rate limits
+
+Revision ID: 008
+Revises: 007
+Create Date: 2024-05-01 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "008"
+down_revision: Union[str, None] = "007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "webhook_subscriptions",
+        sa.Column("rate_limit_per_second", sa.Float(), nullable=True),
+    )
+    op.add_column(
+        "webhook_subscriptions",
+        sa.Column("rate_limit_burst", sa.Integer(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("webhook_subscriptions", "rate_limit_burst")
+    op.drop_column("webhook_subscriptions", "rate_limit_per_second")
@@ -0,0 +1,32 @@
+"""Batched webhook delivery settings on subscriptions
+
+Revision ID: 009
+Revises: 008
+Create Date: 2024-05-08 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "009"
+down_revision: Union[str, None] = "008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "webhook_subscriptions",
+        sa.Column("batch_max_events", sa.Integer(), nullable=True),
+    )
+    op.add_column(
+        "webhook_subscriptions",
+        sa.Column("batch_linger_seconds", sa.Float(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("webhook_subscriptions", "batch_linger_seconds")
+    op.drop_column("webhook_subscriptions", "batch_max_events")
@@ -0,0 +1,73 @@
+"""Bulk dead-letter replays
+
+Revision ID: 010
+Revises: 009
+Create Date: 2024-05-15 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+revision: str = "010"
+down_revision: Union[str, None] = "009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    replay_status_enum = postgresql.ENUM(
+        "running", "completed", "cancelled", name="replay_status_enum", create_type=False
+    )
+    replay_status_enum.create(op.get_bind(), checkfirst=True)
+
+    op.create_table(
+        "dead_letter_replays",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column(
+            "status", replay_status_enum, nullable=False, server_default="running"
+        ),
+        sa.Column("subscription_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("dead_lettered_after", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("dead_lettered_before", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("error_contains", sa.Text(), nullable=True),
+        sa.Column("rate_per_second", sa.Float(), nullable=False),
+        sa.Column("concurrency", sa.Integer(), nullable=False),
+        sa.Column("matched", sa.Integer(), nullable=False),
+        sa.Column("requeued", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            nullable=False,
+            server_default=sa.func.now(),
+        ),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        "ix_dead_letter_replays_running",
+        "dead_letter_replays",
+        ["created_at"],
+        postgresql_where=sa.text("status = 'running'"),
+    )
+
+    op.add_column(
+        "delivery_jobs", sa.Column("replay_id", postgresql.UUID(as_uuid=True), nullable=True)
+    )
+    op.create_index(
+        "ix_delivery_jobs_replay",
+        "delivery_jobs",
+        ["replay_id"],
+        postgresql_where=sa.text("replay_id IS NOT NULL"),
+    )
+    op.create_index("ix_dead_letters_created_at", "dead_letters", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_dead_letters_created_at", table_name="dead_letters")
+    op.drop_index("ix_delivery_jobs_replay", table_name="delivery_jobs")
+    op.drop_column("delivery_jobs", "replay_id")
+    op.drop_index("ix_dead_letter_replays_running", table_name="dead_letter_replays")
+    op.drop_table("dead_letter_replays")
+    postgresql.ENUM(name="replay_status_enum").drop(op.get_bind(), checkfirst=True)
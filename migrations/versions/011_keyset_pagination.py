@@ -0,0 +1,58 @@
+"""Composite (created_at, id) indexes for keyset-paginated listings
+
+Revision ID: 011
+Revises: 010
+Create Date: 2024-05-22 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "011"
+down_revision: Union[str, None] = "010"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_webhook_subscriptions_created_at", "webhook_subscriptions", ["created_at", "id"]
+    )
+    op.drop_index("ix_outbox_events_pending", table_name="outbox_events")
+    op.create_index(
+        "ix_outbox_events_pending",
+        "outbox_events",
+        ["created_at", "id"],
+        postgresql_where=sa.text("completed_at IS NULL"),
+    )
+    op.create_index(
+        "ix_delivery_attempts_event_created_at",
+        "delivery_attempts",
+        ["event_id", "created_at", "id"],
+    )
+    op.drop_index("ix_dead_letters_created_at", table_name="dead_letters")
+    op.create_index("ix_dead_letters_created_at", "dead_letters", ["created_at", "id"])
+    op.create_index(
+        "ix_dead_letters_sub_created_at", "dead_letters", ["subscription_id", "created_at", "id"]
+    )
+    op.create_index(
+        "ix_dead_letter_replays_created_at", "dead_letter_replays", ["created_at", "id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_dead_letter_replays_created_at", table_name="dead_letter_replays")
+    op.drop_index("ix_dead_letters_sub_created_at", table_name="dead_letters")
+    op.drop_index("ix_dead_letters_created_at", table_name="dead_letters")
+    op.create_index("ix_dead_letters_created_at", "dead_letters", ["created_at"])
+    op.drop_index("ix_delivery_attempts_event_created_at", table_name="delivery_attempts")
+    op.drop_index("ix_outbox_events_pending", table_name="outbox_events")
+    op.create_index(
+        "ix_outbox_events_pending",
+        "outbox_events",
+        ["created_at"],
+        postgresql_where=sa.text("completed_at IS NULL"),
+    )
+    op.drop_index("ix_webhook_subscriptions_created_at", table_name="webhook_subscriptions")
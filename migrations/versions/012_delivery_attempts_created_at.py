@@ -0,0 +1,25 @@
+"""Index delivery attempts by (created_at, id) for streaming exports
+
+Revision ID: 012
+Revises: 011
+Create Date: 2024-05-29 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "012"
+down_revision: Union[str, None] = "011"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_delivery_attempts_created_at", "delivery_attempts", ["created_at", "id"]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_delivery_attempts_created_at", table_name="delivery_attempts")
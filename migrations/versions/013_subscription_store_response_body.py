@@ -0,0 +1,29 @@
+"""Per-subscription opt-out of storing response bodies
+
+Revision ID: 013
+Revises: 012
+Create Date: 2024-06-05 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "013"
+down_revision: Union[str, None] = "012"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "webhook_subscriptions",
+        sa.Column(
+            "store_response_body", sa.Boolean(), nullable=False, server_default=sa.true()
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("webhook_subscriptions", "store_response_body")
@@ -0,0 +1,36 @@
+"""Secret versions and the previous secret kept during rotation
+
+Revision ID: 014
+Revises: 013
+Create Date: 2024-06-12 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "014"
+down_revision: Union[str, None] = "013"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "webhook_subscriptions",
+        sa.Column("secret_version", sa.Integer(), nullable=False, server_default=sa.text("1")),
+    )
+    op.add_column(
+        "webhook_subscriptions", sa.Column("previous_secret", sa.String(256), nullable=True)
+    )
+    op.add_column(
+        "webhook_subscriptions",
+        sa.Column("previous_secret_expires_at", sa.DateTime(timezone=True), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("webhook_subscriptions", "previous_secret_expires_at")
+    op.drop_column("webhook_subscriptions", "previous_secret")
+    op.drop_column("webhook_subscriptions", "secret_version")
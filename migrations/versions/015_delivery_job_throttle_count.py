@@ -0,0 +1,27 @@
+"""Count consecutive throttled responses per delivery job
+
+Revision ID: 015
+Revises: 014
+Create Date: 2024-06-19 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "015"
+down_revision: Union[str, None] = "014"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "delivery_jobs",
+        sa.Column("throttle_count", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("delivery_jobs", "throttle_count")
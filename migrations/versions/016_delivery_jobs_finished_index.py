@@ -0,0 +1,29 @@
+"""Index finished delivery jobs by last update, for retention
+
+Revision ID: 016
+Revises: 015
+Create Date: 2024-06-26 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "016"
+down_revision: Union[str, None] = "015"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_delivery_jobs_finished",
+        "delivery_jobs",
+        ["updated_at"],
+        postgresql_where=sa.text("status <> 'pending'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_delivery_jobs_finished", table_name="delivery_jobs")
@@ -1,29 +1,236 @@
 import uuid
 
-import httpx
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from integrations_hub.api.pagination import CreatedRange, PageQuery, page_items
 from integrations_hub.database import get_session
-from integrations_hub.schemas.events import DeadLetterResponse, DeliveryAttemptResponse
+from integrations_hub.http_clients import WEBHOOKS, http_clients
+from integrations_hub.models.tables import DeadLetterReplay, DeliveryStatus, ReplayStatus
+from integrations_hub.schemas.events import (
+    CircuitResponse,
+    DeadLetterResponse,
+    DeliveryAttemptResponse,
+    EventResponse,
+    ReplayCreate,
+    ReplayResponse,
+)
+from integrations_hub.services.circuit_breaker import CircuitBreaker, circuit_breakers
 from integrations_hub.services.delivery import (
     get_delivery_attempts,
+    list_dead_letters,
     replay_dead_letter,
 )
+from integrations_hub.services.export import export_dead_letters, export_delivery_attempts
+from integrations_hub.services.outbox import get_pending_events
+from integrations_hub.services.replay import (
+    cancel_replay,
+    create_replay,
+    get_replay,
+    get_replay_progress,
+    list_replays,
+)
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
+# Circuit breakers live in the delivery worker's process, so these routes are only
+# mounted on an API that embeds the worker.
+circuits_router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+@router.get("/events/pending", response_model=list[EventResponse])
+async def list_pending_events(
+    response: Response,
+    page: PageQuery = Depends(),
+    created: CreatedRange = Depends(),
+    session: AsyncSession = Depends(get_session),
+):
+    events = await get_pending_events(
+        session,
+        page.limit,
+        created_after=created.after,
+        created_before=created.before,
+        after=page.after,
+    )
+    return page_items(events, response)
 
 
 @router.get("/events/{event_id}/attempts", response_model=list[DeliveryAttemptResponse])
-async def list_attempts(event_id: uuid.UUID, session: AsyncSession = Depends(get_session)):
-    attempts = await get_delivery_attempts(session, event_id)
-    return attempts
+async def list_attempts(
+    event_id: uuid.UUID,
+    response: Response,
+    subscription_id: uuid.UUID | None = None,
+    status: DeliveryStatus | None = None,
+    page: PageQuery = Depends(),
+    session: AsyncSession = Depends(get_session),
+):
+    attempts = await get_delivery_attempts(
+        session,
+        event_id,
+        subscription_id=subscription_id,
+        status=status,
+        after=page.after,
+        limit=page.limit,
+    )
+    return page_items(attempts, response)
+
+
+@router.get("/dead-letters", response_model=list[DeadLetterResponse])
+async def list_all_dead_letters(
+    response: Response,
+    subscription_id: uuid.UUID | None = None,
+    page: PageQuery = Depends(),
+    created: CreatedRange = Depends(),
+    session: AsyncSession = Depends(get_session),
+):
+    dead_letters = await list_dead_letters(
+        session,
+        subscription_id=subscription_id,
+        created_after=created.after,
+        created_before=created.before,
+        after=page.after,
+        limit=page.limit,
+    )
+    return page_items(dead_letters, response)
+
+
+@router.get("/export/attempts", response_class=StreamingResponse)
+async def export_attempts(
+    subscription_id: uuid.UUID | None = None,
+    status: DeliveryStatus | None = None,
+    gzip: bool = False,
+    created: CreatedRange = Depends(),
+    session: AsyncSession = Depends(get_session),
+):
+    """Stream every matching delivery attempt as NDJSON, gzipped if asked."""
+    rows = export_delivery_attempts(
+        session,
+        subscription_id=subscription_id,
+        status=status,
+        created_after=created.after,
+        created_before=created.before,
+        compress=gzip,
+    )
+    return _ndjson_download(rows, "delivery-attempts", gzip)
+
+
+@router.get("/export/dead-letters", response_class=StreamingResponse)
+async def export_all_dead_letters(
+    subscription_id: uuid.UUID | None = None,
+    gzip: bool = False,
+    created: CreatedRange = Depends(),
+    session: AsyncSession = Depends(get_session),
+):
+    """Stream every matching dead letter as NDJSON, gzipped if asked."""
+    rows = export_dead_letters(
+        session,
+        subscription_id=subscription_id,
+        created_after=created.after,
+        created_before=created.before,
+        compress=gzip,
+    )
+    return _ndjson_download(rows, "dead-letters", gzip)
 
 
 @router.post("/dead-letters/{dead_letter_id}/replay", status_code=200)
 async def replay(dead_letter_id: uuid.UUID, session: AsyncSession = Depends(get_session)):
-    async with httpx.AsyncClient() as client:
-        success = await replay_dead_letter(session, dead_letter_id, client)
+    success = await replay_dead_letter(session, dead_letter_id, http_clients.get(WEBHOOKS))
     if not success:
         raise HTTPException(status_code=404, detail="Dead letter not found or replay failed")
     return {"status": "replayed", "dead_letter_id": str(dead_letter_id)}
+
+
+@router.post("/dead-letters/replay", response_model=ReplayResponse, status_code=202)
+async def start_replay(data: ReplayCreate, session: AsyncSession = Depends(get_session)):
+    """Replay every dead letter matching the filters, in the background.
+
+    The delivery worker moves them back into its queue at ``rate_per_second``,
+    keeping at most ``concurrency`` awaiting delivery at once. Poll the replay
+    for progress.
+    """
+    replay = await create_replay(session, data)
+    return await _replay_response(session, replay)
+
+
+@router.get("/replays", response_model=list[ReplayResponse])
+async def list_dead_letter_replays(
+    response: Response,
+    status: ReplayStatus | None = None,
+    page: PageQuery = Depends(),
+    session: AsyncSession = Depends(get_session),
+):
+    replays = await list_replays(session, status=status, after=page.after, limit=page.limit)
+    progress = await get_replay_progress(session, [r.id for r in replays.items])
+    return [_replay_view(r, progress.get(r.id, {})) for r in page_items(replays, response)]
+
+
+@router.get("/replays/{replay_id}", response_model=ReplayResponse)
+async def get_dead_letter_replay(
+    replay_id: uuid.UUID, session: AsyncSession = Depends(get_session)
+):
+    replay = await get_replay(session, replay_id)
+    if replay is None:
+        raise HTTPException(status_code=404, detail="Replay not found")
+    return await _replay_response(session, replay)
+
+
+@router.post("/replays/{replay_id}/cancel", response_model=ReplayResponse)
+async def cancel_dead_letter_replay(
+    replay_id: uuid.UUID, session: AsyncSession = Depends(get_session)
+):
+    replay = await cancel_replay(session, replay_id)
+    if replay is None:
+        raise HTTPException(status_code=404, detail="Replay not found")
+    return await _replay_response(session, replay)
+
+
+@circuits_router.get("/circuits", response_model=list[CircuitResponse])
+async def list_circuits():
+    """Circuit breakers of the delivery worker in this process, one per host."""
+    return [_circuit_response(breaker) for _, breaker in circuit_breakers.items()]
+
+
+@circuits_router.post("/circuits/{host}/reset", response_model=CircuitResponse)
+async def reset_circuit(host: str):
+    breaker = circuit_breakers.get(host)
+    if breaker is None:
+        raise HTTPException(status_code=404, detail="No circuit for this host")
+    breaker.reset()
+    return _circuit_response(breaker)
+
+
+def _ndjson_download(rows, name: str, gzip: bool) -> StreamingResponse:
+    filename = f"{name}.ndjson.gz" if gzip else f"{name}.ndjson"
+    return StreamingResponse(
+        rows,
+        media_type="application/gzip" if gzip else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def _circuit_response(breaker: CircuitBreaker) -> CircuitResponse:
+    return CircuitResponse(
+        host=breaker.host,
+        state=breaker.state.value,
+        failure_rate=breaker.failure_rate,
+        recent_requests=breaker.recent_requests,
+        retry_after_seconds=breaker.retry_after(),
+        opened_at=breaker.opened_at,
+    )
+
+
+async def _replay_response(session: AsyncSession, replay: DeadLetterReplay) -> ReplayResponse:
+    progress = await get_replay_progress(session, [replay.id])
+    return _replay_view(replay, progress.get(replay.id, {}))
+
+
+def _replay_view(
+    replay: DeadLetterReplay, progress: dict[DeliveryStatus, int]
+) -> ReplayResponse:
+    return ReplayResponse.model_validate(replay).model_copy(
+        update={
+            "delivered": progress.get(DeliveryStatus.delivered, 0),
+            "pending": progress.get(DeliveryStatus.pending, 0),
+            "dead_lettered": progress.get(DeliveryStatus.dead_lettered, 0),
+        }
+    )
@@ -0,0 +1,46 @@
+from datetime import datetime
+
+from fastapi import HTTPException, Query, Response
+
+from integrations_hub.pagination import Cursor, Page, decode_cursor
+
+# Response header carrying the cursor of the next page; absent on the last page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PageQuery:
+    """``cursor`` and ``limit`` query parameters shared by the list endpoints."""
+
+    def __init__(
+        self,
+        cursor: str | None = Query(
+            None, description=f"Continue from the {NEXT_CURSOR_HEADER} of the previous page"
+        ),
+        limit: int = Query(50, ge=1, le=500),
+    ):
+        self.limit = limit
+        self.after: Cursor | None = None
+        if cursor is not None:
+            try:
+                self.after = decode_cursor(cursor)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor") from None
+
+
+class CreatedRange:
+    """``created_after`` / ``created_before`` query parameters, a half-open range."""
+
+    def __init__(
+        self,
+        created_after: datetime | None = Query(None),
+        created_before: datetime | None = Query(None),
+    ):
+        self.after = created_after
+        self.before = created_before
+
+
+def page_items(page: Page, response: Response) -> list:
+    """The page's rows for the response body, with its cursor in the headers."""
+    if page.next_cursor is not None:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
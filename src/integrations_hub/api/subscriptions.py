@@ -1,8 +1,9 @@
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from integrations_hub.api.pagination import CreatedRange, PageQuery, page_items
 from integrations_hub.database import get_session
 from integrations_hub.schemas.subscriptions import (
     SubscriptionCreate,
@@ -27,8 +28,22 @@ async def create(data: SubscriptionCreate, session: AsyncSession = Depends(get_s
 
 
 @router.get("", response_model=list[SubscriptionResponse])
-async def list_all(session: AsyncSession = Depends(get_session)):
-    return await list_subscriptions(session)
+async def list_all(
+    response: Response,
+    enabled: bool | None = None,
+    page: PageQuery = Depends(),
+    created: CreatedRange = Depends(),
+    session: AsyncSession = Depends(get_session),
+):
+    subs = await list_subscriptions(
+        session,
+        enabled=enabled,
+        created_after=created.after,
+        created_before=created.before,
+        after=page.after,
+        limit=page.limit,
+    )
+    return page_items(subs, response)
 
 
 @router.get("/{subscription_id}", response_model=SubscriptionResponse)
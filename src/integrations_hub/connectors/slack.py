@@ -1,15 +1,23 @@
 import json
+import uuid
 
 import httpx
 import structlog
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from integrations_hub.config import settings
-from integrations_hub.models.tables import OutboxEvent
+from integrations_hub.http_clients import SLACK, http_clients
+from integrations_hub.models.tables import EventType, OutboxEvent, WebhookSubscription
 
 logger = structlog.get_logger()
 
 SLACK_POST_MESSAGE_URL = "https://slack.com/api/chat.postMessage"
 
+# WebhookSubscription.connector value, and the fixed id of the connector's subscription
+SLACK_CONNECTOR = "slack"
+SLACK_SUBSCRIPTION_ID = uuid.uuid5(uuid.NAMESPACE_URL, "integrations-hub:connector:slack")
+
 
 def format_slack_message(event: OutboxEvent) -> dict:
     """Format an outbox event into a Slack message payload."""
@@ -47,49 +55,57 @@ def format_slack_message(event: OutboxEvent) -> dict:
     }
 
 
-async def send_slack_notification(
+async def post_slack_message(
     event: OutboxEvent, http_client: httpx.AsyncClient | None = None
-) -> bool:
-    """Send a Slack notification for a request_submitted event."""
-    if not settings.slack_bot_token:
-        logger.warning("slack_bot_token_not_configured")
-        return False
+) -> httpx.Response:
+    """POST the event's Slack message. Transport errors propagate to the caller."""
+    http_client = http_client or http_clients.get(SLACK)
+    return await http_client.post(
+        SLACK_POST_MESSAGE_URL,
+        json=format_slack_message(event),
+        headers={
+            "Authorization": f"Bearer {settings.slack_bot_token}",
+            "Content-Type": "application/json",
+        },
+        timeout=settings.delivery_timeout_seconds,
+    )
 
-    message = format_slack_message(event)
-    own_client = http_client is None
 
-    if own_client:
-        http_client = httpx.AsyncClient()
+def slack_error(response: httpx.Response) -> str | None:
+    """The failure reported by a chat.postMessage response, or None if it succeeded.
 
+    Slack answers most errors with HTTP 200 and ``"ok": false`` in the body.
+    """
+    if response.status_code != 200:
+        return f"HTTP {response.status_code}"
     try:
-        response = await http_client.post(
-            SLACK_POST_MESSAGE_URL,
-            json=message,
-            headers={
-                "Authorization": f"Bearer {settings.slack_bot_token}",
-                "Content-Type": "application/json",
-            },
-            timeout=10.0,
-        )
-
         data = response.json()
-        if data.get("ok"):
-            logger.info(
-                "slack_notification_sent",
-                event_id=str(event.id),
-                channel=settings.slack_default_channel,
-            )
-            return True
-        else:
-            logger.error(
-                "slack_api_error",
-                event_id=str(event.id),
-                error=data.get("error"),
-            )
-            return False
-    except httpx.RequestError as exc:
-        logger.error("slack_request_error", event_id=str(event.id), error=str(exc))
-        return False
-    finally:
-        if own_client:
-            await http_client.aclose()
+    except ValueError:
+        return "Invalid Slack API response"
+    if not data.get("ok"):
+        return f"Slack API error: {data.get('error')}"
+    return None
+
+
+async def ensure_slack_subscription(session: AsyncSession) -> None:
+    """Keep the built-in Slack connector subscription in step with configuration.
+
+    Slack notifications are delivered by the worker like any webhook, through a
+    subscription row with ``connector="slack"``. It is enabled exactly when a bot
+    token is configured. Safe to run concurrently from several processes.
+    """
+    enabled = bool(settings.slack_bot_token)
+    await session.execute(
+        pg_insert(WebhookSubscription)
+        .values(
+            id=SLACK_SUBSCRIPTION_ID,
+            url=SLACK_POST_MESSAGE_URL,
+            secret="",
+            events=[EventType.request_submitted.value],
+            enabled=enabled,
+            connector=SLACK_CONNECTOR,
+        )
+        .on_conflict_do_update(index_elements=["id"], set_={"enabled": enabled})
+    )
+    await session.commit()
+    logger.info("slack_connector_configured", enabled=enabled)
@@ -0,0 +1,135 @@
+import httpx
+import structlog
+
+from integrations_hub.config import settings
+
+logger = structlog.get_logger()
+
+# Egress paths, each with its own connection pool
+WEBHOOKS = "webhooks"
+SLACK = "slack"
+
+# Request extension overriding how many bytes of the response body are read
+RESPONSE_BODY_LIMIT = "integrations_hub.response_body_limit"
+
+# Response extension set when the body went on past the cap and was cut off
+RESPONSE_BODY_TRUNCATED = "integrations_hub.response_body_truncated"
+
+# Media types, besides text/*, whose bodies are worth reading and decoding
+_TEXT_MEDIA_TYPES = {"application/json", "application/xml", "application/x-www-form-urlencoded"}
+
+
+class HttpClientRegistry:
+    """Long-lived outbound HTTP clients, one per egress path.
+
+    Sharing a client keeps connections to a destination alive between requests, so
+    repeat requests skip the TCP and TLS handshakes (and, with HTTP/2, multiplex over
+    a single connection). Clients are created on first use and closed together when
+    the application shuts down.
+    """
+
+    def __init__(self) -> None:
+        self._clients: dict[str, httpx.AsyncClient] = {}
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._clients[name] = _build_client(name)
+        return client
+
+    async def aclose(self) -> None:
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            await client.aclose()
+
+
+def _build_client(name: str) -> httpx.AsyncClient:
+    http2 = {
+        WEBHOOKS: settings.webhook_http2_enabled,
+        SLACK: settings.slack_http2_enabled,
+    }.get(name, False)
+    if http2 and not _h2_installed():
+        logger.warning("http2_unavailable", client=name, hint="install integrations-hub[http2]")
+        http2 = False
+    limits = httpx.Limits(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        keepalive_expiry=settings.http_keepalive_expiry_seconds,
+    )
+    if name != WEBHOOKS:
+        return httpx.AsyncClient(http2=http2, limits=limits)
+    # Receivers are untrusted, so their response bodies are read within a cap,
+    # and uncompressed so the cap bounds the decoded size too.
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=limits,
+        headers={"Accept-Encoding": "identity"},
+        event_hooks={"response": [limit_response_body]},
+    )
+
+
+async def limit_response_body(response: httpx.Response) -> None:
+    """Response hook that reads at most ``delivery_response_max_bytes`` of the body.
+
+    A request can lower the cap through the ``RESPONSE_BODY_LIMIT`` extension. A
+    binary body isn't read at all. The hook runs before httpx reads the body, so the
+    rest is never downloaded: the connection is closed instead of being drained back
+    into the pool. A body cut off at the cap is flagged, see ``capped_body``.
+    """
+    limit = response.request.extensions.get(
+        RESPONSE_BODY_LIMIT, settings.delivery_response_max_bytes
+    )
+    if not _is_text(response.headers.get("Content-Type")):
+        limit = 0
+    response.stream = _LimitedStream(response.stream, limit, response.extensions)
+
+
+def capped_body(response: httpx.Response) -> tuple[bytes, bool]:
+    """The response body as read within the cap, and whether it was cut off there."""
+    return response.content, response.extensions.get(RESPONSE_BODY_TRUNCATED, False)
+
+
+def _is_text(content_type: str | None) -> bool:
+    if not content_type:
+        return True
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return (
+        media_type.startswith("text/")
+        or media_type in _TEXT_MEDIA_TYPES
+        or media_type.endswith(("+json", "+xml"))
+    )
+
+
+class _LimitedStream(httpx.AsyncByteStream):
+    def __init__(self, stream: httpx.AsyncByteStream, limit: int, extensions: dict) -> None:
+        self._stream = stream
+        self._limit = limit
+        self._extensions = extensions
+
+    async def __aiter__(self):
+        remaining = self._limit
+        if remaining <= 0:
+            return
+        async for chunk in self._stream:
+            # Once the cap is reached, the next chunk only tells whether there was more.
+            if len(chunk) > remaining:
+                self._extensions[RESPONSE_BODY_TRUNCATED] = True
+                if remaining:
+                    yield chunk[:remaining]
+                return
+            yield chunk
+            remaining -= len(chunk)
+
+    async def aclose(self) -> None:
+        await self._stream.aclose()
+
+
+def _h2_installed() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+http_clients = HttpClientRegistry()
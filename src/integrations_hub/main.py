@@ -1,27 +1,32 @@
-import asyncio
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
+from integrations_hub.api.admin import circuits_router
 from integrations_hub.api.admin import router as admin_router
 from integrations_hub.api.events import router as events_router
 from integrations_hub.api.subscriptions import router as subscriptions_router
+from integrations_hub.config import settings
+from integrations_hub.connectors.slack import ensure_slack_subscription
+from integrations_hub.database import async_session_factory
+from integrations_hub.http_clients import http_clients
 from integrations_hub.logging_config import setup_logging
-from integrations_hub.metrics import metrics_endpoint
-from integrations_hub.worker.delivery_worker import run_delivery_loop
+from integrations_hub.metrics import metrics_endpoint, track_http_requests
+from integrations_hub.worker.main import start_worker_tasks, stop_worker_tasks
 
 setup_logging()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    task = asyncio.create_task(run_delivery_loop())
+    async with async_session_factory() as session:
+        await ensure_slack_subscription(session)
+    # With the worker embedded, every API process also delivers; turn it off to
+    # run the API alone and scale delivery with integrations-hub-worker.
+    tasks = start_worker_tasks() if settings.worker_embedded else []
     yield
-    task.cancel()
-    try:
-        await task
-    except asyncio.CancelledError:
-        pass
+    await stop_worker_tasks(tasks)
+    await http_clients.aclose()
 
 
 app = FastAPI(
@@ -34,7 +39,10 @@ app = FastAPI(
 app.include_router(subscriptions_router, prefix="/api/v1")
 app.include_router(events_router, prefix="/api/v1")
 app.include_router(admin_router, prefix="/api/v1")
-app.add_route("/metrics", metrics_endpoint)
+if settings.worker_embedded:
+    app.include_router(circuits_router, prefix="/api/v1")
+app.add_api_route("/metrics", metrics_endpoint, include_in_schema=False)
+app.middleware("http")(track_http_requests)
 
 
 @app.get("/health", tags=["Health"])
@@ -1,4 +1,6 @@
-from prometheus_client import Counter, Histogram, generate_latest
+import time
+
+from prometheus_client import Counter, Gauge, Histogram, generate_latest
 from starlette.requests import Request
 from starlette.responses import Response
 
@@ -11,6 +13,33 @@ WEBHOOK_DELIVERY_DURATION = Histogram(
     "webhook_delivery_duration_seconds",
     "Webhook delivery duration in seconds",
 )
+WEBHOOK_RETRIES = Counter(
+    "webhook_delivery_retries_total",
+    "Failed webhook deliveries scheduled for retry",
+    ["subscription_id"],
+)
+WEBHOOK_DEAD_LETTERS = Counter(
+    "webhook_dead_letters_total",
+    "Webhook deliveries dead-lettered after their last attempt",
+    ["subscription_id"],
+)
+DELIVERY_STAGE_DURATION = Histogram(
+    "delivery_stage_duration_seconds",
+    "Time spent in each stage of the delivery pipeline",
+    ["stage"],  # claim, routing, sign, http, commit
+)
+# Every worker process reports the same figures from the database; in multiprocess
+# mode, export one of them rather than one series per process.
+OUTBOX_BACKLOG = Gauge(
+    "outbox_backlog_events",
+    "Outbox events with deliveries still outstanding",
+    multiprocess_mode="livemax",
+)
+OUTBOX_OLDEST_PENDING_AGE = Gauge(
+    "outbox_oldest_pending_age_seconds",
+    "Age of the oldest outbox event with deliveries still outstanding",
+    multiprocess_mode="livemax",
+)
 EVENTS_PUBLISHED = Counter(
     "events_published_total",
     "Total events published to outbox",
@@ -21,7 +50,47 @@ HTTP_REQUESTS = Counter(
     "Total HTTP requests",
     ["method", "path", "status_code"],
 )
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "API request duration in seconds",
+    ["method", "path"],
+)
 
 
 async def metrics_endpoint(request: Request) -> Response:
     return Response(content=generate_latest(), media_type="text/plain; charset=utf-8")
+
+
+async def track_http_requests(request: Request, call_next) -> Response:
+    """Count and time API requests, labelled by route template rather than raw path.
+
+    A request whose handler raises is counted as the 500 it is answered with.
+    """
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    except Exception:
+        _observe(request, 500, started)
+        raise
+    _observe(request, response.status_code, started)
+    return response
+
+
+def _observe(request: Request, status_code: int, started: float) -> None:
+    path = _route_template(request)
+    HTTP_REQUESTS.labels(request.method, path, str(status_code)).inc()
+    HTTP_REQUEST_DURATION.labels(request.method, path).observe(time.perf_counter() - started)
+
+
+def _route_template(request: Request) -> str:
+    # Requests that matched no route share one label, so unknown paths don't each
+    # get their own.
+    route = request.scope.get("route")
+    if route is None:
+        return "unmatched"
+    # Newer FastAPI releases leave the include_router prefix off an included
+    # route's path; it is the part of the request path in front of the route's.
+    extra = request.scope["path"].count("/") - route.path.count("/")
+    if extra <= 0:
+        return route.path
+    return "/".join(request.scope["path"].split("/")[: extra + 1]) + route.path
@@ -1,7 +1,9 @@
 from integrations_hub.models.base import Base
 from integrations_hub.models.tables import (
     DeadLetter,
+    DeadLetterReplay,
     DeliveryAttempt,
+    DeliveryJob,
     OutboxEvent,
     WebhookSubscription,
 )
@@ -9,7 +11,9 @@ from integrations_hub.models.tables import (
 __all__ = [
     "Base",
     "DeadLetter",
+    "DeadLetterReplay",
     "DeliveryAttempt",
+    "DeliveryJob",
     "OutboxEvent",
     "WebhookSubscription",
 ]
@@ -3,18 +3,24 @@ import uuid
 from datetime import datetime
 
 from sqlalchemy import (
+    DDL,
     Boolean,
     DateTime,
     Enum,
+    Float,
     ForeignKey,
     Index,
     Integer,
+    PrimaryKeyConstraint,
     String,
     Text,
     UniqueConstraint,
     func,
+    text,
+    true,
 )
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import event as sa_event
+from sqlalchemy.dialects.postgresql import ARRAY, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from integrations_hub.models.base import Base
@@ -34,6 +40,12 @@ class DeliveryStatus(str, enum.Enum):
     dead_lettered = "dead_lettered"
 
 
+class ReplayStatus(str, enum.Enum):
+    running = "running"
+    completed = "completed"
+    cancelled = "cancelled"
+
+
 class WebhookSubscription(Base):
     __tablename__ = "webhook_subscriptions"
 
@@ -42,10 +54,31 @@ class WebhookSubscription(Base):
     )
     url: Mapped[str] = mapped_column(String(2048), nullable=False)
     secret: Mapped[str] = mapped_column(String(256), nullable=False)
+    # Bumped whenever the secret changes; cached signers are keyed by it
+    secret_version: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=1, server_default=text("1")
+    )
+    # The secret before the last rotation, also signed with until it expires
+    previous_secret: Mapped[str | None] = mapped_column(String(256), nullable=True)
+    previous_secret_expires_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
     enabled: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
-    events: Mapped[str] = mapped_column(
-        Text, nullable=False
-    )  # comma-separated EventType values
+    events: Mapped[list[str]] = mapped_column(
+        ARRAY(Text), nullable=False
+    )  # EventType values
+    # Built-in connector that delivers instead of a plain webhook POST, e.g. "slack"
+    connector: Mapped[str | None] = mapped_column(String(32), nullable=True)
+    # Token bucket the worker sends at; unlimited when unset
+    rate_limit_per_second: Mapped[float | None] = mapped_column(Float, nullable=True)
+    rate_limit_burst: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Up to this many events go out per POST, as a JSON array; one per POST when unset
+    batch_max_events: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    batch_linger_seconds: Mapped[float | None] = mapped_column(Float, nullable=True)
+    # Off keeps receivers' response bodies out of the attempt log
+    store_response_body: Mapped[bool] = mapped_column(
+        Boolean, nullable=False, default=True, server_default=true()
+    )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
     )
@@ -53,37 +86,133 @@ class WebhookSubscription(Base):
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
     )
 
+    # Routing lookups use `events @> ARRAY[event_type]`, which this index serves
+    __table_args__ = (
+        Index("ix_webhook_subscriptions_events", "events", postgresql_using="gin"),
+        Index("ix_webhook_subscriptions_created_at", "created_at", "id"),
+    )
+
 
 class OutboxEvent(Base):
+    """A published event, range-partitioned by month on ``created_at``.
+
+    Postgres requires the partition key in the primary key, so the table's key is
+    ``(id, created_at)``; the ORM still identifies events by ``id`` alone. Nothing can
+    reference the table by foreign key, and expired months are dropped as a whole by
+    ``services.partitions``.
+    """
+
     __tablename__ = "outbox_events"
 
+    # Client-generated ids let batch INSERT ... RETURNING match rows to parameters
     id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+        UUID(as_uuid=True), default=uuid.uuid4, insert_sentinel=True
     )
     event_type: Mapped[EventType] = mapped_column(
         Enum(EventType, name="event_type_enum"), nullable=False
     )
     payload: Mapped[str] = mapped_column(Text, nullable=False)  # JSON string
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now()
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    # Delivery jobs not yet delivered or dead-lettered; the event is complete at zero
+    pending_jobs: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    completed_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
     )
 
     delivery_attempts: Mapped[list["DeliveryAttempt"]] = relationship(
-        back_populates="event", cascade="all, delete-orphan"
+        primaryjoin="OutboxEvent.id == foreign(DeliveryAttempt.event_id)",
+        back_populates="event",
+        cascade="all, delete-orphan",
     )
 
-    __table_args__ = (Index("ix_outbox_events_created_at", "created_at"),)
+    __table_args__ = (
+        PrimaryKeyConstraint("id", "created_at", name="outbox_events_pkey"),
+        Index("ix_outbox_events_created_at", "created_at"),
+        Index(
+            "ix_outbox_events_pending",
+            "created_at",
+            "id",
+            postgresql_where=text("completed_at IS NULL"),
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+    __mapper_args__ = {"primary_key": [id]}
 
 
-class DeliveryAttempt(Base):
-    __tablename__ = "delivery_attempts"
+class DeliveryJob(Base):
+    """Delivery state of one event for one subscription, written when the event is published.
+
+    ``next_attempt_at`` doubles as the claim lease: claiming a job pushes it into the
+    future, so a job whose worker dies becomes due again once the lease runs out.
+    """
+
+    __tablename__ = "delivery_jobs"
 
     id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+        UUID(as_uuid=True), primary_key=True, server_default=func.gen_random_uuid()
+    )
+    event_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
+    subscription_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("webhook_subscriptions.id"), nullable=False
     )
-    event_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("outbox_events.id"), nullable=False
+    status: Mapped[DeliveryStatus] = mapped_column(
+        Enum(DeliveryStatus, name="delivery_status_enum"),
+        nullable=False,
+        default=DeliveryStatus.pending,
+        server_default=DeliveryStatus.pending.value,
     )
+    attempt_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    # Throttled responses in a row since the last attempt; these cost no attempt
+    throttle_count: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    locked_by: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # The bulk replay that last put this job back in the queue, if any
+    replay_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now()
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    __table_args__ = (
+        UniqueConstraint("event_id", "subscription_id", name="uq_delivery_job_event_sub"),
+        Index(
+            "ix_delivery_jobs_due",
+            "next_attempt_at",
+            postgresql_where=text("status = 'pending'"),
+        ),
+        Index(
+            "ix_delivery_jobs_replay",
+            "replay_id",
+            postgresql_where=text("replay_id IS NOT NULL"),
+        ),
+        Index(
+            "ix_delivery_jobs_finished",
+            "updated_at",
+            postgresql_where=text("status <> 'pending'"),
+        ),
+    )
+
+
+class DeliveryAttempt(Base):
+    """Append-only audit log of every delivery attempt, partitioned like ``OutboxEvent``."""
+
+    __tablename__ = "delivery_attempts"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), default=uuid.uuid4)
+    event_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
     subscription_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), ForeignKey("webhook_subscriptions.id"), nullable=False
     )
@@ -100,15 +229,29 @@ class DeliveryAttempt(Base):
         DateTime(timezone=True), nullable=True
     )
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now()
+        DateTime(timezone=True), nullable=False, server_default=func.now()
     )
 
-    event: Mapped["OutboxEvent"] = relationship(back_populates="delivery_attempts")
+    event: Mapped["OutboxEvent"] = relationship(
+        primaryjoin="foreign(DeliveryAttempt.event_id) == OutboxEvent.id",
+        back_populates="delivery_attempts",
+    )
 
+    # A unique constraint would have to include created_at, so attempt numbers are
+    # kept unique by the delivery job's state machine rather than by the table.
     __table_args__ = (
-        UniqueConstraint("event_id", "subscription_id", "attempt_number", name="uq_delivery_idempotency"),
-        Index("ix_delivery_attempts_pending", "status", "next_retry_at"),
+        PrimaryKeyConstraint("id", "created_at", name="delivery_attempts_pkey"),
+        Index(
+            "ix_delivery_attempts_event_sub",
+            "event_id",
+            "subscription_id",
+            "attempt_number",
+        ),
+        Index("ix_delivery_attempts_event_created_at", "event_id", "created_at", "id"),
+        Index("ix_delivery_attempts_created_at", "created_at", "id"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
+    __mapper_args__ = {"primary_key": [id]}
 
 
 class DeadLetter(Base):
@@ -117,9 +260,7 @@ class DeadLetter(Base):
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
-    event_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True), ForeignKey("outbox_events.id"), nullable=False
-    )
+    event_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), nullable=False)
     subscription_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True), ForeignKey("webhook_subscriptions.id"), nullable=False
     )
@@ -131,4 +272,68 @@ class DeadLetter(Base):
 
     __table_args__ = (
         UniqueConstraint("event_id", "subscription_id", name="uq_dead_letter_event_sub"),
+        Index("ix_dead_letters_created_at", "created_at", "id"),
+        Index("ix_dead_letters_sub_created_at", "subscription_id", "created_at", "id"),
+    )
+
+
+class DeadLetterReplay(Base):
+    """A bulk replay of the dead letters matching its filters, run by the worker.
+
+    Only dead letters that exist when the replay is created are matched. They are
+    put back in the queue gradually, at most ``rate_per_second`` of them and never
+    more than ``concurrency`` still awaiting delivery at once.
+    """
+
+    __tablename__ = "dead_letter_replays"
+
+    id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
+    )
+    status: Mapped[ReplayStatus] = mapped_column(
+        Enum(ReplayStatus, name="replay_status_enum"),
+        nullable=False,
+        default=ReplayStatus.running,
+        server_default=ReplayStatus.running.value,
+    )
+    # Filters; unset ones match every dead letter
+    subscription_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), nullable=True)
+    dead_lettered_after: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    dead_lettered_before: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    error_contains: Mapped[str | None] = mapped_column(Text, nullable=True)
+    rate_per_second: Mapped[float] = mapped_column(Float, nullable=False)
+    concurrency: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Dead letters matched when the replay was created, and how many are requeued
+    matched: Mapped[int] = mapped_column(Integer, nullable=False)
+    requeued: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0, server_default="0"
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+    finished_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+    __table_args__ = (
+        Index(
+            "ix_dead_letter_replays_running",
+            "created_at",
+            postgresql_where=text("status = 'running'"),
+        ),
+        Index("ix_dead_letter_replays_created_at", "created_at", "id"),
+    )
+
+
+# Rows outside every monthly partition land here, so inserts never fail for lack of a
+# partition. Migrations create the same partitions for databases managed by Alembic.
+for _table in (OutboxEvent.__table__, DeliveryAttempt.__table__):
+    sa_event.listen(
+        _table,
+        "after_create",
+        DDL(f"CREATE TABLE {_table.name}_default PARTITION OF {_table.name} DEFAULT"),
     )
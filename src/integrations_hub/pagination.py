@@ -0,0 +1,87 @@
+"""Keyset pagination over ``(created_at, id)``.
+
+A page ends with an opaque cursor naming its last row; the next page starts right
+after that row. Each page is one index range scan, so fetching it costs the same
+however deep into the table it is, unlike ``OFFSET``.
+"""
+
+import base64
+import binascii
+import json
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Generic, NamedTuple, TypeVar
+
+from sqlalchemy import Select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+T = TypeVar("T")
+
+
+class Cursor(NamedTuple):
+    created_at: datetime
+    id: uuid.UUID
+
+
+@dataclass
+class Page(Generic[T]):
+    items: list[T]
+    # Where the next page starts; None on the last page
+    next_cursor: str | None = None
+
+
+def encode_cursor(cursor: Cursor) -> str:
+    raw = json.dumps([cursor.created_at.isoformat(), str(cursor.id)])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(value: str) -> Cursor:
+    """Parse a cursor from ``encode_cursor``; raises ``ValueError`` if it isn't one."""
+    try:
+        raw = base64.urlsafe_b64decode(value + "=" * (-len(value) % 4))
+        created_at, id_ = json.loads(raw)
+        return Cursor(datetime.fromisoformat(created_at), uuid.UUID(id_))
+    except (binascii.Error, TypeError, ValueError) as exc:
+        raise ValueError(f"Invalid cursor: {value!r}") from exc
+
+
+def created_within(model, after: datetime | None, before: datetime | None) -> list:
+    """Conditions for rows created in ``[after, before)``; unset bounds are open."""
+    conditions = []
+    if after is not None:
+        conditions.append(model.created_at >= after)
+    if before is not None:
+        conditions.append(model.created_at < before)
+    return conditions
+
+
+async def fetch_page(
+    session: AsyncSession,
+    stmt: Select,
+    model,
+    *,
+    after: Cursor | None = None,
+    limit: int = 50,
+    descending: bool = False,
+) -> Page:
+    """Run ``stmt`` for one page of ``model`` rows ordered by ``(created_at, id)``.
+
+    ``stmt`` supplies the filters; an index leading with the filter columns and
+    ending in ``(created_at, id)`` makes every page a single range scan.
+    """
+    key = tuple_(model.created_at, model.id)
+    if after is not None:
+        stmt = stmt.where(key < tuple_(*after) if descending else key > tuple_(*after))
+    order = (
+        (model.created_at.desc(), model.id.desc())
+        if descending
+        else (model.created_at.asc(), model.id.asc())
+    )
+    # One row beyond the page tells whether another page follows.
+    result = await session.execute(stmt.order_by(*order).limit(limit + 1))
+    rows = list(result.scalars().all())
+    if len(rows) <= limit:
+        return Page(rows)
+    last = rows[limit - 1]
+    return Page(rows[:limit], encode_cursor(Cursor(last.created_at, last.id)))
@@ -1,4 +1,4 @@
-from integrations_hub.schemas.events import EventCreate, EventResponse
+from integrations_hub.schemas.events import EventBatchCreate, EventCreate, EventResponse
 from integrations_hub.schemas.subscriptions import (
     SubscriptionCreate,
     SubscriptionResponse,
@@ -6,6 +6,7 @@ from integrations_hub.schemas.subscriptions import (
 )
 
 __all__ = [
+    "EventBatchCreate",
     "EventCreate",
     "EventResponse",
     "SubscriptionCreate",
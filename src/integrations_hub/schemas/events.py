@@ -1,8 +1,9 @@
 import uuid
 from datetime import datetime
 
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, Field, field_validator, model_validator
 
+from integrations_hub.config import settings
 from integrations_hub.models.tables import EventType
 
 VALID_EVENTS = {e.value for e in EventType}
@@ -20,11 +21,17 @@ class EventCreate(BaseModel):
         return v
 
 
+class EventBatchCreate(BaseModel):
+    events: list[EventCreate] = Field(min_length=1, max_length=settings.ingest_max_batch_size)
+
+
 class EventResponse(BaseModel):
     id: uuid.UUID
     event_type: str
     payload: str
     created_at: datetime
+    pending_jobs: int = 0
+    completed_at: datetime | None = None
 
     model_config = {"from_attributes": True}
 
@@ -53,3 +60,51 @@ class DeadLetterResponse(BaseModel):
     created_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class CircuitResponse(BaseModel):
+    host: str
+    state: str
+    failure_rate: float
+    recent_requests: int
+    retry_after_seconds: float
+    opened_at: datetime | None
+
+
+class ReplayCreate(BaseModel):
+    """Filters and pace of a bulk dead-letter replay; unset filters match everything."""
+
+    subscription_id: uuid.UUID | None = None
+    dead_lettered_after: datetime | None = None
+    dead_lettered_before: datetime | None = None
+    error_contains: str | None = Field(None, min_length=1, max_length=1000)
+    rate_per_second: float = Field(settings.replay_default_rate_per_second, gt=0, le=10000)
+    concurrency: int = Field(settings.replay_default_concurrency, ge=1, le=10000)
+
+    @model_validator(mode="after")
+    def validate_time_range(self) -> "ReplayCreate":
+        after, before = self.dead_lettered_after, self.dead_lettered_before
+        if after is not None and before is not None and after >= before:
+            raise ValueError("dead_lettered_after must be earlier than dead_lettered_before")
+        return self
+
+
+class ReplayResponse(BaseModel):
+    id: uuid.UUID
+    status: str
+    subscription_id: uuid.UUID | None
+    dead_lettered_after: datetime | None
+    dead_lettered_before: datetime | None
+    error_contains: str | None
+    rate_per_second: float
+    concurrency: int
+    matched: int
+    requeued: int
+    # Requeued deliveries by outcome so far
+    delivered: int = 0
+    pending: int = 0
+    dead_lettered: int = 0
+    created_at: datetime
+    finished_at: datetime | None
+
+    model_config = {"from_attributes": True}
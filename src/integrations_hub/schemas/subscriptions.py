@@ -1,7 +1,7 @@
 import uuid
 from datetime import datetime
 
-from pydantic import BaseModel, HttpUrl, field_validator
+from pydantic import BaseModel, Field, HttpUrl, field_validator
 
 from integrations_hub.models.tables import EventType
 
@@ -13,6 +13,11 @@ class SubscriptionCreate(BaseModel):
     secret: str
     events: list[str]
     enabled: bool = True
+    rate_limit_per_second: float | None = Field(None, gt=0)
+    rate_limit_burst: int | None = Field(None, ge=1)
+    batch_max_events: int | None = Field(None, ge=2, le=1000)
+    batch_linger_seconds: float | None = Field(None, gt=0, le=60)
+    store_response_body: bool = True
 
     @field_validator("events")
     @classmethod
@@ -37,6 +42,11 @@ class SubscriptionUpdate(BaseModel):
     secret: str | None = None
     events: list[str] | None = None
     enabled: bool | None = None
+    rate_limit_per_second: float | None = Field(None, gt=0)
+    rate_limit_burst: int | None = Field(None, ge=1)
+    batch_max_events: int | None = Field(None, ge=2, le=1000)
+    batch_linger_seconds: float | None = Field(None, gt=0, le=60)
+    store_response_body: bool | None = None
 
     @field_validator("events")
     @classmethod
@@ -64,6 +74,15 @@ class SubscriptionResponse(BaseModel):
     url: str
     events: list[str]
     enabled: bool
+    connector: str | None = None
+    rate_limit_per_second: float | None = None
+    rate_limit_burst: int | None = None
+    batch_max_events: int | None = None
+    batch_linger_seconds: float | None = None
+    store_response_body: bool = True
+    secret_version: int = 1
+    # Deliveries are signed with the previous secret too until then
+    previous_secret_expires_at: datetime | None = None
     created_at: datetime
     updated_at: datetime
 
@@ -0,0 +1,20 @@
+import json
+
+try:
+    import orjson
+except ImportError:  # optional: pip install integrations-hub[fast-json]
+    orjson = None
+
+
+def dumps(obj) -> str:
+    """Serialize to a JSON string, with orjson when it is installed.
+
+    orjson refuses integers beyond 64 bits, which are valid JSON; those values go
+    through the standard library instead.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj).decode()
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(obj)
@@ -0,0 +1,147 @@
+import enum
+import time
+from collections import deque
+from collections.abc import Callable
+from datetime import datetime, timezone
+
+import structlog
+
+from integrations_hub.config import settings
+
+logger = structlog.get_logger()
+
+
+class CircuitState(str, enum.Enum):
+    closed = "closed"
+    open = "open"
+    half_open = "half_open"
+
+
+class CircuitBreaker:
+    """Health of one destination host, from the outcomes of its recent deliveries.
+
+    The circuit opens once at least ``circuit_min_requests`` of the last
+    ``circuit_window_size`` deliveries were made and ``circuit_failure_rate_threshold``
+    of them failed. While open, deliveries are refused so they can be deferred.
+    After ``circuit_open_seconds`` the circuit goes half-open and lets one probe
+    through: success closes it, failure reopens it for twice as long (capped at
+    ``circuit_max_open_seconds``).
+    """
+
+    def __init__(self, host: str, clock: Callable[[], float] = time.monotonic):
+        self.host = host
+        self._clock = clock
+        self._outcomes: deque[bool] = deque(maxlen=settings.circuit_window_size)
+        self._state = CircuitState.closed
+        self._open_seconds = settings.circuit_open_seconds
+        self._open_until = 0.0
+        self._probing = False
+        self._probe_deadline = 0.0
+        self.opened_at: datetime | None = None
+
+    @property
+    def state(self) -> CircuitState:
+        if self._state == CircuitState.open and self._clock() >= self._open_until:
+            return CircuitState.half_open
+        return self._state
+
+    @property
+    def failure_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    @property
+    def recent_requests(self) -> int:
+        return len(self._outcomes)
+
+    def allow(self) -> bool:
+        """Whether a delivery may go out now; in half-open, only the probe may.
+
+        A probe that reports no result within the delivery timeout is given up on,
+        and the next delivery becomes the probe.
+        """
+        state = self.state
+        if state == CircuitState.closed:
+            return True
+        if state == CircuitState.half_open and (
+            not self._probing or self._clock() >= self._probe_deadline
+        ):
+            self._state = CircuitState.half_open
+            self._probing = True
+            self._probe_deadline = self._clock() + settings.delivery_timeout_seconds
+            return True
+        return False
+
+    def retry_after(self) -> float:
+        """Seconds until the circuit lets a delivery through again."""
+        if self.state == CircuitState.open:
+            return self._open_until - self._clock()
+        if self._probing:
+            # Wait out the probe; its result decides what happens next.
+            return max(self._probe_deadline - self._clock(), 0.0)
+        return 0.0
+
+    def record(self, healthy: bool) -> None:
+        if self._probing:
+            self._probing = False
+            if healthy:
+                self._close()
+            else:
+                self._open(min(self._open_seconds * 2, settings.circuit_max_open_seconds))
+            return
+        self._outcomes.append(healthy)
+        if (
+            self._state == CircuitState.closed
+            and len(self._outcomes) >= settings.circuit_min_requests
+            and self.failure_rate >= settings.circuit_failure_rate_threshold
+        ):
+            self._open(settings.circuit_open_seconds)
+
+    def reset(self) -> None:
+        self._probing = False
+        self._close()
+
+    def _open(self, seconds: float) -> None:
+        self._state = CircuitState.open
+        self._open_seconds = seconds
+        self._open_until = self._clock() + seconds
+        if self.opened_at is None:
+            self.opened_at = datetime.now(timezone.utc)
+        logger.warning(
+            "circuit_opened",
+            host=self.host,
+            failure_rate=round(self.failure_rate, 2),
+            open_seconds=seconds,
+        )
+
+    def _close(self) -> None:
+        if self._state != CircuitState.closed:
+            logger.info("circuit_closed", host=self.host)
+        self._state = CircuitState.closed
+        self._outcomes.clear()
+        self._open_seconds = settings.circuit_open_seconds
+        self.opened_at = None
+
+
+class CircuitBreakers:
+    """The delivery worker's circuit breakers, one per destination host."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._by_host: dict[str, CircuitBreaker] = {}
+
+    def for_host(self, host: str) -> CircuitBreaker:
+        breaker = self._by_host.get(host)
+        if breaker is None:
+            breaker = self._by_host[host] = CircuitBreaker(host, self._clock)
+        return breaker
+
+    def get(self, host: str) -> CircuitBreaker | None:
+        return self._by_host.get(host)
+
+    def items(self) -> list[tuple[str, CircuitBreaker]]:
+        return sorted(self._by_host.items())
+
+
+circuit_breakers = CircuitBreakers()
@@ -1,93 +1,192 @@
+import asyncio
 import json
+import time
 import uuid
+from collections import Counter, defaultdict, deque
+from collections.abc import Collection
 from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit
 
 import httpx
 import structlog
-from sqlalchemy import and_, select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from integrations_hub.config import settings
+from integrations_hub.connectors.slack import SLACK_CONNECTOR, post_slack_message, slack_error
+from integrations_hub.http_clients import RESPONSE_BODY_LIMIT, capped_body
+from integrations_hub.metrics import (
+    DELIVERY_STAGE_DURATION,
+    WEBHOOK_DEAD_LETTERS,
+    WEBHOOK_DELIVERIES,
+    WEBHOOK_DELIVERY_DURATION,
+    WEBHOOK_RETRIES,
+)
 from integrations_hub.models.tables import (
     DeadLetter,
     DeliveryAttempt,
+    DeliveryJob,
     DeliveryStatus,
     OutboxEvent,
     WebhookSubscription,
 )
-from integrations_hub.services.signing import sign_payload
+from integrations_hub.pagination import Cursor, Page, created_within, fetch_page
+from integrations_hub.services.circuit_breaker import CircuitBreaker, CircuitBreakers
+from integrations_hub.services.envelope import render_batch, render_signed_envelope
+from integrations_hub.services.outbox import finish_job, reopen_job
+from integrations_hub.services.rate_limit import (
+    RateLimiters,
+    TokenBucket,
+    is_throttled,
+    retry_after_seconds,
+)
+from integrations_hub.services.retry_schedule import RetrySchedule
+from integrations_hub.services.routing import RoutingTable
+from integrations_hub.services.signing import signer_for
 
 logger = structlog.get_logger()
 
-DELIVERY_COUNTER_SUCCESS = "webhook_delivery_success_total"
-DELIVERY_COUNTER_FAILURE = "webhook_delivery_failure_total"
 
+async def claim_due_deliveries(
+    session: AsyncSession,
+    worker_id: str,
+    limit: int | None = None,
+    exclude_subscriptions: Collection[uuid.UUID] = (),
+) -> list[tuple[OutboxEvent, uuid.UUID, int]]:
+    """Lease a batch of due delivery jobs to this worker.
 
-async def get_pending_deliveries(session: AsyncSession) -> list[OutboxEvent]:
-    """Find outbox events that have subscriptions needing delivery."""
+    Returns (event, subscription id, next attempt number) for each claimed job, in one
+    round trip that walks the partial "due now" index. Jobs locked by a concurrent
+    claim are skipped rather than waited on. Claiming pushes ``next_attempt_at`` out
+    by the lease length, so a job whose worker dies becomes due again by itself.
+    Jobs of ``exclude_subscriptions`` are left for later.
+    """
+    conditions = [
+        DeliveryJob.status == DeliveryStatus.pending,
+        DeliveryJob.next_attempt_at <= func.now(),
+        _subscription_enabled(),
+    ]
+    if exclude_subscriptions:
+        conditions.append(DeliveryJob.subscription_id.not_in(exclude_subscriptions))
+    candidates = (
+        select(DeliveryJob.id)
+        .where(*conditions)
+        .order_by(DeliveryJob.next_attempt_at.asc())
+        .limit(limit or settings.delivery_batch_size)
+        .with_for_update(skip_locked=True)
+        .correlate(None)
+        .scalar_subquery()
+    )
+    claimed = (
+        update(DeliveryJob)
+        .where(DeliveryJob.id.in_(candidates))
+        .values(locked_by=worker_id, next_attempt_at=_lease_expiry())
+        .returning(DeliveryJob.event_id, DeliveryJob.subscription_id, DeliveryJob.attempt_count)
+        .cte("claimed")
+    )
     result = await session.execute(
-        select(OutboxEvent).order_by(OutboxEvent.created_at.asc()).limit(50)
+        select(OutboxEvent, claimed.c.subscription_id, claimed.c.attempt_count + 1)
+        .select_from(claimed)
+        .join(OutboxEvent, OutboxEvent.id == claimed.c.event_id)
+        .order_by(OutboxEvent.created_at.asc())
     )
-    return list(result.scalars().all())
+    due = [tuple(row) for row in result.all()]
+    await session.commit()
+    return due
 
 
-async def get_matching_subscriptions(
-    session: AsyncSession, event_type: str
-) -> list[WebhookSubscription]:
-    """Find enabled subscriptions that listen for this event type."""
-    result = await session.execute(
-        select(WebhookSubscription).where(
-            WebhookSubscription.enabled.is_(True),
-            WebhookSubscription.events.contains(event_type),
+async def renew_delivery_leases(
+    session: AsyncSession,
+    worker_id: str,
+    jobs: Collection[tuple[uuid.UUID, uuid.UUID]] | None = None,
+) -> None:
+    """Push out the lease on the jobs this worker is still working.
+
+    ``jobs`` lists them as (event id, subscription id) pairs; without it, every job
+    leased to the worker is renewed.
+    """
+    conditions = [
+        DeliveryJob.locked_by == worker_id,
+        DeliveryJob.status == DeliveryStatus.pending,
+    ]
+    if jobs is not None:
+        conditions.append(tuple_(DeliveryJob.event_id, DeliveryJob.subscription_id).in_(jobs))
+    await session.execute(
+        update(DeliveryJob)
+        .where(*conditions)
+        .values(next_attempt_at=_lease_expiry())
+        .execution_options(synchronize_session=False)
+    )
+    await session.commit()
+
+
+async def release_deliveries(
+    session: AsyncSession,
+    worker_id: str,
+    jobs: Collection[tuple[uuid.UUID, uuid.UUID]],
+    delay_seconds: float = 0.0,
+    last_error: str | None = None,
+) -> None:
+    """Hand back leased jobs the worker won't finish, due again after ``delay_seconds``.
+
+    ``jobs`` are (event id, subscription id) pairs. Jobs leased to another worker
+    meanwhile are left alone. ``last_error`` is recorded if given.
+    """
+    await session.execute(
+        update(DeliveryJob)
+        .where(
+            tuple_(DeliveryJob.event_id, DeliveryJob.subscription_id).in_(jobs),
+            DeliveryJob.locked_by == worker_id,
+            DeliveryJob.status == DeliveryStatus.pending,
+        )
+        .values(
+            locked_by=None,
+            next_attempt_at=datetime.now(timezone.utc) + timedelta(seconds=delay_seconds),
+            **({"last_error": last_error} if last_error is not None else {}),
         )
+        .execution_options(synchronize_session=False)
     )
-    return list(result.scalars().all())
+    await session.commit()
 
 
-async def has_been_delivered(
-    session: AsyncSession, event_id: uuid.UUID, subscription_id: uuid.UUID
-) -> bool:
-    """Check idempotency: was this event already successfully delivered to this subscription?"""
+async def get_next_due_at(session: AsyncSession) -> datetime | None:
+    """When the earliest pending delivery job becomes due, if there is one."""
     result = await session.execute(
-        select(DeliveryAttempt).where(
-            DeliveryAttempt.event_id == event_id,
-            DeliveryAttempt.subscription_id == subscription_id,
-            DeliveryAttempt.status == DeliveryStatus.delivered,
+        select(func.min(DeliveryJob.next_attempt_at)).where(
+            DeliveryJob.status == DeliveryStatus.pending, _subscription_enabled()
         )
     )
-    return result.scalar_one_or_none() is not None
+    return result.scalar_one()
 
 
-async def is_dead_lettered(
-    session: AsyncSession, event_id: uuid.UUID, subscription_id: uuid.UUID
-) -> bool:
-    """Check if this event/subscription pair is already in the dead letter table."""
+async def get_due_times(session: AsyncSession, within: timedelta) -> list[datetime]:
+    """When each pending delivery job falls due over the coming ``within``."""
     result = await session.execute(
-        select(DeadLetter).where(
-            DeadLetter.event_id == event_id,
-            DeadLetter.subscription_id == subscription_id,
+        select(DeliveryJob.next_attempt_at).where(
+            DeliveryJob.status == DeliveryStatus.pending,
+            DeliveryJob.next_attempt_at > func.now(),
+            DeliveryJob.next_attempt_at <= func.now() + within,
+            _subscription_enabled(),
         )
     )
-    return result.scalar_one_or_none() is not None
+    return list(result.scalars().all())
 
 
-async def get_retry_attempt(
-    session: AsyncSession, event_id: uuid.UUID, subscription_id: uuid.UUID
-) -> DeliveryAttempt | None:
-    """Find the latest pending retry for this event/subscription pair."""
-    now = datetime.now(timezone.utc)
-    result = await session.execute(
-        select(DeliveryAttempt)
+def _subscription_enabled():
+    # Jobs of disabled subscriptions stay pending until re-enabled, but aren't due.
+    return (
+        select(WebhookSubscription.id)
         .where(
-            DeliveryAttempt.event_id == event_id,
-            DeliveryAttempt.subscription_id == subscription_id,
-            DeliveryAttempt.status == DeliveryStatus.pending,
-            DeliveryAttempt.next_retry_at <= now,
+            WebhookSubscription.id == DeliveryJob.subscription_id,
+            WebhookSubscription.enabled.is_(True),
         )
-        .order_by(DeliveryAttempt.attempt_number.desc())
-        .limit(1)
+        .exists()
     )
-    return result.scalar_one_or_none()
+
+
+def _lease_expiry():
+    return func.now() + timedelta(seconds=settings.delivery_lease_seconds)
 
 
 async def get_attempt_count(
@@ -95,12 +194,14 @@ async def get_attempt_count(
 ) -> int:
     """Count delivery attempts for this event/subscription pair."""
     result = await session.execute(
-        select(DeliveryAttempt).where(
+        select(func.count())
+        .select_from(DeliveryAttempt)
+        .where(
             DeliveryAttempt.event_id == event_id,
             DeliveryAttempt.subscription_id == subscription_id,
         )
     )
-    return len(result.scalars().all())
+    return result.scalar_one()
 
 
 async def deliver_webhook(
@@ -108,21 +209,27 @@ async def deliver_webhook(
     event: OutboxEvent,
     subscription: WebhookSubscription,
     http_client: httpx.AsyncClient,
+    attempt_number: int | None = None,
+    retries: RetrySchedule | None = None,
+    circuit: CircuitBreaker | None = None,
+    limiter: TokenBucket | None = None,
 ) -> bool:
-    """Attempt to deliver a webhook. Returns True if successful."""
-    payload_str = event.payload
-    signature, timestamp = sign_payload(payload_str, subscription.secret)
+    """Attempt to deliver a webhook. Returns True if successful.
 
-    body = {
-        "event_id": str(event.id),
-        "event_type": event.event_type.value,
-        "timestamp": timestamp,
-        "data": json.loads(payload_str),
-    }
-    body_str = json.dumps(body)
+    Every attempt is appended to the audit log, and the outcome is written back to
+    the pair's delivery job, releasing the worker's lease on it. ``attempt_number``
+    is normally supplied by the claim; when omitted it is derived from the attempt
+    history. A scheduled retry is also added to ``retries``, and the endpoint's
+    health (timeouts, connection errors and 5xx count against it) recorded on
+    ``circuit``, if given. Connector subscriptions (e.g. Slack) are sent through
+    their connector but share the same retry and dead-letter handling.
 
-    attempt_count = await get_attempt_count(session, event.id, subscription.id)
-    attempt_number = attempt_count + 1
+    A receiver that throttles (429, or 503 with ``Retry-After``) isn't charged an
+    attempt: the job is deferred past its ``Retry-After`` and the subscription's
+    ``limiter`` slows down.
+    """
+    if attempt_number is None:
+        attempt_number = await get_attempt_count(session, event.id, subscription.id) + 1
 
     attempt = DeliveryAttempt(
         event_id=event.id,
@@ -132,103 +239,778 @@ async def deliver_webhook(
     )
 
     try:
-        response = await http_client.post(
-            subscription.url,
-            content=body_str,
-            headers={
-                "Content-Type": "application/json",
-                "X-Webhook-Signature": signature,
-                "X-Webhook-Timestamp": str(timestamp),
-                "X-Webhook-Event": event.event_type.value,
-                "X-Webhook-Event-Id": str(event.id),
-            },
-            timeout=settings.delivery_timeout_seconds,
-        )
+        if subscription.connector == SLACK_CONNECTOR:
+            with DELIVERY_STAGE_DURATION.labels("http").time():
+                response = await post_slack_message(event)
+            error = slack_error(response)
+        else:
+            response = await _post_webhook(event, subscription, http_client)
+            error = None if 200 <= response.status_code < 300 else f"HTTP {response.status_code}"
+        throttled = is_throttled(response)
+        if circuit is not None:
+            circuit.record(response.status_code < 500 or throttled)
+        if throttled:
+            delay = (limiter or TokenBucket()).throttle(retry_after_seconds(response))
+            next_attempt_at, deferred = await defer_throttled(
+                session, [event.id], subscription.id, delay, last_error=error
+            )
+            if deferred:
+                if retries is not None:
+                    retries.add(next_attempt_at)
+                WEBHOOK_DELIVERIES.labels("throttled").inc()
+                logger.info(
+                    "webhook_delivery_throttled",
+                    event_id=str(event.id),
+                    subscription_id=str(subscription.id),
+                    status_code=response.status_code,
+                    retry_in_seconds=round(delay, 3),
+                )
+                return False
+            # Throttled too many times in a row: this one is charged as a failure.
+            error = error or f"HTTP {response.status_code}"
 
         attempt.http_status_code = response.status_code
-        attempt.response_body = response.text[:1000]
+        attempt.response_body = _stored_body(response, subscription)
 
-        if 200 <= response.status_code < 300:
+        if error is None:
+            if limiter is not None:
+                limiter.record_success()
             attempt.status = DeliveryStatus.delivered
-            session.add(attempt)
-            await session.commit()
-            logger.info(
-                "webhook_delivered",
-                event_id=str(event.id),
-                subscription_id=str(subscription.id),
-                status_code=response.status_code,
-            )
-            return True
         else:
             attempt.status = DeliveryStatus.failed
-            attempt.error_message = f"HTTP {response.status_code}"
+            attempt.error_message = error
 
     except httpx.TimeoutException:
         attempt.status = DeliveryStatus.failed
         attempt.error_message = "Request timed out"
+        if circuit is not None:
+            circuit.record(False)
     except httpx.RequestError as exc:
         attempt.status = DeliveryStatus.failed
         attempt.error_message = str(exc)[:500]
+        if circuit is not None:
+            circuit.record(False)
 
-    # Schedule retry or dead-letter
-    if attempt_number >= settings.delivery_max_attempts:
-        attempt.status = DeliveryStatus.dead_lettered
-        dead_letter = DeadLetter(
+    with DELIVERY_STAGE_DURATION.labels("commit").time():
+        await _settle_attempt(session, attempt)
+        await session.commit()
+    _count_outcome(attempt)
+    if retries is not None and attempt.next_retry_at is not None:
+        retries.add(attempt.next_retry_at)
+    return attempt.status == DeliveryStatus.delivered
+
+
+async def deliver_batch(
+    session: AsyncSession,
+    batch: list[tuple[OutboxEvent, int]],
+    subscription: WebhookSubscription,
+    http_client: httpx.AsyncClient,
+    retries: RetrySchedule | None = None,
+    circuit: CircuitBreaker | None = None,
+    limiter: TokenBucket | None = None,
+) -> int:
+    """Deliver several events to a batching subscription in one POST.
+
+    ``batch`` holds (event, attempt number) pairs; returns how many were delivered.
+    The body is a JSON array of the events' envelopes, signed as a whole. The
+    POST's outcome is recorded as an attempt of every event in it, each under its
+    own attempt number, so retries, dead-lettering and the audit log stay per
+    event and a failed event is simply retried in a later batch. A 2xx response
+    may name events the receiver could not take as ``{"failed": [event_id, ...]}``;
+    only those fail. If such a body was cut off at ``delivery_response_max_bytes``
+    and can't be read, the whole batch fails, since any of its events may be named
+    in the part that was dropped.
+
+    Throttling, ``circuit`` and ``limiter`` are handled as in ``deliver_webhook``,
+    once for the whole POST.
+    """
+    events = [event for event, _ in batch]
+    attempts = [
+        DeliveryAttempt(
             event_id=event.id,
             subscription_id=subscription.id,
+            attempt_number=attempt_number,
+            status=DeliveryStatus.pending,
+        )
+        for event, attempt_number in batch
+    ]
+
+    try:
+        response = await _post_batch(events, subscription, http_client)
+        ok = 200 <= response.status_code < 300
+        throttled = is_throttled(response)
+        if circuit is not None:
+            circuit.record(response.status_code < 500 or throttled)
+        if throttled:
+            delay = (limiter or TokenBucket()).throttle(retry_after_seconds(response))
+            next_attempt_at, deferred = await defer_throttled(
+                session,
+                [event.id for event in events],
+                subscription.id,
+                delay,
+                last_error=f"HTTP {response.status_code}",
+            )
+            if deferred:
+                if retries is not None:
+                    retries.add(next_attempt_at)
+                WEBHOOK_DELIVERIES.labels("throttled").inc(len(deferred))
+                logger.info(
+                    "webhook_batch_throttled",
+                    subscription_id=str(subscription.id),
+                    events=len(deferred),
+                    status_code=response.status_code,
+                    retry_in_seconds=round(delay, 3),
+                )
+            # Events throttled too many times in a row are charged a failure below.
+            attempts = [a for a in attempts if a.event_id not in deferred]
+            if not attempts:
+                return 0
+
+        body, truncated = capped_body(response)
+        rejected = _rejected_event_ids(body) if ok else set()
+        for attempt in attempts:
+            attempt.http_status_code = response.status_code
+            attempt.response_body = _stored_body(response, subscription)
+            if not ok:
+                attempt.status = DeliveryStatus.failed
+                attempt.error_message = f"HTTP {response.status_code}"
+            elif rejected is None and truncated:
+                attempt.status = DeliveryStatus.failed
+                attempt.error_message = "Response body truncated"
+            elif rejected and str(attempt.event_id) in rejected:
+                attempt.status = DeliveryStatus.failed
+                attempt.error_message = "Rejected by receiver"
+            else:
+                attempt.status = DeliveryStatus.delivered
+        if ok and limiter is not None:
+            limiter.record_success()
+
+    except httpx.TimeoutException:
+        _fail_all(attempts, "Request timed out")
+        if circuit is not None:
+            circuit.record(False)
+    except httpx.RequestError as exc:
+        _fail_all(attempts, str(exc)[:500])
+        if circuit is not None:
+            circuit.record(False)
+
+    with DELIVERY_STAGE_DURATION.labels("commit").time():
+        for attempt in attempts:
+            await _settle_attempt(session, attempt)
+        await session.commit()
+    for attempt in attempts:
+        _count_outcome(attempt)
+        if retries is not None and attempt.next_retry_at is not None:
+            retries.add(attempt.next_retry_at)
+    delivered = sum(attempt.status == DeliveryStatus.delivered for attempt in attempts)
+    logger.info(
+        "webhook_batch_sent",
+        subscription_id=str(subscription.id),
+        events=len(attempts),
+        delivered=delivered,
+    )
+    return delivered
+
+
+def _count_outcome(attempt: DeliveryAttempt) -> None:
+    WEBHOOK_DELIVERIES.labels(attempt.status.value).inc()
+    if attempt.status == DeliveryStatus.dead_lettered:
+        WEBHOOK_DEAD_LETTERS.labels(str(attempt.subscription_id)).inc()
+    elif attempt.next_retry_at is not None:
+        WEBHOOK_RETRIES.labels(str(attempt.subscription_id)).inc()
+
+
+def _stored_body(response: httpx.Response, subscription: WebhookSubscription) -> str | None:
+    if not subscription.store_response_body:
+        return None
+    # Decode only the bytes kept, not the whole capped body.
+    return response.content[:1000].decode(response.encoding or "utf-8", errors="replace")
+
+
+def _fail_all(attempts: list[DeliveryAttempt], error: str) -> None:
+    for attempt in attempts:
+        attempt.status = DeliveryStatus.failed
+        attempt.error_message = error
+
+
+def _rejected_event_ids(body: bytes) -> set[str] | None:
+    """Event ids a batch response lists as failed, or None if it isn't JSON."""
+    try:
+        parsed = json.loads(body)
+    except ValueError:
+        return None
+    failed = parsed.get("failed") if isinstance(parsed, dict) else None
+    return {str(event_id) for event_id in failed} if isinstance(failed, list) else set()
+
+
+async def _settle_attempt(session: AsyncSession, attempt: DeliveryAttempt) -> None:
+    """Log a finished attempt and write its outcome to the delivery job.
+
+    A failed attempt gets its retry scheduled, or is dead-lettered if it was the
+    last one allowed. The caller commits.
+    """
+    log = {"event_id": str(attempt.event_id), "subscription_id": str(attempt.subscription_id)}
+    if attempt.status == DeliveryStatus.delivered:
+        session.add(attempt)
+        await _update_job(
+            session,
+            attempt,
+            status=DeliveryStatus.delivered,
+            attempt_count=attempt.attempt_number,
+            last_error=None,
+        )
+        logger.info("webhook_delivered", **log, status_code=attempt.http_status_code)
+        return
+
+    if attempt.attempt_number >= settings.delivery_max_attempts:
+        attempt.status = DeliveryStatus.dead_lettered
+        dead_letter = DeadLetter(
+            event_id=attempt.event_id,
+            subscription_id=attempt.subscription_id,
             last_error=attempt.error_message,
-            total_attempts=attempt_number,
+            total_attempts=attempt.attempt_number,
         )
         session.add(dead_letter)
-        logger.warning(
-            "event_dead_lettered",
-            event_id=str(event.id),
-            subscription_id=str(subscription.id),
+        await _update_job(
+            session,
+            attempt,
+            status=DeliveryStatus.dead_lettered,
+            attempt_count=attempt.attempt_number,
+            last_error=attempt.error_message,
         )
+        logger.warning("event_dead_lettered", **log)
     else:
-        backoff = settings.delivery_backoff_base_seconds ** attempt_number
+        backoff = settings.delivery_backoff_base_seconds ** attempt.attempt_number
         attempt.next_retry_at = datetime.now(timezone.utc) + timedelta(seconds=backoff)
+        await _update_job(
+            session,
+            attempt,
+            attempt_count=attempt.attempt_number,
+            next_attempt_at=attempt.next_retry_at,
+            last_error=attempt.error_message,
+        )
         logger.info(
             "webhook_delivery_failed_will_retry",
-            event_id=str(event.id),
-            subscription_id=str(subscription.id),
-            attempt=attempt_number,
+            **log,
+            attempt=attempt.attempt_number,
             next_retry_seconds=backoff,
         )
-
     session.add(attempt)
+
+
+async def defer_delivery(
+    session: AsyncSession,
+    event_id: uuid.UUID,
+    subscription_id: uuid.UUID,
+    delay_seconds: float,
+    last_error: str | None = None,
+) -> datetime:
+    """Hand a claimed job back, due again after ``delay_seconds``.
+
+    Unlike a failed attempt this spends nothing: no attempt is logged and the
+    job's attempt count is left alone. ``last_error`` is recorded if given.
+    """
+    return await defer_deliveries(
+        session, [event_id], subscription_id, delay_seconds, last_error
+    )
+
+
+async def defer_deliveries(
+    session: AsyncSession,
+    event_ids: list[uuid.UUID],
+    subscription_id: uuid.UUID,
+    delay_seconds: float,
+    last_error: str | None = None,
+) -> datetime:
+    """``defer_delivery`` for several of one subscription's jobs at once."""
+    next_attempt_at = datetime.now(timezone.utc) + timedelta(seconds=delay_seconds)
+    await _defer_until(session, event_ids, subscription_id, next_attempt_at, last_error)
+    return next_attempt_at
+
+
+async def _defer_until(
+    session: AsyncSession,
+    event_ids: list[uuid.UUID],
+    subscription_id: uuid.UUID,
+    next_attempt_at: datetime,
+    last_error: str | None = None,
+) -> None:
+    await session.execute(
+        update(DeliveryJob)
+        .where(
+            DeliveryJob.event_id.in_(event_ids),
+            DeliveryJob.subscription_id == subscription_id,
+            DeliveryJob.status == DeliveryStatus.pending,
+        )
+        .values(
+            locked_by=None,
+            next_attempt_at=next_attempt_at,
+            **({"last_error": last_error} if last_error is not None else {}),
+        )
+        .execution_options(synchronize_session=False)
+    )
     await session.commit()
-    return False
 
 
-async def process_outbox(http_client: httpx.AsyncClient, session: AsyncSession) -> int:
-    """Process pending outbox events. Returns count of deliveries attempted."""
-    events = await get_pending_deliveries(session)
-    count = 0
+async def linger_batch(
+    session: AsyncSession,
+    event_ids: list[uuid.UUID],
+    subscription_id: uuid.UUID,
+    delay_seconds: float,
+) -> datetime:
+    """Hold a partial batch back for more events, as ``defer_deliveries``.
+
+    If the subscription already has jobs waiting to go out before ``delay_seconds``
+    is up, such as an earlier partial batch, these jobs are due with them instead.
+    Events that arrive one at a time therefore gather into the batch already
+    waiting, rather than each lingering on its own.
+    """
+    latest = datetime.now(timezone.utc) + timedelta(seconds=delay_seconds)
+    waiting = await session.scalar(
+        select(func.min(DeliveryJob.next_attempt_at)).where(
+            DeliveryJob.subscription_id == subscription_id,
+            DeliveryJob.status == DeliveryStatus.pending,
+            DeliveryJob.locked_by.is_(None),
+            DeliveryJob.next_attempt_at > func.now(),
+            DeliveryJob.next_attempt_at <= latest,
+        )
+    )
+    due_at = waiting or latest
+    await _defer_until(session, event_ids, subscription_id, due_at)
+    return due_at
 
-    for event in events:
-        subscriptions = await get_matching_subscriptions(session, event.event_type.value)
-        for sub in subscriptions:
-            # Idempotency: skip if already delivered
-            if await has_been_delivered(session, event.id, sub.id):
-                continue
 
-            # Skip if dead-lettered
-            if await is_dead_lettered(session, event.id, sub.id):
-                continue
+async def defer_throttled(
+    session: AsyncSession,
+    event_ids: list[uuid.UUID],
+    subscription_id: uuid.UUID,
+    delay_seconds: float,
+    last_error: str | None = None,
+) -> tuple[datetime, set[uuid.UUID]]:
+    """``defer_deliveries`` for jobs whose receiver throttled them.
 
-            # Check if there's a pending retry that's not yet due
-            attempt_count = await get_attempt_count(session, event.id, sub.id)
-            if attempt_count > 0:
-                retry = await get_retry_attempt(session, event.id, sub.id)
-                if retry is None:
-                    # Retry exists but not yet due
-                    continue
+    Only ``rate_limit_max_throttle_deferrals`` throttles in a row are free. A job
+    throttled once more is left claimed, for the caller to charge a failed
+    attempt. Returns the new due time and the ids of the jobs deferred.
+    """
+    next_attempt_at = datetime.now(timezone.utc) + timedelta(seconds=delay_seconds)
+    result = await session.execute(
+        update(DeliveryJob)
+        .where(
+            DeliveryJob.event_id.in_(event_ids),
+            DeliveryJob.subscription_id == subscription_id,
+            DeliveryJob.status == DeliveryStatus.pending,
+            DeliveryJob.throttle_count < settings.rate_limit_max_throttle_deferrals,
+        )
+        .values(
+            locked_by=None,
+            next_attempt_at=next_attempt_at,
+            throttle_count=DeliveryJob.throttle_count + 1,
+            **({"last_error": last_error} if last_error is not None else {}),
+        )
+        .returning(DeliveryJob.event_id)
+        .execution_options(synchronize_session=False)
+    )
+    deferred = set(result.scalars().all())
+    await session.commit()
+    return next_attempt_at, deferred
 
-            await deliver_webhook(session, event, sub, http_client)
-            count += 1
 
-    return count
+async def _post_webhook(
+    event: OutboxEvent, subscription: WebhookSubscription, http_client: httpx.AsyncClient
+) -> httpx.Response:
+    with DELIVERY_STAGE_DURATION.labels("sign").time():
+        timestamp = int(time.time())
+        body, signature = render_signed_envelope(event, timestamp, signer_for(subscription))
+    with DELIVERY_STAGE_DURATION.labels("http").time():
+        return await http_client.post(
+            subscription.url,
+            content=body,
+            headers={
+                "Content-Type": "application/json",
+                "X-Webhook-Signature": signature,
+                "X-Webhook-Timestamp": str(timestamp),
+                "X-Webhook-Event": event.event_type.value,
+                "X-Webhook-Event-Id": str(event.id),
+            },
+            timeout=settings.delivery_timeout_seconds,
+            # Only the status matters when the body won't be stored.
+            extensions={} if subscription.store_response_body else {RESPONSE_BODY_LIMIT: 0},
+        )
+
+
+async def _post_batch(
+    events: list[OutboxEvent],
+    subscription: WebhookSubscription,
+    http_client: httpx.AsyncClient,
+) -> httpx.Response:
+    with DELIVERY_STAGE_DURATION.labels("sign").time():
+        timestamp = int(time.time())
+        body = render_batch(events, timestamp)
+        signature = signer_for(subscription).sign(body, timestamp)
+    with DELIVERY_STAGE_DURATION.labels("http").time():
+        return await http_client.post(
+            subscription.url,
+            content=body,
+            headers={
+                "Content-Type": "application/json",
+                "X-Webhook-Signature": signature,
+                "X-Webhook-Timestamp": str(timestamp),
+                "X-Webhook-Batch-Size": str(len(events)),
+            },
+            timeout=settings.delivery_timeout_seconds,
+        )
+
+
+async def _update_job(session: AsyncSession, attempt: DeliveryAttempt, **values) -> None:
+    """Record an attempt's outcome on its delivery job and drop the claim on it.
+
+    Only a pending job is updated, so a late duplicate result can't reopen or
+    double-count a job that has already finished.
+    """
+    result = await session.execute(
+        update(DeliveryJob)
+        .where(
+            DeliveryJob.event_id == attempt.event_id,
+            DeliveryJob.subscription_id == attempt.subscription_id,
+            DeliveryJob.status == DeliveryStatus.pending,
+        )
+        .values(locked_by=None, throttle_count=0, **values)
+        .returning(DeliveryJob.id)
+        .execution_options(synchronize_session=False)
+    )
+    finished = values.get("status", DeliveryStatus.pending) != DeliveryStatus.pending
+    if finished and result.first() is not None:
+        await finish_job(session, attempt.event_id)
+
+
+async def process_outbox(
+    http_client: httpx.AsyncClient,
+    session_factory: async_sessionmaker[AsyncSession],
+    worker_id: str,
+    routes: RoutingTable | None = None,
+    retries: RetrySchedule | None = None,
+    breakers: CircuitBreakers | None = None,
+    limiters: RateLimiters | None = None,
+) -> int:
+    """Process due delivery jobs until none are left. Returns count of deliveries attempted.
+
+    The worker leases due jobs so that concurrent workers never work the same
+    delivery, and keeps the leases alive until it is done with them. Deliveries
+    run concurrently, and whenever some finish the worker claims more due jobs to
+    take their place, up to ``delivery_batch_size`` at a time. Each delivery
+    records its result through its own session, since an ``AsyncSession`` must not
+    be shared between tasks. Concurrency is capped globally and per destination
+    host; sends beyond a host's cap wait for that host alone, and its
+    subscriptions are left out of the claim until it catches up, so one slow
+    receiver cannot hold back deliveries to anyone else.
+
+    Subscriptions come from ``routes``, which a long-running worker keeps between
+    calls so that steady-state claims load nothing but the claimed jobs. Retries
+    scheduled by failed deliveries are added to ``retries``, if given.
+
+    With ``breakers``, deliveries to a host whose circuit is open are deferred
+    until the circuit lets them through again, without spending an attempt. With
+    ``limiters``, deliveries beyond a subscription's rate limit are deferred to
+    their turn the same way.
+
+    Jobs of a subscription with ``batch_max_events`` go out together, as batches
+    sent by ``deliver_batch``; a batch counts as one request against the rate
+    limit and the host's concurrency.
+    """
+    routes = routes or RoutingTable()
+    pipeline = _Pipeline(http_client, session_factory, worker_id, retries, breakers, limiters)
+    heartbeat = asyncio.create_task(_keep_leases_alive(session_factory, worker_id, pipeline))
+    attempted = 0
+    try:
+        while True:
+            room = settings.delivery_batch_size - pipeline.in_flight
+            if room > 0:
+                due = await _claim_due(
+                    session_factory, worker_id, routes, room, pipeline.saturated_subscriptions()
+                )
+                attempted += len(due)
+                pipeline.start(due)
+            if not pipeline.busy:
+                return attempted
+            # Wake up for the first delivery to finish, or to look for newly
+            # due jobs while slow deliveries are still out.
+            await pipeline.wait(settings.delivery_poll_interval_seconds)
+    finally:
+        heartbeat.cancel()
+        pipeline.cancel()
+
+
+async def _claim_due(
+    session_factory: async_sessionmaker[AsyncSession],
+    worker_id: str,
+    routes: RoutingTable,
+    limit: int,
+    exclude_subscriptions: set[uuid.UUID],
+) -> list[tuple[OutboxEvent, WebhookSubscription, int]]:
+    async with session_factory() as session:
+        with DELIVERY_STAGE_DURATION.labels("claim").time():
+            claimed = await claim_due_deliveries(
+                session, worker_id, limit, exclude_subscriptions=exclude_subscriptions
+            )
+        if not claimed:
+            return []
+        with DELIVERY_STAGE_DURATION.labels("routing").time():
+            subscriptions = await routes.resolve(
+                session, {sub_id for _, sub_id, _ in claimed}
+            )
+
+        due = []
+        skipped = []
+        for event, sub_id, attempt_number in claimed:
+            if sub_id in subscriptions:
+                due.append((event, subscriptions[sub_id], attempt_number))
+            else:
+                skipped.append((event.id, sub_id))
+                logger.info(
+                    "delivery_skipped_subscription_unavailable",
+                    event_id=str(event.id),
+                    subscription_id=str(sub_id),
+                )
+        if skipped:
+            # Disabled or deleted since the claim; the job stays pending, and
+            # the claim won't pick it up again while the subscription is off.
+            await release_deliveries(session, worker_id, skipped)
+    return due
+
+
+async def _keep_leases_alive(
+    session_factory: async_sessionmaker[AsyncSession], worker_id: str, pipeline: "_Pipeline"
+) -> None:
+    # Only the jobs still in the pipeline are renewed; any other lease, such as
+    # one a crashed delivery failed to hand back, runs out and the job comes due.
+    while True:
+        await asyncio.sleep(settings.delivery_lease_seconds / 3)
+        jobs = pipeline.held_jobs()
+        if not jobs:
+            continue
+        try:
+            async with session_factory() as session:
+                await renew_delivery_leases(session, worker_id, jobs)
+        except Exception:
+            logger.exception("delivery_lease_renewal_failed", worker_id=worker_id)
+
+
+class _Pipeline:
+    """The deliveries one ``process_outbox`` call has under way.
+
+    Sends to a host already at ``delivery_per_host_concurrency`` wait in that
+    host's queue and start as its earlier sends finish. Queued sends don't count
+    towards ``in_flight``, so they never take room from other hosts' deliveries.
+    While a host is at its cap its subscriptions are left out of the claim, which
+    keeps its queue to what a single claim returned.
+    """
+
+    def __init__(
+        self,
+        http_client: httpx.AsyncClient,
+        session_factory: async_sessionmaker[AsyncSession],
+        worker_id: str,
+        retries: RetrySchedule | None = None,
+        breakers: CircuitBreakers | None = None,
+        limiters: RateLimiters | None = None,
+    ):
+        self._http_client = http_client
+        self._session_factory = session_factory
+        self._worker_id = worker_id
+        self._retries = retries
+        self._breakers = breakers
+        self._limiters = limiters
+        self._global_slots = asyncio.Semaphore(settings.delivery_concurrency)
+        self._host_load: Counter[str] = Counter()
+        self._host_queues: dict[str, deque] = defaultdict(deque)
+        self._host_subscriptions: dict[str, set[uuid.UUID]] = defaultdict(set)
+        self._tasks: dict[asyncio.Task, tuple[WebhookSubscription, list, str | None]] = {}
+        self.in_flight = 0
+
+    @property
+    def busy(self) -> bool:
+        return bool(self._tasks)
+
+    def saturated_subscriptions(self) -> set[uuid.UUID]:
+        """Subscriptions whose host has no send slot left."""
+        return {
+            sub_id
+            for host, load in self._host_load.items()
+            if load >= settings.delivery_per_host_concurrency
+            for sub_id in self._host_subscriptions[host]
+        }
+
+    def start(self, due: list[tuple[OutboxEvent, WebhookSubscription, int]]) -> None:
+        sends, lingering = _plan_sends(due, datetime.now(timezone.utc))
+        for sub, batch, batched in sends:
+            host = urlsplit(sub.url).netloc
+            self._host_subscriptions[host].add(sub.id)
+            if self._host_load[host] < settings.delivery_per_host_concurrency:
+                self._host_load[host] += 1
+                self._spawn(self._deliver(sub, batch, batched, host), sub, batch, host)
+            else:
+                self._host_queues[host].append((sub, batch, batched))
+        for sub, batch, delay in lingering:
+            self._spawn(self._defer(sub, batch, delay, "batch_linger"), sub, batch, None)
+
+    async def wait(self, timeout: float) -> None:
+        """Wait up to ``timeout`` for deliveries to finish, and start queued sends."""
+        done, _ = await asyncio.wait(
+            self._tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+        )
+        for task in done:
+            sub, batch, host = self._tasks.pop(task)
+            self.in_flight -= len(batch)
+            if (error := task.exception()) is not None:
+                for event, _ in batch:
+                    logger.error(
+                        "webhook_delivery_error",
+                        event_id=str(event.id),
+                        subscription_id=str(sub.id),
+                        error=repr(error),
+                    )
+                await self._release(sub, batch, error)
+            if host is not None:
+                self._release_host(host)
+
+    def cancel(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+
+    def held_jobs(self) -> list[tuple[uuid.UUID, uuid.UUID]]:
+        """(event id, subscription id) of every job under way or queued for its host."""
+        held = [(sub, batch) for sub, batch, _ in self._tasks.values()]
+        held += [(sub, batch) for queue in self._host_queues.values() for sub, batch, _ in queue]
+        return [(event.id, sub.id) for sub, batch in held for event, _ in batch]
+
+    async def _release(self, sub: WebhookSubscription, batch: list, error: Exception) -> None:
+        # The delivery broke off without settling its jobs; hand them back after
+        # a backoff rather than leave them leased to this worker.
+        try:
+            async with self._session_factory() as session:
+                await release_deliveries(
+                    session,
+                    self._worker_id,
+                    [(event.id, sub.id) for event, _ in batch],
+                    settings.delivery_backoff_base_seconds,
+                    last_error=repr(error)[:500],
+                )
+        except Exception:
+            logger.exception("delivery_release_failed", subscription_id=str(sub.id))
+
+    def _spawn(self, delivery, sub: WebhookSubscription, batch: list, host: str | None) -> None:
+        self.in_flight += len(batch)
+        self._tasks[asyncio.create_task(delivery)] = (sub, batch, host)
+
+    def _release_host(self, host: str) -> None:
+        queue = self._host_queues[host]
+        if queue:
+            sub, batch, batched = queue.popleft()
+            self._spawn(self._deliver(sub, batch, batched, host), sub, batch, host)
+            return
+        self._host_load[host] -= 1
+        if not self._host_load[host]:
+            del self._host_load[host], self._host_queues[host], self._host_subscriptions[host]
+
+    async def _defer(
+        self,
+        sub: WebhookSubscription,
+        batch: list[tuple[OutboxEvent, int]],
+        delay: float,
+        reason: str,
+    ) -> None:
+        defer = linger_batch if reason == "batch_linger" else defer_deliveries
+        async with self._session_factory() as defer_session:
+            due_at = await defer(defer_session, [event.id for event, _ in batch], sub.id, delay)
+        if self._retries is not None:
+            self._retries.add(due_at)
+        for event, _ in batch:
+            logger.info(
+                "delivery_deferred",
+                event_id=str(event.id),
+                subscription_id=str(sub.id),
+                reason=reason,
+                retry_in_seconds=round(delay, 3),
+            )
+
+    async def _deliver(
+        self,
+        sub: WebhookSubscription,
+        batch: list[tuple[OutboxEvent, int]],
+        batched: bool,
+        host: str,
+    ) -> None:
+        limiter = self._limiters.for_subscription(sub) if self._limiters is not None else None
+        if limiter is not None and (delay := limiter.acquire()) > 0:
+            await self._defer(sub, batch, delay, "rate_limited")
+            return
+        async with self._global_slots:
+            circuit = self._breakers.for_host(host) if self._breakers is not None else None
+            if circuit is not None and not circuit.allow():
+                await self._defer(sub, batch, circuit.retry_after(), "circuit_open")
+                return
+            async with self._session_factory() as delivery_session:
+                with WEBHOOK_DELIVERY_DURATION.time():
+                    if batched:
+                        await deliver_batch(
+                            delivery_session,
+                            batch,
+                            sub,
+                            self._http_client,
+                            retries=self._retries,
+                            circuit=circuit,
+                            limiter=limiter,
+                        )
+                    else:
+                        [(event, attempt_number)] = batch
+                        await deliver_webhook(
+                            delivery_session,
+                            event,
+                            sub,
+                            self._http_client,
+                            attempt_number=attempt_number,
+                            retries=self._retries,
+                            circuit=circuit,
+                            limiter=limiter,
+                        )
+
+
+def _plan_sends(due: list[tuple[OutboxEvent, WebhookSubscription, int]], now: datetime):
+    """Split claimed deliveries into the POSTs to make now, and batches to hold back.
+
+    Each send is ``(sub, [(event, attempt_number), ...], batched)``. Deliveries to
+    a subscription without batching are sent one by one; those to a batching
+    subscription are chunked into batches of up to ``batch_max_events``, oldest
+    first. A batch that isn't full waits until its oldest event is
+    ``batch_linger_seconds`` old, for more events to join it; it is returned as
+    ``(sub, batch, delay)`` in the second list, and deferred by ``linger_batch``.
+    """
+    sends = []
+    lingering = []
+    batching: dict[uuid.UUID, list[tuple[OutboxEvent, int]]] = defaultdict(list)
+    subscriptions: dict[uuid.UUID, WebhookSubscription] = {}
+    for event, sub, attempt_number in due:
+        if sub.batch_max_events is None or sub.connector is not None:
+            sends.append((sub, [(event, attempt_number)], False))
+        else:
+            batching[sub.id].append((event, attempt_number))
+            subscriptions[sub.id] = sub
+
+    for sub_id, pending in batching.items():
+        sub = subscriptions[sub_id]
+        pending.sort(key=lambda item: item[0].created_at)
+        size = sub.batch_max_events
+        for start in range(0, len(pending), size):
+            batch = pending[start : start + size]
+            linger = (sub.batch_linger_seconds or 0) - (
+                now - batch[0][0].created_at
+            ).total_seconds()
+            if len(batch) < size and linger > 0:
+                lingering.append((sub, batch, linger))
+            else:
+                sends.append((sub, batch, True))
+    return sends, lingering
 
 
 async def replay_dead_letter(
@@ -244,22 +1026,30 @@ async def replay_dead_letter(
     if event is None or sub is None:
         return False
 
-    # Remove the dead letter entry so it can be redelivered
+    # Remove the dead letter entry and hand the job back to this request; the
+    # lease keeps workers off it while it is redelivered inline below.
     await session.delete(dl)
-
-    # Reset any dead_lettered attempts to allow new attempts
-    result = await session.execute(
-        select(DeliveryAttempt).where(
-            and_(
-                DeliveryAttempt.event_id == dl.event_id,
-                DeliveryAttempt.subscription_id == dl.subscription_id,
-                DeliveryAttempt.status == DeliveryStatus.dead_lettered,
-            )
+    reopened = await session.execute(
+        pg_insert(DeliveryJob)
+        .values(
+            event_id=dl.event_id,
+            subscription_id=dl.subscription_id,
+            locked_by="replay",
+            next_attempt_at=_lease_expiry(),
+        )
+        .on_conflict_do_update(
+            constraint="uq_delivery_job_event_sub",
+            set_={
+                "status": DeliveryStatus.pending,
+                "locked_by": "replay",
+                "next_attempt_at": _lease_expiry(),
+            },
+            where=DeliveryJob.status != DeliveryStatus.pending,
         )
+        .returning(DeliveryJob.id)
     )
-    for attempt in result.scalars().all():
-        attempt.status = DeliveryStatus.failed
-
+    if reopened.first() is not None:
+        await reopen_job(session, dl.event_id)
     await session.commit()
 
     success = await deliver_webhook(session, event, sub, http_client)
@@ -272,12 +1062,34 @@ async def replay_dead_letter(
 
 
 async def get_delivery_attempts(
-    session: AsyncSession, event_id: uuid.UUID
-) -> list[DeliveryAttempt]:
-    """Get all delivery attempts for an event."""
-    result = await session.execute(
-        select(DeliveryAttempt)
-        .where(DeliveryAttempt.event_id == event_id)
-        .order_by(DeliveryAttempt.created_at.asc())
-    )
-    return list(result.scalars().all())
+    session: AsyncSession,
+    event_id: uuid.UUID,
+    *,
+    subscription_id: uuid.UUID | None = None,
+    status: DeliveryStatus | None = None,
+    after: Cursor | None = None,
+    limit: int = 50,
+) -> Page[DeliveryAttempt]:
+    """One page of an event's delivery attempts, oldest first."""
+    stmt = select(DeliveryAttempt).where(DeliveryAttempt.event_id == event_id)
+    if subscription_id is not None:
+        stmt = stmt.where(DeliveryAttempt.subscription_id == subscription_id)
+    if status is not None:
+        stmt = stmt.where(DeliveryAttempt.status == status)
+    return await fetch_page(session, stmt, DeliveryAttempt, after=after, limit=limit)
+
+
+async def list_dead_letters(
+    session: AsyncSession,
+    *,
+    subscription_id: uuid.UUID | None = None,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+    after: Cursor | None = None,
+    limit: int = 50,
+) -> Page[DeadLetter]:
+    """One page of dead letters, newest first."""
+    stmt = select(DeadLetter).where(*created_within(DeadLetter, created_after, created_before))
+    if subscription_id is not None:
+        stmt = stmt.where(DeadLetter.subscription_id == subscription_id)
+    return await fetch_page(session, stmt, DeadLetter, after=after, limit=limit, descending=True)
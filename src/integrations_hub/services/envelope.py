@@ -0,0 +1,86 @@
+import uuid
+from collections import OrderedDict
+
+from integrations_hub.config import settings
+from integrations_hub.models.tables import OutboxEvent
+from integrations_hub.serialization import dumps
+from integrations_hub.services.signing import Signer
+
+_DATA_KEY = b', "data": '
+
+
+def render_envelope(event: OutboxEvent, timestamp: int) -> bytes:
+    """The webhook request body for an event, as sent to every subscription.
+
+    The stored payload is spliced in verbatim rather than parsed and re-serialized,
+    and the parts around the timestamp are rendered once per event and reused for
+    every subscription and retry. The envelope is laid out like ``json.dumps`` of
+    the envelope dict, with ``data`` exactly as it was stored at ingest.
+    """
+    head, tail, _ = _parts_cache.get(event)
+    return head + str(timestamp).encode() + tail
+
+
+class _PartsCache:
+    """Least recently used envelope parts, bounded by their total size in bytes.
+
+    Events are immutable once published, so entries are keyed by event id alone.
+    """
+
+    def __init__(self):
+        self._entries: OrderedDict[uuid.UUID, tuple[bytes, bytes, memoryview]] = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, event: OutboxEvent) -> tuple[bytes, bytes, memoryview]:
+        parts = self._entries.get(event.id)
+        if parts is not None:
+            self.hits += 1
+            self._entries.move_to_end(event.id)
+            return parts
+        self.misses += 1
+        parts = _render_parts(event)
+        size = _size(parts)
+        if size <= settings.envelope_cache_max_bytes:
+            self._entries[event.id] = parts
+            self.size += size
+            while self.size > settings.envelope_cache_max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= _size(evicted)
+        return parts
+
+
+def _render_parts(event: OutboxEvent) -> tuple[bytes, bytes, memoryview]:
+    event_id, event_type = dumps(str(event.id)), dumps(event.event_type.value)
+    head = f'{{"event_id": {event_id}, "event_type": {event_type}, "timestamp": '
+    tail = _DATA_KEY + event.payload.encode() + b"}"
+    # The payload's UTF-8 bytes, as a view into the tail rather than a copy
+    encoded = memoryview(tail)[len(_DATA_KEY) : -1]
+    return head.encode(), tail, encoded
+
+
+def _size(parts: tuple[bytes, bytes, memoryview]) -> int:
+    head, tail, _ = parts
+    return len(head) + len(tail)
+
+
+_parts_cache = _PartsCache()
+
+
+def render_signed_envelope(
+    event: OutboxEvent, timestamp: int, signer: Signer
+) -> tuple[bytes, str]:
+    """``render_envelope`` together with the signature of the event's payload.
+
+    The payload is signed straight out of the cached envelope parts, so it is
+    encoded once per event however many subscriptions and retries sign it.
+    """
+    head, tail, encoded = _parts_cache.get(event)
+    signature = signer.sign(encoded, timestamp)
+    return head + str(timestamp).encode() + tail, signature
+
+
+def render_batch(events: list[OutboxEvent], timestamp: int) -> bytes:
+    """The request body for a batch: a JSON array of the events' envelopes."""
+    return b"[" + b", ".join(render_envelope(event, timestamp) for event in events) + b"]"
@@ -1,28 +1,197 @@
-import json
 import uuid
+from collections import Counter
+from datetime import datetime
 
 import structlog
+from sqlalchemy import Text, and_, bindparam, case, cast, func, insert, select, update
+from sqlalchemy.dialects.postgresql import array
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from integrations_hub.models.tables import EventType, OutboxEvent
+from integrations_hub.metrics import EVENTS_PUBLISHED
+from integrations_hub.models.tables import DeliveryJob, EventType, OutboxEvent, WebhookSubscription
+from integrations_hub.pagination import Cursor, Page, created_within, fetch_page
+from integrations_hub.serialization import dumps
 
 logger = structlog.get_logger()
 
+# Postgres NOTIFY channel the delivery worker listens on for new outbox rows
+OUTBOX_CHANNEL = "outbox_events"
+
 
 async def publish_event(
     session: AsyncSession, event_type: str, payload: dict
 ) -> OutboxEvent:
-    """Write an event to the outbox table for async delivery."""
-    event = OutboxEvent(
-        event_type=EventType(event_type),
-        payload=json.dumps(payload),
-    )
-    session.add(event)
+    """Write an event to the outbox table for async delivery.
+
+    The delivery jobs for every matching subscription are created in the same
+    transaction, so the worker never has to work out routing after the fact.
+    """
+    (event,) = await _insert_events(session, [(event_type, payload)])
     await session.commit()
-    await session.refresh(event)
+    EVENTS_PUBLISHED.labels(event_type).inc()
     logger.info("event_published", event_id=str(event.id), event_type=event_type)
     return event
 
 
+async def publish_events(
+    session: AsyncSession, events: list[tuple[str, dict]]
+) -> list[OutboxEvent]:
+    """Write a batch of (event type, payload) pairs to the outbox in one transaction.
+
+    The rows go in with a single multi-row INSERT ... RETURNING, and their delivery
+    jobs with one more statement, so the cost per event shrinks as batches grow.
+    """
+    published = await _insert_events(session, events)
+    await session.commit()
+    for event_type, count in Counter(event_type for event_type, _ in events).items():
+        EVENTS_PUBLISHED.labels(event_type).inc(count)
+    logger.info("events_published", count=len(published))
+    return published
+
+
+async def _insert_events(
+    session: AsyncSession, events: list[tuple[str, dict]]
+) -> list[OutboxEvent]:
+    result = await session.execute(
+        insert(OutboxEvent).returning(OutboxEvent, sort_by_parameter_order=True),
+        [
+            {"event_type": EventType(event_type), "payload": dumps(payload)}
+            for event_type, payload in events
+        ],
+    )
+    published = list(result.scalars().all())
+    await create_delivery_jobs(session, published)
+    # Delivered to listeners only once the transaction commits
+    await session.execute(select(func.pg_notify(OUTBOX_CHANNEL, str(published[0].id))))
+    return published
+
+
+async def create_delivery_jobs(session: AsyncSession, events: list[OutboxEvent]) -> None:
+    """Fan events out into one pending delivery job per matching enabled subscription.
+
+    Each event's pending job count is set in the same statement, and the given
+    objects are refreshed from its RETURNING; an event nobody subscribes to is
+    complete straight away.
+    """
+    event_ids = [event.id for event in events]
+    matching = (
+        select(OutboxEvent.id, WebhookSubscription.id)
+        .join(
+            WebhookSubscription,
+            and_(
+                WebhookSubscription.enabled.is_(True),
+                WebhookSubscription.events.contains(array([cast(OutboxEvent.event_type, Text)])),
+            ),
+        )
+        .where(OutboxEvent.id.in_(event_ids))
+    )
+    jobs = (
+        insert(DeliveryJob)
+        .from_select(["event_id", "subscription_id"], matching)
+        .returning(DeliveryJob.event_id)
+        .cte("jobs")
+    )
+    job_count = func.coalesce(
+        select(func.count())
+        .where(jobs.c.event_id == OutboxEvent.id)
+        .correlate(OutboxEvent)
+        .scalar_subquery(),
+        0,
+    )
+    await session.execute(
+        update(OutboxEvent)
+        .where(OutboxEvent.id.in_(event_ids))
+        .values(
+            pending_jobs=job_count,
+            completed_at=case((job_count == 0, func.now()), else_=None),
+        )
+        .returning(OutboxEvent)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+
+
+async def finish_job(session: AsyncSession, event_id: uuid.UUID) -> None:
+    """Count one of the event's jobs as delivered or dead-lettered.
+
+    The row lock taken by the UPDATE serialises concurrent finishers, so the last
+    one reliably sees the count reach zero and marks the event complete.
+    """
+    await session.execute(
+        update(OutboxEvent)
+        .where(OutboxEvent.id == event_id)
+        .values(
+            pending_jobs=OutboxEvent.pending_jobs - 1,
+            completed_at=case((OutboxEvent.pending_jobs <= 1, func.now()), else_=None),
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def finish_jobs(session: AsyncSession, event_ids: list[uuid.UUID]) -> None:
+    """``finish_job`` for many events at once, one job each."""
+    if not event_ids:
+        return
+    outbox = OutboxEvent.__table__
+    await session.execute(
+        update(outbox)
+        .where(outbox.c.id == bindparam("event_id"))
+        .values(
+            pending_jobs=outbox.c.pending_jobs - 1,
+            completed_at=case((outbox.c.pending_jobs <= 1, func.now()), else_=None),
+        ),
+        [{"event_id": event_id} for event_id in event_ids],
+    )
+
+
+async def reopen_job(session: AsyncSession, event_id: uuid.UUID) -> None:
+    """Count a job that went back to pending, e.g. a replayed dead letter."""
+    await reopen_jobs(session, Counter([event_id]))
+
+
+async def reopen_jobs(session: AsyncSession, reopened: Counter[uuid.UUID]) -> None:
+    """``reopen_job`` for many events at once, given how many jobs each reopened."""
+    if not reopened:
+        return
+    outbox = OutboxEvent.__table__
+    await session.execute(
+        update(outbox)
+        .where(outbox.c.id == bindparam("event_id"))
+        .values(pending_jobs=outbox.c.pending_jobs + bindparam("reopened"), completed_at=None),
+        [{"event_id": event_id, "reopened": count} for event_id, count in reopened.items()],
+    )
+
+
+async def get_pending_events(
+    session: AsyncSession,
+    limit: int = 50,
+    *,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+    after: Cursor | None = None,
+) -> Page[OutboxEvent]:
+    """One page of the events that still have deliveries outstanding, oldest first.
+
+    Served by the partial index over unfinished events, so the cost tracks the
+    backlog rather than the size of the outbox history.
+    """
+    stmt = select(OutboxEvent).where(
+        OutboxEvent.completed_at.is_(None),
+        *created_within(OutboxEvent, created_after, created_before),
+    )
+    return await fetch_page(session, stmt, OutboxEvent, after=after, limit=limit)
+
+
+async def get_backlog(session: AsyncSession) -> tuple[int, datetime | None]:
+    """How many events still have deliveries outstanding, and when the oldest was
+    published; served by the same partial index as ``get_pending_events``."""
+    result = await session.execute(
+        select(func.count(), func.min(OutboxEvent.created_at)).where(
+            OutboxEvent.completed_at.is_(None)
+        )
+    )
+    count, oldest = result.one()
+    return count, oldest
+
+
 async def get_event(session: AsyncSession, event_id: uuid.UUID) -> OutboxEvent | None:
     return await session.get(OutboxEvent, event_id)
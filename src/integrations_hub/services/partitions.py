@@ -0,0 +1,181 @@
+import re
+from datetime import datetime, timedelta, timezone
+
+import structlog
+from sqlalchemy import func, select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from integrations_hub.config import settings
+
+logger = structlog.get_logger()
+
+# Tables range-partitioned by month on created_at
+PARTITIONED_TABLES = ("outbox_events", "delivery_attempts")
+
+# pg_try_advisory_xact_lock key, so one process at a time runs maintenance
+MAINTENANCE_LOCK_KEY = 0x1A7E_0013
+
+
+def month_start(moment: datetime) -> datetime:
+    moment = moment.astimezone(timezone.utc)
+    return moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return month.replace(year=index // 12, month=index % 12 + 1)
+
+
+def partition_name(table: str, month: datetime) -> str:
+    return f"{table}_p{month:%Y_%m}"
+
+
+async def list_partitions(session: AsyncSession, table: str) -> dict[str, datetime]:
+    """Monthly partitions of a table by name, with the month each one covers.
+
+    The DEFAULT partition and any partitions not named by ``partition_name`` are
+    left out, so maintenance never touches them.
+    """
+    result = await session.execute(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = CAST(:parent AS regclass)"
+        ),
+        {"parent": table},
+    )
+    pattern = re.compile(rf"^{table}_p(\d{{4}})_(\d{{2}})$")
+    partitions = {}
+    for (name,) in result:
+        match = pattern.match(name)
+        if match:
+            year, month = int(match.group(1)), int(match.group(2))
+            partitions[name] = datetime(year, month, 1, tzinfo=timezone.utc)
+    return partitions
+
+
+async def create_partitions(session: AsyncSession, now: datetime | None = None) -> list[str]:
+    """Create this month's partitions and ``partition_premake_months`` ahead.
+
+    Premade partitions are empty when created, which keeps the DDL instant; a month
+    whose rows already sit in the DEFAULT partition is logged and skipped.
+    """
+    start = month_start(now or datetime.now(timezone.utc))
+    created = []
+    for table in PARTITIONED_TABLES:
+        existing = await list_partitions(session, table)
+        for offset in range(settings.partition_premake_months + 1):
+            month = add_months(start, offset)
+            name = partition_name(table, month)
+            if name in existing:
+                continue
+            try:
+                async with session.begin_nested():
+                    await session.execute(
+                        text(
+                            f'CREATE TABLE "{name}" PARTITION OF {table} '
+                            f"FOR VALUES FROM ('{month.isoformat()}') "
+                            f"TO ('{add_months(month, 1).isoformat()}')"
+                        )
+                    )
+            except DBAPIError as exc:
+                logger.error("partition_create_failed", partition=name, error=str(exc.orig))
+                continue
+            created.append(name)
+            logger.info("partition_created", partition=name)
+    return created
+
+
+async def prune_partitions(session: AsyncSession, now: datetime | None = None) -> list[str]:
+    """Drop (or with ``retention_archive``, detach) partitions past ``retention_days``.
+
+    Off unless ``retention_days`` is set. A partition goes once its whole month is
+    older than the retention window. Event partitions still holding events awaiting
+    delivery are kept until those finish, which for a disabled subscription's jobs
+    means until it is re-enabled or deleted. The events' delivery jobs and dead
+    letters aren't partitioned; ``prune_finished_jobs`` expires them separately.
+    """
+    if settings.retention_days <= 0:
+        return []
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=settings.retention_days)
+    pruned = []
+    for table in PARTITIONED_TABLES:
+        for name, month in sorted((await list_partitions(session, table)).items()):
+            if add_months(month, 1) > cutoff:
+                continue
+            if table == "outbox_events":
+                unfinished = await session.scalar(
+                    text(f'SELECT EXISTS (SELECT 1 FROM "{name}" WHERE completed_at IS NULL)')
+                )
+                if unfinished:
+                    logger.warning("partition_prune_deferred", partition=name)
+                    continue
+            if settings.retention_archive:
+                await session.execute(text(f'ALTER TABLE {table} DETACH PARTITION "{name}"'))
+            else:
+                await session.execute(text(f'DROP TABLE "{name}"'))
+            pruned.append(name)
+            logger.info(
+                "partition_pruned",
+                partition=name,
+                action="detached" if settings.retention_archive else "dropped",
+            )
+    return pruned
+
+
+async def prune_finished_jobs(session: AsyncSession, now: datetime | None = None) -> int:
+    """Delete dead letters and finished delivery jobs older than ``retention_days``.
+
+    Off unless ``retention_days`` is set. Rows go in batches of
+    ``retention_delete_batch_size``, each committed on its own, so no single
+    statement holds locks on a large part of either table. A finished job is kept
+    while its dead letter is, since replaying the dead letter reopens the job.
+    Returns how many rows were deleted.
+    """
+    if settings.retention_days <= 0:
+        return 0
+    cutoff = (now or datetime.now(timezone.utc)) - timedelta(days=settings.retention_days)
+    params = {"cutoff": cutoff, "batch": settings.retention_delete_batch_size}
+    deleted = 0
+    for table, expired in (
+        ("dead_letters", "SELECT id FROM dead_letters WHERE created_at < :cutoff"),
+        (
+            "delivery_jobs",
+            "SELECT j.id FROM delivery_jobs j "
+            "WHERE j.status <> 'pending' AND j.updated_at < :cutoff AND NOT EXISTS ("
+            "SELECT 1 FROM dead_letters d "
+            "WHERE d.event_id = j.event_id AND d.subscription_id = j.subscription_id)",
+        ),
+    ):
+        while True:
+            result = await session.execute(
+                text(
+                    f"DELETE FROM {table} WHERE id IN "
+                    f"({expired} LIMIT :batch FOR UPDATE SKIP LOCKED)"
+                ),
+                params,
+            )
+            await session.commit()
+            deleted += result.rowcount
+            if result.rowcount < settings.retention_delete_batch_size:
+                break
+    if deleted:
+        logger.info("finished_jobs_pruned", deleted=deleted)
+    return deleted
+
+
+async def run_partition_maintenance(session: AsyncSession, now: datetime | None = None) -> bool:
+    """Create upcoming partitions and prune expired ones, in one transaction, then
+    expire finished jobs and dead letters.
+
+    Returns False without doing anything when another process holds the
+    maintenance lock.
+    """
+    locked = await session.scalar(select(func.pg_try_advisory_xact_lock(MAINTENANCE_LOCK_KEY)))
+    if not locked:
+        return False
+    await create_partitions(session, now)
+    await prune_partitions(session, now)
+    await session.commit()
+    await prune_finished_jobs(session, now)
+    return True
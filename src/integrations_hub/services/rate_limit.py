@@ -0,0 +1,164 @@
+import math
+import time
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+from integrations_hub.config import settings
+from integrations_hub.models.tables import WebhookSubscription
+
+# A throttled receiver halves the sending rate; each delivery it accepts wins back
+# a tenth of the configured rate, down to no less than a sixteenth of it.
+_THROTTLE_FACTOR = 0.5
+_RECOVERY_STEP = 0.1
+_MIN_RATE_FRACTION = 1 / 16
+
+
+class TokenBucket:
+    """Sending rate of one subscription, as a token bucket.
+
+    ``rate`` tokens per second refill a bucket holding up to ``burst`` (by default
+    one second's worth). A delivery that finds no token is given a later slot
+    instead, one token interval after the last slot handed out, so a backlog comes
+    back due at exactly the rate the receiver accepts.
+
+    When the receiver throttles, nothing is sent before its ``Retry-After`` and the
+    effective rate drops, recovering as deliveries succeed again. A subscription
+    without a configured rate is never limited except by ``Retry-After``.
+    """
+
+    def __init__(
+        self,
+        rate: float | None = None,
+        burst: int | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._clock = clock
+        self.configure(rate, burst)
+        self._tokens = float(self.burst)
+        self._updated = clock()
+        self._blocked_until = 0.0
+        self._next_slot = 0.0
+
+    @property
+    def effective_rate(self) -> float | None:
+        return self._effective_rate
+
+    def configure(self, rate: float | None, burst: int | None) -> None:
+        self.configured = (rate, burst)
+        self.rate = rate
+        self.burst = burst or (max(1, math.ceil(rate)) if rate else 1)
+        self._effective_rate = rate
+
+    def acquire(self) -> float:
+        """Take a token and return 0, or return how long to defer this delivery."""
+        now = self._clock()
+        self._refill(now)
+        if now >= self._blocked_until and (self.rate is None or self._tokens >= 1):
+            if self.rate is not None:
+                self._tokens -= 1
+            return 0.0
+        return self._take_slot(now)
+
+    def throttle(self, retry_after: float | None) -> float:
+        """Slow down after the receiver throttled us; returns the delay for the
+        throttled delivery."""
+        now = self._clock()
+        self._refill(now)
+        if self.rate is not None:
+            self._effective_rate = max(
+                self._effective_rate * _THROTTLE_FACTOR, self.rate * _MIN_RATE_FRACTION
+            )
+        # Never less than the backoff base: an immediate retry of a throttled
+        # delivery costs no attempt, so a "Retry-After: 0" would loop forever.
+        retry_after = max(
+            retry_after or 0.0, self._interval(), settings.delivery_backoff_base_seconds
+        )
+        self._blocked_until = max(self._blocked_until, now + retry_after)
+        self._tokens = min(self._tokens, 0.0)
+        return self._take_slot(now)
+
+    def record_success(self) -> None:
+        if self.rate is not None and self._effective_rate < self.rate:
+            self._effective_rate = min(
+                self.rate, self._effective_rate + self.rate * _RECOVERY_STEP
+            )
+
+    def _refill(self, now: float) -> None:
+        if self._effective_rate is not None:
+            elapsed = max(now - max(self._updated, self._blocked_until), 0.0)
+            self._tokens = min(self.burst, self._tokens + elapsed * self._effective_rate)
+        self._updated = now
+
+    def _interval(self) -> float:
+        return 1 / self._effective_rate if self._effective_rate else 0.0
+
+    def _take_slot(self, now: float) -> float:
+        wait_for_token = (
+            (1 - self._tokens) * self._interval() if self._tokens < 1 else 0.0
+        )
+        start = max(self._blocked_until, now + wait_for_token, self._next_slot)
+        self._next_slot = start + self._interval()
+        return start - now
+
+
+class RateLimiters:
+    """The delivery worker's token buckets, one per subscription.
+
+    ``share`` is this process's part of each subscription's rate and burst, for a
+    worker whose processes each send a subscription's deliveries.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic, share: float = 1.0):
+        self._clock = clock
+        self._share = share
+        self._by_subscription: dict[uuid.UUID, TokenBucket] = {}
+
+    def for_subscription(self, subscription: WebhookSubscription) -> TokenBucket:
+        rate, burst = subscription.rate_limit_per_second, subscription.rate_limit_burst
+        if rate is not None:
+            rate *= self._share
+        if burst is not None:
+            burst = max(1, round(burst * self._share))
+        bucket = self._by_subscription.get(subscription.id)
+        if bucket is None:
+            bucket = self._by_subscription[subscription.id] = TokenBucket(
+                rate, burst, self._clock
+            )
+        elif bucket.configured != (rate, burst):
+            bucket.configure(rate, burst)
+        return bucket
+
+
+def is_throttled(response: httpx.Response) -> bool:
+    """429 always means slow down; 503 only when it says for how long."""
+    return response.status_code == 429 or (
+        response.status_code == 503 and "retry-after" in response.headers
+    )
+
+
+def retry_after_seconds(response: httpx.Response) -> float | None:
+    """The response's ``Retry-After`` in seconds, capped at
+    ``rate_limit_max_retry_after_seconds``."""
+    return _parse_retry_after(response.headers.get("retry-after"))
+
+
+def _parse_retry_after(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        seconds = (when - datetime.now(timezone.utc)).total_seconds()
+    if not math.isfinite(seconds):
+        return None
+    return min(max(seconds, 0.0), settings.rate_limit_max_retry_after_seconds)
@@ -0,0 +1,231 @@
+import math
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+
+import structlog
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from integrations_hub.config import settings
+from integrations_hub.models.tables import (
+    DeadLetter,
+    DeadLetterReplay,
+    DeliveryJob,
+    DeliveryStatus,
+    ReplayStatus,
+    WebhookSubscription,
+)
+from integrations_hub.pagination import Cursor, Page, created_within, fetch_page
+from integrations_hub.schemas.events import ReplayCreate
+from integrations_hub.services.outbox import OUTBOX_CHANNEL, reopen_jobs
+
+logger = structlog.get_logger()
+
+
+async def create_replay(session: AsyncSession, data: ReplayCreate) -> DeadLetterReplay:
+    """Start a bulk replay of the dead letters matching ``data``'s filters.
+
+    Nothing is sent here: the delivery worker picks the replay up and puts the
+    matched dead letters back in the queue at the requested pace.
+    """
+    replay = DeadLetterReplay(
+        subscription_id=data.subscription_id,
+        dead_lettered_after=data.dead_lettered_after,
+        dead_lettered_before=data.dead_lettered_before,
+        error_contains=data.error_contains,
+        rate_per_second=data.rate_per_second,
+        concurrency=data.concurrency,
+        matched=0,
+    )
+    replay.matched = await session.scalar(
+        select(func.count()).select_from(DeadLetter).where(*_matching(replay))
+    )
+    session.add(replay)
+    await session.commit()
+    await session.refresh(replay)
+    logger.info("dead_letter_replay_created", replay_id=str(replay.id), matched=replay.matched)
+    return replay
+
+
+async def get_replay(session: AsyncSession, replay_id: uuid.UUID) -> DeadLetterReplay | None:
+    return await session.get(DeadLetterReplay, replay_id)
+
+
+async def list_replays(
+    session: AsyncSession,
+    *,
+    status: ReplayStatus | None = None,
+    after: Cursor | None = None,
+    limit: int = 50,
+) -> Page[DeadLetterReplay]:
+    """One page of replays, newest first."""
+    stmt = select(DeadLetterReplay)
+    if status is not None:
+        stmt = stmt.where(DeadLetterReplay.status == status)
+    return await fetch_page(
+        session, stmt, DeadLetterReplay, after=after, limit=limit, descending=True
+    )
+
+
+async def cancel_replay(session: AsyncSession, replay_id: uuid.UUID) -> DeadLetterReplay | None:
+    """Stop requeueing; jobs already back in the queue are still delivered."""
+    replay = await session.get(DeadLetterReplay, replay_id, with_for_update=True)
+    if replay is None:
+        return None
+    if replay.status == ReplayStatus.running:
+        replay.status = ReplayStatus.cancelled
+        replay.finished_at = datetime.now(timezone.utc)
+        logger.info("dead_letter_replay_cancelled", replay_id=str(replay.id))
+    await session.commit()
+    return replay
+
+
+async def get_replay_progress(
+    session: AsyncSession, replay_ids: list[uuid.UUID]
+) -> dict[uuid.UUID, dict[DeliveryStatus, int]]:
+    """How the jobs each replay requeued stand, counted by status."""
+    progress: dict[uuid.UUID, dict[DeliveryStatus, int]] = {}
+    if not replay_ids:
+        return progress
+    result = await session.execute(
+        select(DeliveryJob.replay_id, DeliveryJob.status, func.count())
+        .where(DeliveryJob.replay_id.in_(replay_ids))
+        .group_by(DeliveryJob.replay_id, DeliveryJob.status)
+    )
+    for replay_id, status, count in result.all():
+        progress.setdefault(replay_id, {})[status] = count
+    return progress
+
+
+async def advance_replays(session: AsyncSession) -> int:
+    """Requeue the next dead letters of every running replay; returns how many.
+
+    Each replay is advanced in its own transaction under a row lock, skipped if
+    another worker holds it, so any number of workers can share the job.
+    """
+    result = await session.execute(
+        select(DeadLetterReplay.id)
+        .where(DeadLetterReplay.status == ReplayStatus.running)
+        .order_by(DeadLetterReplay.created_at.asc())
+    )
+    requeued = 0
+    for replay_id in result.scalars().all():
+        replay = (
+            await session.execute(
+                select(DeadLetterReplay)
+                .where(
+                    DeadLetterReplay.id == replay_id,
+                    DeadLetterReplay.status == ReplayStatus.running,
+                )
+                .with_for_update(skip_locked=True)
+                .execution_options(populate_existing=True)
+            )
+        ).scalar_one_or_none()
+        if replay is not None:
+            requeued += await _advance(session, replay)
+        await session.commit()
+    return requeued
+
+
+async def _advance(session: AsyncSession, replay: DeadLetterReplay) -> int:
+    # The rate budget starts with one second's worth and grows from creation on.
+    # It never holds more than one poll interval's worth, so a replay that fell
+    # behind (worker down, concurrency saturated) doesn't catch up in one burst.
+    elapsed = (datetime.now(timezone.utc) - replay.created_at).total_seconds()
+    budget = math.floor(replay.rate_per_second * (max(elapsed, 0.0) + 1)) - replay.requeued
+    interval = max(settings.replay_poll_interval_seconds, 1.0)
+    budget = min(budget, max(math.floor(replay.rate_per_second * interval), 1))
+    outstanding = await session.scalar(
+        select(func.count()).where(
+            DeliveryJob.replay_id == replay.id,
+            DeliveryJob.status == DeliveryStatus.pending,
+        )
+    )
+    limit = min(budget, replay.concurrency - outstanding)
+    if limit <= 0:
+        return 0
+
+    requeued = await _requeue(session, replay, limit)
+    replay.requeued += requeued
+    if requeued == 0 and outstanding == 0:
+        replay.status = ReplayStatus.completed
+        replay.finished_at = datetime.now(timezone.utc)
+        logger.info(
+            "dead_letter_replay_completed", replay_id=str(replay.id), requeued=replay.requeued
+        )
+    elif requeued:
+        logger.info("dead_letters_requeued", replay_id=str(replay.id), count=requeued)
+    return requeued
+
+
+async def _requeue(session: AsyncSession, replay: DeadLetterReplay, limit: int) -> int:
+    """Move up to ``limit`` matching dead letters back to pending delivery jobs.
+
+    A requeued job keeps its attempt count, so it gets one more attempt and is
+    dead-lettered again if that fails.
+    """
+    taken = (
+        select(DeadLetter.id)
+        .where(*_matching(replay))
+        .order_by(DeadLetter.created_at.asc(), DeadLetter.id.asc())
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    result = await session.execute(
+        delete(DeadLetter)
+        .where(DeadLetter.id.in_(taken))
+        .returning(DeadLetter.event_id, DeadLetter.subscription_id)
+        .execution_options(synchronize_session=False)
+    )
+    jobs = [
+        {"event_id": event_id, "subscription_id": subscription_id, "replay_id": replay.id}
+        for event_id, subscription_id in result.all()
+    ]
+    if not jobs:
+        return 0
+
+    insert = pg_insert(DeliveryJob).values(jobs)
+    reopened = await session.execute(
+        insert.on_conflict_do_update(
+            constraint="uq_delivery_job_event_sub",
+            set_={
+                "status": DeliveryStatus.pending,
+                "locked_by": None,
+                "next_attempt_at": func.now(),
+                "replay_id": insert.excluded.replay_id,
+            },
+            where=DeliveryJob.status != DeliveryStatus.pending,
+        ).returning(DeliveryJob.event_id)
+    )
+    await reopen_jobs(session, Counter(reopened.scalars().all()))
+    # Wake listening workers once this transaction commits
+    await session.execute(select(func.pg_notify(OUTBOX_CHANNEL, str(replay.id))))
+    return len(jobs)
+
+
+def _matching(replay: DeadLetterReplay) -> list:
+    # Dead letters of disabled subscriptions are left alone, since their jobs
+    # would never fall due and would hold the replay's concurrency forever.
+    conditions = [
+        select(WebhookSubscription.id)
+        .where(
+            WebhookSubscription.id == DeadLetter.subscription_id,
+            WebhookSubscription.enabled.is_(True),
+        )
+        .exists()
+    ]
+    # Dead letters from after the replay started, such as its own failures, are
+    # never picked up again.
+    if replay.created_at is not None:
+        conditions.append(DeadLetter.created_at <= replay.created_at)
+    if replay.subscription_id is not None:
+        conditions.append(DeadLetter.subscription_id == replay.subscription_id)
+    conditions += created_within(
+        DeadLetter, replay.dead_lettered_after, replay.dead_lettered_before
+    )
+    if replay.error_contains:
+        conditions.append(DeadLetter.last_error.icontains(replay.error_contains, autoescape=True))
+    return conditions
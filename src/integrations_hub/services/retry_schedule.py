@@ -0,0 +1,72 @@
+import heapq
+from collections.abc import Callable, Iterable
+from datetime import datetime, timedelta, timezone
+
+from integrations_hub.config import settings
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class RetrySchedule:
+    """In-memory min-heap of upcoming delivery due times, for the delivery worker.
+
+    Failed attempts push their retry time here as they are scheduled, so an idle
+    worker sleeps until exactly the next retry instead of asking the database after
+    every cycle. Retries scheduled by other workers, and the leases of workers that
+    died, are picked up by a resync from ``delivery_jobs`` once per fallback poll
+    interval (see ``get_due_times``); each resync loads whatever falls due before
+    the next one.
+
+    Only due times are kept: the claim still decides which jobs run, so an entry for
+    a job that another worker has already handled costs one empty claim.
+    """
+
+    def __init__(
+        self,
+        horizon_seconds: float | None = None,
+        clock: Callable[[], datetime] = _utcnow,
+    ):
+        self._horizon = timedelta(
+            seconds=settings.delivery_fallback_poll_interval_seconds
+            if horizon_seconds is None
+            else horizon_seconds
+        )
+        self._clock = clock
+        self._heap: list[datetime] = []
+        self._synced_until: datetime | None = None
+
+    @property
+    def horizon(self) -> timedelta:
+        return self._horizon
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    @property
+    def stale(self) -> bool:
+        return self._synced_until is None or self._clock() >= self._synced_until
+
+    def add(self, due_at: datetime) -> None:
+        heapq.heappush(self._heap, due_at)
+
+    def load(self, due_times: Iterable[datetime]) -> None:
+        """Replace the schedule with due times read up to one horizon ahead."""
+        self._heap = list(due_times)
+        heapq.heapify(self._heap)
+        self._synced_until = self._clock() + self._horizon
+
+    def seconds_until_next(self) -> float | None:
+        """How long until the earliest scheduled retry, or None if there is none."""
+        if not self._heap:
+            return None
+        return max((self._heap[0] - self._clock()).total_seconds(), 0.0)
+
+    def pop_due(self) -> list[datetime]:
+        """Remove and return the due times that have been reached, earliest first."""
+        now = self._clock()
+        due = []
+        while self._heap and self._heap[0] <= now:
+            due.append(heapq.heappop(self._heap))
+        return due
@@ -0,0 +1,93 @@
+import time
+import uuid
+from collections.abc import Iterable
+
+import structlog
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from integrations_hub.config import settings
+from integrations_hub.models.tables import WebhookSubscription
+
+logger = structlog.get_logger()
+
+
+class RoutingTable:
+    """In-memory copy of the enabled webhook subscriptions, for the delivery worker.
+
+    Subscriptions rarely change, so the worker resolves the subscriptions of claimed
+    jobs from here instead of loading them with every batch. The subscription
+    service NOTIFYs the id of each subscription it changes, and only that one is
+    reloaded, as is a subscription the table doesn't know yet. The table reloads in
+    full when invalidated without an id, or when it is older than
+    ``routing_max_staleness_seconds`` in case a notification was missed.
+
+    Cached subscriptions are detached ORM objects and must be treated as read-only.
+    """
+
+    def __init__(self, max_staleness_seconds: float | None = None):
+        self._max_staleness = (
+            settings.routing_max_staleness_seconds
+            if max_staleness_seconds is None
+            else max_staleness_seconds
+        )
+        self._by_id: dict[uuid.UUID, WebhookSubscription] = {}
+        self._changed: set[uuid.UUID] = set()
+        self._loaded_at: float | None = None
+
+    @property
+    def stale(self) -> bool:
+        return (
+            self._loaded_at is None
+            or time.monotonic() - self._loaded_at >= self._max_staleness
+        )
+
+    def invalidate(self, subscription_id: str | None = None) -> None:
+        """Mark a subscription, by the id a NOTIFY carries, or else the whole table, changed."""
+        try:
+            self._changed.add(uuid.UUID(subscription_id))
+        except (TypeError, ValueError):
+            self._loaded_at = None
+
+    def load(self, subscriptions: Iterable[WebhookSubscription]) -> None:
+        """Replace the table's contents with the given enabled subscriptions."""
+        self._by_id = {sub.id: sub for sub in subscriptions}
+        self._changed.clear()
+        self._loaded_at = time.monotonic()
+
+    async def refresh(self, session: AsyncSession) -> None:
+        result = await session.execute(
+            select(WebhookSubscription).where(WebhookSubscription.enabled.is_(True))
+        )
+        self.load(result.scalars().all())
+        logger.info("routing_table_refreshed", subscriptions=len(self._by_id))
+
+    async def reload(self, session: AsyncSession, subscription_ids: set[uuid.UUID]) -> None:
+        """Reload just the given subscriptions, dropping those no longer enabled."""
+        self._changed -= subscription_ids
+        result = await session.execute(
+            select(WebhookSubscription).where(
+                WebhookSubscription.id.in_(subscription_ids),
+                WebhookSubscription.enabled.is_(True),
+            )
+        )
+        reloaded = {sub.id: sub for sub in result.scalars().all()}
+        for sub_id in subscription_ids:
+            self._by_id.pop(sub_id, None)
+        self._by_id.update(reloaded)
+        logger.info("routing_table_reloaded", subscriptions=len(subscription_ids))
+
+    async def resolve(
+        self, session: AsyncSession, subscription_ids: Iterable[uuid.UUID]
+    ) -> dict[uuid.UUID, WebhookSubscription]:
+        """Look up subscriptions by id, reloading at most once if needed.
+
+        Ids that are still unknown after a reload (deleted or disabled meanwhile)
+        are left out of the result.
+        """
+        ids = set(subscription_ids)
+        if self.stale:
+            await self.refresh(session)
+        elif outdated := self._changed | (ids - self._by_id.keys()):
+            await self.reload(session, outdated)
+        return {sub_id: self._by_id[sub_id] for sub_id in ids if sub_id in self._by_id}
@@ -1,18 +1,61 @@
 import hashlib
 import hmac
 import time
+import uuid
+from datetime import datetime, timezone
+from functools import lru_cache
+
+from integrations_hub.models.tables import WebhookSubscription
+
+
+class Signer:
+    """HMAC-SHA256 signer holding pre-keyed state for one or more secrets.
+
+    Each secret is keyed into an HMAC once, and signatures are made from copies of
+    it. The timestamp prefix and the payload are fed in separately, so the payload
+    is never copied into a ``{timestamp}.{payload}`` message.
+    """
+
+    def __init__(self, *secrets: str):
+        self._keyed = [hmac.new(secret.encode(), digestmod=hashlib.sha256) for secret in secrets]
+
+    def sign(self, payload: bytes | memoryview, timestamp: int) -> str:
+        """Hex signatures of ``{timestamp}.{payload}``, one per secret, comma-separated."""
+        prefix = b"%d." % timestamp
+        signatures = []
+        for keyed in self._keyed:
+            mac = keyed.copy()
+            mac.update(prefix)
+            mac.update(payload)
+            signatures.append(mac.hexdigest())
+        return ",".join(signatures)
+
+
+def signer_for(subscription: WebhookSubscription, now: datetime | None = None) -> Signer:
+    """The subscription's signer, also signing with its previous secret until that expires."""
+    secrets = (subscription.secret,)
+    expires_at = subscription.previous_secret_expires_at
+    if expires_at is not None and subscription.previous_secret:
+        if expires_at > (now or datetime.now(timezone.utc)):
+            secrets += (subscription.previous_secret,)
+    return _cached_signer(subscription.id, subscription.secret_version, secrets)
+
+
+@lru_cache(maxsize=16384)
+def _cached_signer(subscription_id: uuid.UUID, version: int, secrets: tuple[str, ...]) -> Signer:
+    # The secrets are part of the key as well, so a secret changed without a
+    # version bump (or a rotation ending) never reuses a stale signer.
+    return Signer(*secrets)
 
 
 def sign_payload(payload: str, secret: str, timestamp: int | None = None) -> tuple[str, int]:
     """Sign a payload with HMAC-SHA256 and return (signature, timestamp)."""
     if timestamp is None:
         timestamp = int(time.time())
-    message = f"{timestamp}.{payload}".encode()
-    signature = hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
-    return signature, timestamp
+    return Signer(secret).sign(payload.encode(), timestamp), timestamp
 
 
 def verify_signature(payload: str, secret: str, signature: str, timestamp: int) -> bool:
-    """Verify an HMAC-SHA256 signature."""
+    """Verify an HMAC-SHA256 signature header, which may list several signatures."""
     expected, _ = sign_payload(payload, secret, timestamp)
-    return hmac.compare_digest(expected, signature)
+    return any(hmac.compare_digest(expected, candidate) for candidate in signature.split(","))
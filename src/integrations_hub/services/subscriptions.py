@@ -1,14 +1,27 @@
 import uuid
+from datetime import datetime, timedelta, timezone
 
 import structlog
-from sqlalchemy import select
+from sqlalchemy import delete, func, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from integrations_hub.models.tables import WebhookSubscription
+from integrations_hub.config import settings
+from integrations_hub.models.tables import (
+    DeadLetter,
+    DeliveryAttempt,
+    DeliveryJob,
+    DeliveryStatus,
+    WebhookSubscription,
+)
+from integrations_hub.pagination import Cursor, Page, created_within, fetch_page
 from integrations_hub.schemas.subscriptions import SubscriptionCreate, SubscriptionUpdate
+from integrations_hub.services.outbox import finish_jobs
 
 logger = structlog.get_logger()
 
+# Postgres NOTIFY channel that tells delivery workers to reload their routing table
+SUBSCRIPTIONS_CHANNEL = "subscriptions_changed"
+
 
 async def create_subscription(
     session: AsyncSession, data: SubscriptionCreate
@@ -16,10 +29,17 @@ async def create_subscription(
     sub = WebhookSubscription(
         url=str(data.url),
         secret=data.secret,
-        events=",".join(data.events),
+        events=data.events,
         enabled=data.enabled,
+        rate_limit_per_second=data.rate_limit_per_second,
+        rate_limit_burst=data.rate_limit_burst,
+        batch_max_events=data.batch_max_events,
+        batch_linger_seconds=data.batch_linger_seconds,
+        store_response_body=data.store_response_body,
     )
     session.add(sub)
+    await session.flush()
+    await _notify_changed(session, sub.id)
     await session.commit()
     await session.refresh(sub)
     logger.info("subscription_created", subscription_id=str(sub.id))
@@ -29,42 +49,105 @@ async def create_subscription(
 async def get_subscription(
     session: AsyncSession, subscription_id: uuid.UUID
 ) -> WebhookSubscription | None:
-    return await session.get(WebhookSubscription, subscription_id)
+    """A subscription managed through the API.
+
+    Connector subscriptions (e.g. Slack) follow configuration instead, so they are
+    never returned here, nor listed, updated or deleted.
+    """
+    sub = await session.get(WebhookSubscription, subscription_id)
+    return sub if sub is not None and sub.connector is None else None
 
 
-async def list_subscriptions(session: AsyncSession) -> list[WebhookSubscription]:
-    result = await session.execute(
-        select(WebhookSubscription).order_by(WebhookSubscription.created_at.desc())
+async def list_subscriptions(
+    session: AsyncSession,
+    *,
+    enabled: bool | None = None,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+    after: Cursor | None = None,
+    limit: int = 50,
+) -> Page[WebhookSubscription]:
+    """One page of subscriptions, newest first."""
+    stmt = select(WebhookSubscription).where(
+        WebhookSubscription.connector.is_(None),
+        *created_within(WebhookSubscription, created_after, created_before),
+    )
+    if enabled is not None:
+        stmt = stmt.where(WebhookSubscription.enabled.is_(enabled))
+    return await fetch_page(
+        session, stmt, WebhookSubscription, after=after, limit=limit, descending=True
     )
-    return list(result.scalars().all())
 
 
 async def update_subscription(
     session: AsyncSession, subscription_id: uuid.UUID, data: SubscriptionUpdate
 ) -> WebhookSubscription | None:
-    sub = await session.get(WebhookSubscription, subscription_id)
+    sub = await get_subscription(session, subscription_id)
     if sub is None:
         return None
     update_data = data.model_dump(exclude_unset=True)
-    if "events" in update_data and update_data["events"] is not None:
-        update_data["events"] = ",".join(update_data["events"])
     if "url" in update_data and update_data["url"] is not None:
         update_data["url"] = str(update_data["url"])
+    new_secret = update_data.pop("secret", None)
+    if new_secret is not None and new_secret != sub.secret:
+        _rotate_secret(sub, new_secret)
     for key, value in update_data.items():
         setattr(sub, key, value)
+    await _notify_changed(session, sub.id)
     await session.commit()
     await session.refresh(sub)
-    logger.info("subscription_updated", subscription_id=str(sub.id))
+    logger.info(
+        "subscription_updated",
+        subscription_id=str(sub.id),
+        secret_version=sub.secret_version,
+    )
     return sub
 
 
+def _rotate_secret(sub: WebhookSubscription, secret: str) -> None:
+    """Replace the secret, still signing with the old one for the overlap period.
+
+    Receivers can then switch secrets at any point in the overlap without
+    rejecting a delivery. A rotation during an overlap drops the secret before.
+    """
+    overlap = settings.secret_rotation_overlap_seconds
+    sub.previous_secret = sub.secret if overlap > 0 else None
+    sub.previous_secret_expires_at = (
+        datetime.now(timezone.utc) + timedelta(seconds=overlap) if overlap > 0 else None
+    )
+    sub.secret = secret
+    sub.secret_version += 1
+
+
 async def delete_subscription(
     session: AsyncSession, subscription_id: uuid.UUID
 ) -> bool:
-    sub = await session.get(WebhookSubscription, subscription_id)
+    """Delete a subscription with its delivery jobs, attempts and dead letters.
+
+    Events the subscription still had pending no longer wait on it, and complete
+    if nothing else does.
+    """
+    sub = await get_subscription(session, subscription_id)
     if sub is None:
         return False
+    jobs = await session.execute(
+        delete(DeliveryJob)
+        .where(DeliveryJob.subscription_id == subscription_id)
+        .returning(DeliveryJob.event_id, DeliveryJob.status)
+    )
+    await finish_jobs(
+        session,
+        [event_id for event_id, status in jobs.all() if status == DeliveryStatus.pending],
+    )
+    for model in (DeliveryAttempt, DeadLetter):
+        await session.execute(delete(model).where(model.subscription_id == subscription_id))
     await session.delete(sub)
+    await _notify_changed(session, subscription_id)
     await session.commit()
     logger.info("subscription_deleted", subscription_id=str(subscription_id))
     return True
+
+
+async def _notify_changed(session: AsyncSession, subscription_id: uuid.UUID) -> None:
+    # Delivered to listeners only once the transaction commits
+    await session.execute(select(func.pg_notify(SUBSCRIPTIONS_CHANNEL, str(subscription_id))))
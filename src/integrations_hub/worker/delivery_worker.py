@@ -1,25 +1,119 @@
 import asyncio
+import os
+import socket
+import uuid
+from datetime import datetime, timezone
 
-import httpx
 import structlog
 
 from integrations_hub.config import settings
 from integrations_hub.database import async_session_factory
-from integrations_hub.services.delivery import process_outbox
+from integrations_hub.http_clients import WEBHOOKS, http_clients
+from integrations_hub.metrics import OUTBOX_BACKLOG, OUTBOX_OLDEST_PENDING_AGE
+from integrations_hub.services.circuit_breaker import circuit_breakers
+from integrations_hub.services.delivery import get_due_times, process_outbox
+from integrations_hub.services.outbox import OUTBOX_CHANNEL, get_backlog
+from integrations_hub.services.rate_limit import RateLimiters
+from integrations_hub.services.retry_schedule import RetrySchedule
+from integrations_hub.services.routing import RoutingTable
+from integrations_hub.services.subscriptions import SUBSCRIPTIONS_CHANNEL
+from integrations_hub.worker.listener import NotificationListener, listener_dsn
 
 logger = structlog.get_logger()
 
 
-async def run_delivery_loop() -> None:
-    """Background loop that polls the outbox and delivers webhooks."""
-    logger.info("delivery_worker_started")
-    async with httpx.AsyncClient() as client:
+def make_worker_id() -> str:
+    """Identify this loop in outbox leases; unique even for several loops per process."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+async def run_delivery_loop(worker_id: str | None = None, processes: int = 1) -> None:
+    """Background loop that delivers webhooks as outbox events arrive.
+
+    The loop sleeps until ``publish_event`` NOTIFYs a new outbox row or the next
+    delivery job (typically a retry) falls due, falling back to polling on a slow
+    interval (or the regular one when not listening). After a cycle that did work it
+    goes straight into the next one, since more is likely waiting.
+
+    Due times come from an in-memory retry schedule that failed deliveries add to
+    and that resyncs from the database once per fallback interval. Deliveries to
+    hosts that keep failing are held back by the process's circuit breakers, which
+    the admin API reports when the worker is embedded in it, and deliveries to each
+    subscription are paced by its rate limit, split evenly between the worker's
+    ``processes``.
+
+    Subscriptions are served from an in-memory routing table. The subscription
+    service NOTIFYs each change, and the worker reloads just the subscription that
+    changed, so changes reach it within moments.
+
+    The outbox backlog gauges are refreshed by a task of their own every
+    ``metrics_backlog_interval_seconds``, so they keep moving during long cycles.
+    """
+    worker_id = worker_id or make_worker_id()
+    logger.info("delivery_worker_started", worker_id=worker_id)
+    client = http_clients.get(WEBHOOKS)
+    routes = RoutingTable()
+    retries = RetrySchedule()
+    limiters = RateLimiters(share=1 / processes)
+    listener = NotificationListener(
+        listener_dsn(settings.database_url),
+        [OUTBOX_CHANNEL, SUBSCRIPTIONS_CHANNEL],
+        handlers={SUBSCRIPTIONS_CHANNEL: routes.invalidate},
+    )
+    await listener.connect()
+    backlog_reporter = asyncio.create_task(_report_backlog_periodically())
+    try:
         while True:
+            count = 0
+            if not listener.connected:
+                # Change notifications can't reach us; don't trust the cache.
+                routes.invalidate()
             try:
-                async with async_session_factory() as session:
-                    count = await process_outbox(client, session)
-                    if count > 0:
-                        logger.info("delivery_cycle_complete", deliveries_attempted=count)
+                count = await process_outbox(
+                    client,
+                    async_session_factory,
+                    worker_id,
+                    routes,
+                    retries=retries,
+                    breakers=circuit_breakers,
+                    limiters=limiters,
+                )
+                if count > 0:
+                    logger.info("delivery_cycle_complete", deliveries_attempted=count)
             except Exception:
                 logger.exception("delivery_worker_error")
-            await asyncio.sleep(settings.delivery_poll_interval_seconds)
+                await asyncio.sleep(settings.delivery_poll_interval_seconds)
+            if count == 0:
+                if retries.stale:
+                    await _resync_retries(retries)
+                await listener.wait(retries.seconds_until_next())
+                retries.pop_due()
+    finally:
+        backlog_reporter.cancel()
+        await listener.close()
+
+
+async def _report_backlog_periodically() -> None:
+    while True:
+        await _report_backlog()
+        await asyncio.sleep(settings.metrics_backlog_interval_seconds)
+
+
+async def _report_backlog() -> None:
+    try:
+        async with async_session_factory() as session:
+            pending, oldest = await get_backlog(session)
+    except Exception:
+        logger.exception("backlog_report_failed")
+        return
+    OUTBOX_BACKLOG.set(pending)
+    age = (datetime.now(timezone.utc) - oldest).total_seconds() if oldest else 0.0
+    OUTBOX_OLDEST_PENDING_AGE.set(age)
+
+
+async def _resync_retries(retries: RetrySchedule) -> None:
+    try:
+        async with async_session_factory() as session:
+            retries.load(await get_due_times(session, retries.horizon))
+    except Exception:
+        logger.exception("retry_schedule_resync_failed")
@@ -0,0 +1,108 @@
+import asyncio
+import time
+from collections.abc import Callable, Mapping
+
+import asyncpg
+import structlog
+from sqlalchemy.engine import make_url
+
+from integrations_hub.config import settings
+
+logger = structlog.get_logger()
+
+
+def listener_dsn(database_url: str) -> str:
+    """Turn the SQLAlchemy async URL into a plain DSN asyncpg can connect with."""
+    return make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+class NotificationListener:
+    """Wakes the delivery loop when Postgres NOTIFYs one of the given channels.
+
+    Holds one dedicated asyncpg connection outside the SQLAlchemy pool, since a
+    LISTEN only lasts as long as its connection. If the connection cannot be opened
+    or drops, ``wait`` degrades to plain interval polling and reconnects in the
+    background of later waits.
+
+    ``handlers`` are called with the payload of notifications on their channel, and
+    with None on every (re)connect since notifications sent while disconnected are
+    lost.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        channels: list[str],
+        handlers: Mapping[str, Callable[[str | None], None]] | None = None,
+    ):
+        self._dsn = dsn
+        self._channels = channels
+        self._handlers = dict(handlers or {})
+        self._connection: asyncpg.Connection | None = None
+        self._wakeup = asyncio.Event()
+        self._next_connect_at = 0.0
+
+    @property
+    def connected(self) -> bool:
+        return self._connection is not None and not self._connection.is_closed()
+
+    async def connect(self) -> bool:
+        """Open the listener connection. Returns False (and logs) on failure."""
+        self._next_connect_at = time.monotonic() + settings.delivery_poll_interval_seconds
+        connection = None
+        try:
+            connection = await asyncpg.connect(self._dsn)
+            for channel in self._channels:
+                await connection.add_listener(channel, self._on_notify)
+            connection.add_termination_listener(self._on_terminate)
+        except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as exc:
+            logger.warning("notification_listener_connect_failed", error=str(exc))
+            if connection is not None:
+                connection.terminate()
+            return False
+        self._connection = connection
+        # Anything published while we weren't listening still needs a cycle.
+        for handler in self._handlers.values():
+            handler(None)
+        self._wakeup.set()
+        logger.info("notification_listener_connected", channels=self._channels)
+        return True
+
+    async def wait(self, timeout: float | None = None) -> bool:
+        """Block until a notification arrives or the poll interval passes.
+
+        Returns True when woken by a notification. While listening, the interval is
+        the slow fallback; without a listener it is the regular poll interval.
+        ``timeout`` shortens the wait, e.g. to wake for a scheduled retry.
+        """
+        if not self.connected and time.monotonic() >= self._next_connect_at:
+            await self.connect()
+
+        if self.connected:
+            interval = settings.delivery_fallback_poll_interval_seconds
+        else:
+            interval = settings.delivery_poll_interval_seconds
+        if timeout is not None:
+            interval = min(interval, max(timeout, 0.0))
+
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            return False
+        self._wakeup.clear()
+        return True
+
+    async def close(self) -> None:
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            await connection.close()
+
+    def _on_notify(self, connection, pid, channel, payload) -> None:
+        handler = self._handlers.get(channel)
+        if handler is not None:
+            handler(payload)
+        self._wakeup.set()
+
+    def _on_terminate(self, connection) -> None:
+        logger.warning("notification_listener_disconnected")
+        self._connection = None
@@ -0,0 +1,181 @@
+"""Standalone delivery worker, installed as ``integrations-hub-worker``.
+
+Runs the delivery, partition maintenance and dead-letter replay loops without the
+API, so delivery can be deployed and scaled apart from ingestion. ``--processes N``
+starts N worker processes, each with its own event loop; they share out due
+deliveries through the job leases in Postgres just as separate hosts would.
+
+The worker serves its Prometheus metrics on ``worker_metrics_port``; with several
+processes, the parent process serves their sum.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import shutil
+import signal
+import tempfile
+import time
+from multiprocessing.connection import wait
+
+import structlog
+from prometheus_client import CollectorRegistry, multiprocess, start_http_server
+
+from integrations_hub.config import settings
+from integrations_hub.database import engine
+from integrations_hub.http_clients import http_clients
+from integrations_hub.logging_config import setup_logging
+from integrations_hub.worker.delivery_worker import run_delivery_loop
+from integrations_hub.worker.maintenance import run_maintenance_loop
+from integrations_hub.worker.replay import run_replay_loop
+
+logger = structlog.get_logger()
+
+# Pause before replacing a worker process that died, so a crash loop can't spin.
+_RESTART_DELAY_SECONDS = 1.0
+
+
+def start_worker_tasks(processes: int = 1) -> list[asyncio.Task]:
+    """Start the delivery, maintenance and replay loops on the running event loop.
+
+    ``processes`` is how many worker processes run side by side, which share each
+    subscription's rate limit.
+    """
+    return [
+        asyncio.create_task(run_delivery_loop(processes=processes)),
+        asyncio.create_task(run_maintenance_loop()),
+        asyncio.create_task(run_replay_loop()),
+    ]
+
+
+async def stop_worker_tasks(tasks: list[asyncio.Task]) -> Exception | None:
+    """Cancel the loops and wait for them. Returns the error a loop crashed with, if any."""
+    for task in tasks:
+        task.cancel()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    return next((result for result in results if isinstance(result, Exception)), None)
+
+
+async def run_worker(processes: int = 1) -> None:
+    """Run the worker loops until SIGINT or SIGTERM, then shut down cleanly.
+
+    Deliveries in flight are abandoned when the loops are cancelled; their leases
+    expire and another worker picks them up.
+    """
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    tasks = start_worker_tasks(processes)
+    stopping = asyncio.create_task(stop.wait())
+    try:
+        # The loops only return by crashing; don't linger half-alive if one does.
+        await asyncio.wait([stopping, *tasks], return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.remove_signal_handler(sig)
+        stopping.cancel()
+        error = await stop_worker_tasks(tasks)
+        await http_clients.aclose()
+        await engine.dispose()
+    if error is not None:
+        raise error
+
+
+def run_processes(count: int) -> None:
+    """Run ``count`` worker processes, replacing any that die, until signalled.
+
+    SIGINT or SIGTERM is passed on to every process, and the call returns once they
+    have all shut down.
+    """
+    context = multiprocessing.get_context("spawn")
+    processes: list[multiprocessing.Process] = []
+    stopping = False
+    metrics_dir = _serve_process_metrics() if settings.worker_metrics_port else None
+
+    def start() -> None:
+        process = context.Process(
+            target=_process_main, args=(count,), name="integrations-hub-worker"
+        )
+        process.start()
+        processes.append(process)
+        logger.info("worker_process_started", pid=process.pid)
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+    for _ in range(count):
+        start()
+
+    try:
+        while processes:
+            wait([process.sentinel for process in processes])
+            for process in [p for p in processes if not p.is_alive()]:
+                processes.remove(process)
+                if metrics_dir is not None:
+                    multiprocess.mark_process_dead(process.pid, metrics_dir)
+                if stopping:
+                    continue
+                logger.warning(
+                    "worker_process_exited", pid=process.pid, exitcode=process.exitcode
+                )
+                time.sleep(_RESTART_DELAY_SECONDS)
+                if not stopping:
+                    start()
+    finally:
+        if metrics_dir is not None:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+def _serve_process_metrics() -> str:
+    # Worker processes spawned from here on write their metrics to files in this
+    # directory (prometheus_client's multiprocess mode), and this process serves
+    # them summed up.
+    metrics_dir = tempfile.mkdtemp(prefix="integrations-hub-metrics-")
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = metrics_dir
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=metrics_dir)
+    start_http_server(settings.worker_metrics_port, registry=registry)
+    return metrics_dir
+
+
+def _process_main(processes: int) -> None:
+    setup_logging()
+    asyncio.run(run_worker(processes))
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog="integrations-hub-worker", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=settings.worker_processes,
+        help="worker processes to run; 0 means one per CPU core (default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+    if args.processes < 0:
+        parser.error("--processes must be 0 or more")
+
+    setup_logging()
+    count = args.processes or os.cpu_count() or 1
+    logger.info("worker_starting", processes=count)
+    if count == 1:
+        if settings.worker_metrics_port:
+            start_http_server(settings.worker_metrics_port)
+        asyncio.run(run_worker())
+    else:
+        run_processes(count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+import asyncio
+
+import structlog
+
+from integrations_hub.config import settings
+from integrations_hub.database import async_session_factory
+from integrations_hub.services.partitions import run_partition_maintenance
+
+logger = structlog.get_logger()
+
+
+async def run_maintenance_loop() -> None:
+    """Background loop that keeps partitions ahead of time and prunes expired ones.
+
+    Runs at startup and then every ``partition_maintenance_interval_seconds``. Every
+    process runs the loop; an advisory lock lets only one of them work at a time.
+    """
+    while True:
+        try:
+            async with async_session_factory() as session:
+                await run_partition_maintenance(session)
+        except Exception:
+            logger.exception("partition_maintenance_error")
+        await asyncio.sleep(settings.partition_maintenance_interval_seconds)
@@ -0,0 +1,25 @@
+import asyncio
+
+import structlog
+
+from integrations_hub.config import settings
+from integrations_hub.database import async_session_factory
+from integrations_hub.services.replay import advance_replays
+
+logger = structlog.get_logger()
+
+
+async def run_replay_loop() -> None:
+    """Background loop that feeds running dead-letter replays into the delivery queue.
+
+    Every ``replay_poll_interval_seconds`` each running replay requeues as many dead
+    letters as its rate and concurrency allow; the delivery loop does the sending.
+    Every process runs the loop, and row locks keep two from advancing one replay.
+    """
+    while True:
+        try:
+            async with async_session_factory() as session:
+                await advance_replays(session)
+        except Exception:
+            logger.exception("dead_letter_replay_error")
+        await asyncio.sleep(settings.replay_poll_interval_seconds)
@@ -4,6 +4,7 @@ from collections.abc import AsyncGenerator
 import pytest
 import pytest_asyncio
 from httpx import ASGITransport, AsyncClient
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import (
     AsyncConnection,
     AsyncSession,
@@ -13,8 +14,8 @@ from sqlalchemy.ext.asyncio import (
 )
 
 from integrations_hub.database import get_session
-from integrations_hub.models import Base
 from integrations_hub.main import app
+from integrations_hub.models import Base
 
 TEST_DATABASE_URL = os.environ.get(
     "IH_DATABASE_URL",
@@ -57,6 +58,19 @@ async def db_session(_setup_db) -> AsyncGenerator[AsyncSession, None]:
     await conn.close()
 
 
+@pytest_asyncio.fixture(loop_scope="session")
+async def session_factory(_setup_db) -> AsyncGenerator[async_sessionmaker[AsyncSession], None]:
+    """A session factory with real commits, for code that manages its own sessions.
+
+    Every table is emptied after the test.
+    """
+    yield async_sessionmaker(engine, expire_on_commit=False)
+
+    tables = ", ".join(table.name for table in Base.metadata.sorted_tables)
+    async with engine.begin() as conn:
+        await conn.execute(text(f"TRUNCATE {tables} CASCADE"))
+
+
 @pytest_asyncio.fixture(loop_scope="session")
 async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     async def override_session():
@@ -67,3 +81,16 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     async with AsyncClient(transport=transport, base_url="http://test") as c:
         yield c
     app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def query_counter():
+    """Count SQL statements sent to the test database while the fixture is active."""
+    statements: list[str] = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", _record)
+    yield statements
+    event.remove(engine.sync_engine, "before_cursor_execute", _record)
@@ -1,5 +1,6 @@
 """Integration tests that hit the API with a real database session."""
 
+import json
 import uuid
 
 import pytest
@@ -60,6 +61,32 @@ async def test_subscription_crud(client: AsyncClient):
     assert get_resp.status_code == 404
 
 
+@pytest.mark.asyncio
+async def test_deleting_a_subscription_releases_its_pending_events(client: AsyncClient):
+    sub_ids = []
+    for n in range(2):
+        resp = await client.post(
+            "/api/v1/subscriptions",
+            json={
+                "url": f"https://example.com/hook/{n}",
+                "secret": "a-long-enough-secret-key",
+                "events": ["request_submitted"],
+            },
+        )
+        sub_ids.append(resp.json()["id"])
+    resp = await client.post(
+        "/api/v1/events", json={"event_type": "request_submitted", "payload": {}}
+    )
+    event_id = resp.json()["id"]
+    assert resp.json()["pending_jobs"] == 2
+
+    for sub_id, still_pending in zip(sub_ids, ([event_id], [])):
+        resp = await client.delete(f"/api/v1/subscriptions/{sub_id}")
+        assert resp.status_code == 204
+        resp = await client.get("/api/v1/admin/events/pending")
+        assert [e["id"] for e in resp.json()] == still_pending
+
+
 @pytest.mark.asyncio
 async def test_subscription_not_found(client: AsyncClient):
     fake_id = str(uuid.uuid4())
@@ -100,6 +127,15 @@ async def test_publish_event(client: AsyncClient):
     assert "id" in data
 
 
+@pytest.mark.asyncio
+async def test_publish_event_with_a_big_integer(client: AsyncClient):
+    resp = await client.post(
+        "/api/v1/events",
+        json={"event_type": "request_submitted", "payload": {"n": 18446744073709551616}},
+    )
+    assert resp.status_code == 201
+
+
 @pytest.mark.asyncio
 async def test_publish_event_invalid_type(client: AsyncClient):
     resp = await client.post(
@@ -112,6 +148,50 @@ async def test_publish_event_invalid_type(client: AsyncClient):
     assert resp.status_code == 422
 
 
+@pytest.mark.asyncio
+async def test_publish_event_batch(client: AsyncClient):
+    await client.post(
+        "/api/v1/subscriptions",
+        json={
+            "url": "https://example.com/hook",
+            "secret": "a-long-enough-secret-key",
+            "events": ["request_approved"],
+        },
+    )
+    items = [
+        {"event_type": "request_submitted", "payload": {"n": 0}},
+        {"event_type": "request_approved", "payload": {"n": 1}},
+        {"event_type": "request_rejected", "payload": {"n": 2}},
+    ]
+    resp = await client.post("/api/v1/events/batch", json={"events": items})
+
+    assert resp.status_code == 201
+    data = resp.json()
+    assert [(e["event_type"], json.loads(e["payload"])) for e in data] == [
+        (item["event_type"], item["payload"]) for item in items
+    ]
+    assert len({e["id"] for e in data}) == 3
+    assert [e["pending_jobs"] for e in data] == [0, 1, 0]
+    assert all(e["created_at"] for e in data)
+
+
+@pytest.mark.asyncio
+async def test_publish_event_batch_is_validated_as_a_whole(client: AsyncClient):
+    resp = await client.post(
+        "/api/v1/events/batch",
+        json={
+            "events": [
+                {"event_type": "request_submitted", "payload": {}},
+                {"event_type": "invalid_type", "payload": {}},
+            ]
+        },
+    )
+    assert resp.status_code == 422
+
+    resp = await client.post("/api/v1/events/batch", json={"events": []})
+    assert resp.status_code == 422
+
+
 @pytest.mark.asyncio
 async def test_delivery_attempts_empty(client: AsyncClient):
     fake_id = str(uuid.uuid4())
@@ -0,0 +1,218 @@
+"""Tests for batched webhook delivery."""
+
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+
+from integrations_hub.config import settings
+from integrations_hub.http_clients import limit_response_body
+from integrations_hub.models.tables import (
+    DeliveryAttempt,
+    DeliveryJob,
+    DeliveryStatus,
+    EventType,
+    OutboxEvent,
+    WebhookSubscription,
+)
+from integrations_hub.services.delivery import _plan_sends, process_outbox
+from integrations_hub.services.outbox import publish_events
+from integrations_hub.services.signing import verify_signature
+
+NOW = datetime(2030, 1, 1, tzinfo=timezone.utc)
+
+
+def _subscription(
+    max_events: int | None = 10, linger: float | None = None
+) -> WebhookSubscription:
+    return WebhookSubscription(
+        url="https://example.com/hook",
+        secret="a-long-enough-secret-key",
+        events=["request_submitted"],
+        batch_max_events=max_events,
+        batch_linger_seconds=linger,
+    )
+
+
+def _event(age_seconds: float) -> OutboxEvent:
+    return OutboxEvent(
+        event_type=EventType.request_submitted,
+        payload="{}",
+        created_at=NOW - timedelta(seconds=age_seconds),
+    )
+
+
+async def _publish(session_factory, sub: WebhookSubscription, count: int) -> None:
+    async with session_factory() as session:
+        session.add(sub)
+        await session.commit()
+        await publish_events(session, [("request_submitted", {"n": i}) for i in range(count)])
+
+
+def test_plans_full_batches_and_holds_back_a_partial_one():
+    batched, single = _subscription(max_events=3, linger=10), _subscription(max_events=None)
+    batched.id, single.id = "batched", "single"
+    due = [(_event(age), batched, 1) for age in (1, 5, 2, 4, 3)]
+    due.append((_event(1), single, 2))
+
+    sends, lingering = _plan_sends(due, NOW)
+
+    assert [(sub.id, len(batch), batched) for sub, batch, batched in sends] == [
+        ("single", 1, False),
+        ("batched", 3, True),
+    ]
+    assert [event.created_at for event, _ in sends[1][1]] == [
+        NOW - timedelta(seconds=age) for age in (5, 4, 3)
+    ]
+    [(_, held, delay)] = lingering
+    assert len(held) == 2
+    assert delay == 8
+
+    # Once its oldest event has lingered long enough, a partial batch goes out.
+    sends, lingering = _plan_sends(due, NOW + timedelta(seconds=8))
+    assert [len(batch) for _, batch, _ in sends] == [1, 3, 2]
+    assert lingering == []
+
+
+@pytest.mark.asyncio
+async def test_batch_is_one_signed_post_with_per_event_outcomes(session_factory):
+    await _publish(session_factory, _subscription(), 5)
+    async with session_factory() as session:
+        rejected = (await session.execute(select(OutboxEvent.id).limit(1))).scalar_one()
+    client = AsyncMock(spec=httpx.AsyncClient)
+    client.post.return_value = httpx.Response(200, json={"failed": [str(rejected)]})
+
+    await process_outbox(client, session_factory, "worker-1")
+
+    client.post.assert_awaited_once()
+    body = client.post.call_args.kwargs["content"].decode()
+    headers = client.post.call_args.kwargs["headers"]
+    assert headers["X-Webhook-Batch-Size"] == "5"
+    assert verify_signature(
+        body,
+        "a-long-enough-secret-key",
+        headers["X-Webhook-Signature"],
+        int(headers["X-Webhook-Timestamp"]),
+    )
+    assert sorted(envelope["data"]["n"] for envelope in json.loads(body)) == list(range(5))
+
+    async with session_factory() as session:
+        jobs = {job.event_id: job for job in (await session.execute(select(DeliveryJob))).scalars()}
+        attempts = (await session.execute(select(DeliveryAttempt))).scalars().all()
+    assert len(attempts) == 5
+    assert jobs[rejected].status == DeliveryStatus.pending
+    assert jobs[rejected].attempt_count == 1
+    assert jobs[rejected].last_error == "Rejected by receiver"
+    others = [job for event_id, job in jobs.items() if event_id != rejected]
+    assert all(job.status == DeliveryStatus.delivered for job in others)
+
+
+@pytest.mark.asyncio
+async def test_truncated_batch_response_fails_the_batch(session_factory):
+    await _publish(session_factory, _subscription(), 5)
+    async with session_factory() as session:
+        event_ids = (await session.execute(select(OutboxEvent.id))).scalars().all()
+
+    async def rejections():
+        yield json.dumps({"failed": [str(event_id) for event_id in event_ids]}).encode()
+
+    def handler(request):
+        return httpx.Response(200, content=rejections())
+
+    client = httpx.AsyncClient(
+        transport=httpx.MockTransport(handler),
+        event_hooks={"response": [limit_response_body]},
+    )
+    # The last rejected ids fall past the cap; no event may pass as delivered.
+    with patch.object(settings, "delivery_response_max_bytes", 100):
+        await process_outbox(client, session_factory, "worker-1")
+
+    async with session_factory() as session:
+        jobs = (await session.execute(select(DeliveryJob))).scalars().all()
+    assert len(jobs) == 5
+    assert all(job.status == DeliveryStatus.pending for job in jobs)
+    assert {job.last_error for job in jobs} == {"Response body truncated"}
+
+
+@pytest.mark.asyncio
+async def test_backlog_goes_out_in_batches(session_factory):
+    await _publish(session_factory, _subscription(max_events=10), 25)
+    client = AsyncMock(spec=httpx.AsyncClient)
+    client.post.return_value = httpx.Response(200, text="OK")
+
+    with patch.object(settings, "delivery_batch_size", 25):
+        assert await process_outbox(client, session_factory, "worker-1") == 25
+
+    sizes = [call.kwargs["headers"]["X-Webhook-Batch-Size"] for call in client.post.call_args_list]
+    assert sorted(sizes, key=int) == ["5", "10", "10"]
+
+
+@pytest.mark.asyncio
+async def test_partial_batch_lingers_for_more_events(session_factory):
+    await _publish(session_factory, _subscription(linger=30), 3)
+    client = AsyncMock(spec=httpx.AsyncClient)
+
+    await process_outbox(client, session_factory, "worker-1")
+
+    client.post.assert_not_awaited()
+    async with session_factory() as session:
+        rows = (
+            await session.execute(
+                select(
+                    DeliveryJob.next_attempt_at,
+                    DeliveryJob.attempt_count,
+                    OutboxEvent.created_at,
+                ).join(OutboxEvent, OutboxEvent.id == DeliveryJob.event_id)
+            )
+        ).all()
+    oldest = min(created_at for _, _, created_at in rows)
+    for next_attempt_at, attempt_count, _ in rows:
+        assert attempt_count == 0
+        assert abs((next_attempt_at - oldest).total_seconds() - 30) < 1
+
+
+@pytest.mark.asyncio
+async def test_events_arriving_one_at_a_time_join_the_waiting_batch(session_factory):
+    sub = _subscription(linger=0.5)
+    await _publish(session_factory, sub, 1)
+    client = AsyncMock(spec=httpx.AsyncClient)
+    client.post.return_value = httpx.Response(200, text="OK")
+
+    for n in range(1, 4):
+        await process_outbox(client, session_factory, "worker-1")
+        await asyncio.sleep(0.1)
+        async with session_factory() as session:
+            await publish_events(session, [("request_submitted", {"n": n})])
+    await process_outbox(client, session_factory, "worker-1")
+    client.post.assert_not_awaited()
+
+    async with session_factory() as session:
+        due = set((await session.execute(select(DeliveryJob.next_attempt_at))).scalars())
+    assert len(due) == 1
+    await asyncio.sleep(max((due.pop() - datetime.now(timezone.utc)).total_seconds(), 0))
+    await process_outbox(client, session_factory, "worker-1")
+
+    sizes = [call.kwargs["headers"]["X-Webhook-Batch-Size"] for call in client.post.call_args_list]
+    assert sizes == ["4"]
+
+
+@pytest.mark.asyncio
+async def test_subscription_api_accepts_batching(client: AsyncClient):
+    body = {
+        "url": "https://example.com/hook",
+        "secret": "a-long-enough-secret-key",
+        "events": ["request_submitted"],
+        "batch_max_events": 100,
+        "batch_linger_seconds": 0.5,
+    }
+    resp = await client.post("/api/v1/subscriptions", json=body)
+    assert resp.status_code == 201
+    assert resp.json()["batch_max_events"] == 100
+
+    resp = await client.post("/api/v1/subscriptions", json={**body, "batch_max_events": 1})
+    assert resp.status_code == 422
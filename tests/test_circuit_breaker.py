@@ -0,0 +1,151 @@
+"""Tests for per-host circuit breakers in the delivery worker."""
+
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+
+from integrations_hub.config import settings
+from integrations_hub.models.tables import DeliveryAttempt, DeliveryJob, WebhookSubscription
+from integrations_hub.services.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakers,
+    CircuitState,
+)
+from integrations_hub.services.delivery import process_outbox
+from integrations_hub.services.outbox import publish_events
+from integrations_hub.services.retry_schedule import RetrySchedule
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _open_breaker(clock: FakeClock) -> CircuitBreaker:
+    breaker = CircuitBreaker("example.com", clock)
+    for _ in range(settings.circuit_min_requests):
+        breaker.record(False)
+    assert breaker.state == CircuitState.open
+    return breaker
+
+
+def test_opens_once_failure_rate_crosses_threshold():
+    clock = FakeClock()
+    breaker = CircuitBreaker("example.com", clock)
+    with (
+        patch.object(settings, "circuit_min_requests", 4),
+        patch.object(settings, "circuit_failure_rate_threshold", 0.5),
+    ):
+        # Too few deliveries to judge, then below the threshold.
+        for healthy in (False, True, True, True, False):
+            breaker.record(healthy)
+            assert breaker.state == CircuitState.closed
+        breaker.record(False)
+
+    assert breaker.state == CircuitState.open
+    assert breaker.failure_rate == 0.5
+    assert not breaker.allow()
+    assert breaker.retry_after() == settings.circuit_open_seconds
+
+
+def test_half_open_admits_one_probe_and_closes_on_success():
+    clock = FakeClock()
+    breaker = _open_breaker(clock)
+    clock.now += settings.circuit_open_seconds
+
+    assert breaker.state == CircuitState.half_open
+    assert breaker.allow()
+    assert not breaker.allow()
+    assert breaker.retry_after() == settings.delivery_timeout_seconds
+
+    breaker.record(True)
+    assert breaker.state == CircuitState.closed
+    assert breaker.recent_requests == 0
+    assert breaker.allow()
+
+
+def test_failed_probes_back_off_up_to_the_cap():
+    clock = FakeClock()
+    breaker = _open_breaker(clock)
+    with patch.object(settings, "circuit_max_open_seconds", settings.circuit_open_seconds * 3):
+        for expected in (2, 3, 3):
+            clock.now += breaker.retry_after()
+            assert breaker.allow()
+            breaker.record(False)
+            assert breaker.retry_after() == settings.circuit_open_seconds * expected
+
+
+def test_unanswered_probe_is_replaced_after_the_timeout():
+    clock = FakeClock()
+    breaker = _open_breaker(clock)
+    clock.now += settings.circuit_open_seconds
+    assert breaker.allow()
+
+    clock.now += settings.delivery_timeout_seconds
+    assert breaker.allow()
+
+
+@pytest.mark.asyncio
+async def test_dead_endpoint_defers_deliveries_without_spending_attempts(session_factory):
+    async with session_factory() as session:
+        session.add(
+            WebhookSubscription(
+                url="https://down.example.com/hook",
+                secret="a-long-enough-secret-key",
+                events=["request_submitted"],
+            )
+        )
+        await session.commit()
+        await publish_events(session, [("request_submitted", {"n": i}) for i in range(20)])
+    client = AsyncMock(spec=httpx.AsyncClient)
+    client.post.side_effect = httpx.ConnectError("connection refused")
+    breakers = CircuitBreakers()
+    retries = RetrySchedule()
+
+    with (
+        patch.object(settings, "delivery_per_host_concurrency", 1),
+        patch.object(settings, "delivery_batch_size", 20),
+    ):
+        await process_outbox(client, session_factory, "worker-1", None, retries, breakers)
+
+    tripped_after = settings.circuit_min_requests
+    assert client.post.await_count == tripped_after
+    assert breakers.get("down.example.com").state == CircuitState.open
+    async with session_factory() as session:
+        attempts = await session.scalar(select(func.count()).select_from(DeliveryAttempt))
+        counts = (await session.execute(select(DeliveryJob.attempt_count))).scalars().all()
+        locked = await session.scalar(
+            select(func.count()).where(DeliveryJob.locked_by.is_not(None))
+        )
+    assert attempts == tripped_after
+    assert sorted(counts) == [0] * (20 - tripped_after) + [1] * tripped_after
+    assert locked == 0
+    assert len(retries) == 20
+
+
+@pytest.mark.asyncio
+async def test_admin_reports_and_resets_circuits(client: AsyncClient):
+    breakers = CircuitBreakers()
+    for _ in range(settings.circuit_min_requests):
+        breakers.for_host("down.example.com").record(False)
+    breakers.for_host("up.example.com").record(True)
+
+    with patch("integrations_hub.api.admin.circuit_breakers", breakers):
+        resp = await client.get("/api/v1/admin/circuits")
+        assert resp.status_code == 200
+        circuits = {c["host"]: c for c in resp.json()}
+        assert circuits["down.example.com"]["state"] == "open"
+        assert circuits["down.example.com"]["failure_rate"] == 1.0
+        assert circuits["down.example.com"]["opened_at"] is not None
+        assert circuits["up.example.com"]["state"] == "closed"
+
+        resp = await client.post("/api/v1/admin/circuits/down.example.com/reset")
+        assert resp.json()["state"] == "closed"
+        resp = await client.post("/api/v1/admin/circuits/unknown.example.com/reset")
+        assert resp.status_code == 404
@@ -1,16 +1,24 @@
 """Unit tests for delivery logic using mocked HTTP responses."""
 
+import asyncio
 import json
+import time
 import uuid
+from collections import Counter
+from contextlib import asynccontextmanager, contextmanager
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
+from itertools import chain, repeat
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import httpx
 import pytest
 
+from integrations_hub.http_clients import RESPONSE_BODY_LIMIT
 from integrations_hub.models.tables import DeliveryStatus, EventType
-from integrations_hub.services.delivery import deliver_webhook
+from integrations_hub.services.delivery import deliver_webhook, process_outbox
+from integrations_hub.services.routing import RoutingTable
+from integrations_hub.services.signing import verify_signature
 
 
 @dataclass
@@ -27,7 +35,14 @@ class FakeSubscription:
     url: str = "https://example.com/webhook"
     secret: str = "test-secret-at-least-16-chars"
     enabled: bool = True
-    events: str = "request_submitted"
+    events: list[str] = field(default_factory=lambda: ["request_submitted"])
+    connector: str | None = None
+    batch_max_events: int | None = None
+    batch_linger_seconds: float | None = None
+    store_response_body: bool = True
+    secret_version: int = 1
+    previous_secret: str | None = None
+    previous_secret_expires_at: datetime | None = None
 
 
 @pytest.mark.asyncio
@@ -50,9 +65,13 @@ async def test_deliver_webhook_success():
 
     assert result is True
     mock_client.post.assert_called_once()
-    call_kwargs = mock_client.post.call_args
-    assert "X-Webhook-Signature" in call_kwargs.kwargs["headers"]
-    assert "X-Webhook-Timestamp" in call_kwargs.kwargs["headers"]
+    headers = mock_client.post.call_args.kwargs["headers"]
+    assert verify_signature(
+        event.payload,
+        sub.secret,
+        headers["X-Webhook-Signature"],
+        int(headers["X-Webhook-Timestamp"]),
+    )
 
 
 @pytest.mark.asyncio
@@ -75,7 +94,7 @@ async def test_deliver_webhook_failure():
         mock_settings.delivery_max_attempts = 5
         mock_settings.delivery_backoff_base_seconds = 2.0
         mock_settings.delivery_timeout_seconds = 10.0
-        result = await deliver_webhook(mock_session, event, sub, mock_client)
+        result = await deliver_webhook(mock_session, event, sub, mock_client, attempt_number=1)
 
     assert result is False
 
@@ -96,6 +115,225 @@ async def test_deliver_webhook_timeout():
         mock_settings.delivery_max_attempts = 5
         mock_settings.delivery_backoff_base_seconds = 2.0
         mock_settings.delivery_timeout_seconds = 10.0
-        result = await deliver_webhook(mock_session, event, sub, mock_client)
+        result = await deliver_webhook(mock_session, event, sub, mock_client, attempt_number=1)
 
     assert result is False
+
+
+@pytest.mark.asyncio
+async def test_deliver_webhook_derives_attempt_number_when_omitted():
+    event = FakeEvent()
+    sub = FakeSubscription()
+
+    mock_response = MagicMock()
+    mock_response.status_code = 200
+    mock_response.text = "OK"
+
+    mock_client = AsyncMock(spec=httpx.AsyncClient)
+    mock_client.post.return_value = mock_response
+
+    mock_session = AsyncMock()
+    mock_session.add = MagicMock()
+    mock_session.execute.return_value = MagicMock()
+    mock_session.execute.return_value.scalar_one.return_value = 2
+
+    result = await deliver_webhook(mock_session, event, sub, mock_client)
+
+    assert result is True
+    attempt = mock_session.add.call_args.args[0]
+    assert attempt.attempt_number == 3
+
+
+@pytest.mark.asyncio
+async def test_deliver_webhook_skips_body_when_not_stored():
+    event = FakeEvent()
+    sub = FakeSubscription(store_response_body=False)
+
+    mock_client = AsyncMock(spec=httpx.AsyncClient)
+    mock_client.post.return_value = httpx.Response(500, text="")
+
+    mock_session = AsyncMock()
+    mock_session.add = MagicMock()
+    mock_session.execute.return_value = MagicMock()
+
+    assert not await deliver_webhook(mock_session, event, sub, mock_client, attempt_number=1)
+
+    assert mock_client.post.call_args.kwargs["extensions"] == {RESPONSE_BODY_LIMIT: 0}
+    attempt = mock_session.add.call_args.args[0]
+    assert (attempt.http_status_code, attempt.response_body) == (500, None)
+
+
+@contextmanager
+def _due_work(*claims):
+    """Stub out the job claims and subscription lookup for process_outbox.
+
+    Each claim returns the next of ``claims``, and nothing once they run out.
+    """
+    claimed = [
+        [(event, sub.id, attempt_number) for event, sub, attempt_number in due] for due in claims
+    ]
+    subscriptions = {sub.id: sub for due in claims for _, sub, _ in due}
+    with (
+        patch(
+            "integrations_hub.services.delivery.claim_due_deliveries",
+            side_effect=chain(claimed, repeat([])),
+        ),
+        patch.object(RoutingTable, "resolve", return_value=subscriptions),
+    ):
+        yield
+
+
+def _fake_session_factory():
+    @asynccontextmanager
+    async def factory():
+        session = AsyncMock()
+        session.add = MagicMock()
+        session.execute.return_value = MagicMock()
+        yield session
+
+    return factory
+
+
+@pytest.mark.asyncio
+async def test_process_outbox_bounds_global_and_per_host_concurrency():
+    hosts = ["a.example.com", "b.example.com", "c.example.com"]
+    due = [
+        (FakeEvent(), FakeSubscription(url=f"https://{hosts[i % 3]}/hook"), 1)
+        for i in range(30)
+    ]
+    in_flight: Counter[str] = Counter()
+    peak_total = 0
+    peak_per_host: Counter[str] = Counter()
+
+    async def fake_post(url, **kwargs):
+        nonlocal peak_total
+        host = httpx.URL(url).host
+        in_flight[host] += 1
+        peak_total = max(peak_total, sum(in_flight.values()))
+        peak_per_host[host] = max(peak_per_host[host], in_flight[host])
+        await asyncio.sleep(0.01)
+        in_flight[host] -= 1
+        return httpx.Response(200, text="OK")
+
+    mock_client = AsyncMock(spec=httpx.AsyncClient)
+    mock_client.post.side_effect = fake_post
+
+    with (
+        _due_work(due),
+        patch("integrations_hub.services.delivery.settings") as mock_settings,
+    ):
+        mock_settings.delivery_concurrency = 4
+        mock_settings.delivery_per_host_concurrency = 2
+        mock_settings.delivery_lease_seconds = 60.0
+        mock_settings.delivery_timeout_seconds = 10.0
+        mock_settings.delivery_batch_size = 50
+        mock_settings.delivery_poll_interval_seconds = 2.0
+        count = await process_outbox(mock_client, _fake_session_factory(), "worker-1")
+
+    assert count == 30
+    assert mock_client.post.call_count == 30
+    assert peak_total == 4
+    assert max(peak_per_host.values()) == 2
+
+
+@pytest.mark.asyncio
+async def test_process_outbox_slow_host_does_not_block_fast_hosts():
+    slow = [(FakeEvent(), FakeSubscription(url="https://slow.example.com/hook"), 1)]
+    fast = [
+        (FakeEvent(), FakeSubscription(url=f"https://fast{i}.example.com/hook"), 1)
+        for i in range(10)
+    ]
+    fast_done_at: list[float] = []
+
+    async def fake_post(url, **kwargs):
+        if "slow" in url:
+            await asyncio.sleep(0.3)
+        else:
+            await asyncio.sleep(0.01)
+            fast_done_at.append(time.perf_counter())
+        return httpx.Response(200, text="OK")
+
+    mock_client = AsyncMock(spec=httpx.AsyncClient)
+    mock_client.post.side_effect = fake_post
+
+    started = time.perf_counter()
+    with (
+        _due_work(slow + fast),
+        patch("integrations_hub.services.delivery.settings") as mock_settings,
+    ):
+        mock_settings.delivery_concurrency = 4
+        mock_settings.delivery_per_host_concurrency = 1
+        mock_settings.delivery_lease_seconds = 60.0
+        mock_settings.delivery_timeout_seconds = 10.0
+        mock_settings.delivery_batch_size = 50
+        mock_settings.delivery_poll_interval_seconds = 2.0
+        await process_outbox(mock_client, _fake_session_factory(), "worker-1")
+
+    assert len(fast_done_at) == 10
+    assert max(fast_done_at) - started < 0.2
+
+
+@pytest.mark.asyncio
+async def test_process_outbox_keeps_claiming_while_a_slow_receiver_is_busy():
+    slow = [(FakeEvent(), FakeSubscription(url="https://slow.example.com/hook"), 1)]
+    fast = [
+        (FakeEvent(), FakeSubscription(url=f"https://fast{i}.example.com/hook"), 1)
+        for i in range(9)
+    ]
+    fast_done_at: list[float] = []
+
+    async def fake_post(url, **kwargs):
+        if "slow" in url:
+            await asyncio.sleep(0.5)
+        else:
+            await asyncio.sleep(0.01)
+            fast_done_at.append(time.perf_counter())
+        return httpx.Response(200, text="OK")
+
+    mock_client = AsyncMock(spec=httpx.AsyncClient)
+    mock_client.post.side_effect = fake_post
+
+    # Jobs that fall due while the slow delivery is out are claimed, and sent,
+    # as soon as the deliveries ahead of them finish.
+    started = time.perf_counter()
+    with (
+        _due_work(slow + fast[:3], fast[3:6], fast[6:]),
+        patch("integrations_hub.services.delivery.settings") as mock_settings,
+    ):
+        mock_settings.delivery_concurrency = 4
+        mock_settings.delivery_per_host_concurrency = 1
+        mock_settings.delivery_lease_seconds = 60.0
+        mock_settings.delivery_timeout_seconds = 10.0
+        mock_settings.delivery_batch_size = 4
+        mock_settings.delivery_poll_interval_seconds = 2.0
+        count = await process_outbox(mock_client, _fake_session_factory(), "worker-1")
+
+    assert count == 10
+    assert len(fast_done_at) == 9
+    assert max(fast_done_at) - started < 0.3
+
+
+@pytest.mark.asyncio
+async def test_process_outbox_isolates_failed_deliveries():
+    due = [(FakeEvent(), FakeSubscription(url=f"https://h{i}.example.com/"), 1) for i in range(3)]
+    mock_client = AsyncMock(spec=httpx.AsyncClient)
+    mock_client.post.return_value = httpx.Response(200, text="OK")
+
+    calls = 0
+
+    @asynccontextmanager
+    async def flaky_factory():
+        nonlocal calls
+        calls += 1
+        session = AsyncMock()
+        session.add = MagicMock()
+        session.execute.return_value = MagicMock()
+        if calls == 2:
+            session.commit.side_effect = RuntimeError("db went away")
+        yield session
+
+    with _due_work(due):
+        count = await process_outbox(mock_client, flaky_factory, "worker-1")
+
+    assert count == 3
+    assert mock_client.post.call_count == 3
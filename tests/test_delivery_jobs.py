@@ -0,0 +1,252 @@
+"""Integration tests for fan-out-on-write delivery jobs."""
+
+import json
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from integrations_hub.models.tables import (
+    DeadLetter,
+    DeliveryAttempt,
+    DeliveryJob,
+    DeliveryStatus,
+    EventType,
+    OutboxEvent,
+    WebhookSubscription,
+)
+from integrations_hub.services.delivery import (
+    claim_due_deliveries,
+    deliver_webhook,
+    get_next_due_at,
+    replay_dead_letter,
+)
+from integrations_hub.services.outbox import get_pending_events, publish_event, publish_events
+
+
+def _subscription(name: str, *events: str, enabled: bool = True):
+    return WebhookSubscription(
+        url=f"https://example.com/{name}",
+        secret="a-long-enough-secret-key",
+        events=list(events) or ["request_submitted"],
+        enabled=enabled,
+    )
+
+
+async def _jobs(session: AsyncSession, event_id) -> dict:
+    result = await session.execute(
+        select(DeliveryJob)
+        .where(DeliveryJob.event_id == event_id)
+        .execution_options(populate_existing=True)
+    )
+    return {job.subscription_id: job for job in result.scalars().all()}
+
+
+@pytest.mark.asyncio
+async def test_publish_creates_job_per_matching_subscription(db_session: AsyncSession):
+    match = _subscription("match", "request_submitted", "request_approved")
+    other = _subscription("other", "request_rejected")
+    disabled = _subscription("disabled", enabled=False)
+    # Routing matches whole event types, never a substring of one.
+    partial = _subscription("partial", "request_submit", "submitted")
+    db_session.add_all([match, other, disabled, partial])
+    await db_session.flush()
+
+    event = await publish_event(db_session, "request_submitted", {"title": "Test"})
+
+    jobs = await _jobs(db_session, event.id)
+    assert set(jobs) == {match.id}
+    assert jobs[match.id].status == DeliveryStatus.pending
+    assert jobs[match.id].attempt_count == 0
+
+
+@pytest.mark.asyncio
+async def test_publish_batch_costs_the_same_statements_at_any_size(
+    db_session: AsyncSession, query_counter
+):
+    subs = [_subscription(f"s{i}") for i in range(3)]
+    db_session.add_all(subs)
+    await db_session.flush()
+
+    statements = []
+    for size in (1, 200):
+        query_counter.clear()
+        events = await publish_events(
+            db_session, [("request_submitted", {"n": i}) for i in range(size)]
+        )
+        statements.append(len(query_counter))
+        assert all(event.pending_jobs == 3 for event in events)
+
+    assert statements[0] == statements[1]
+    jobs = await db_session.execute(
+        select(DeliveryJob.event_id).where(DeliveryJob.event_id.in_([e.id for e in events]))
+    )
+    assert len(jobs.all()) == 600
+
+
+@pytest.mark.asyncio
+async def test_claim_is_one_round_trip_whatever_the_history(
+    db_session: AsyncSession, query_counter
+):
+    subs = [_subscription(f"s{i}") for i in range(5)]
+    db_session.add_all(subs)
+    await db_session.flush()
+    events = [await publish_event(db_session, "request_submitted", {"n": i}) for i in range(10)]
+    # A long retry history on every pair must not make claiming more expensive.
+    db_session.add_all(
+        DeliveryAttempt(
+            event_id=event.id,
+            subscription_id=sub.id,
+            attempt_number=n,
+            status=DeliveryStatus.failed,
+        )
+        for event in events
+        for sub in subs
+        for n in range(1, 4)
+    )
+    await db_session.flush()
+
+    query_counter.clear()
+    due = await claim_due_deliveries(db_session, "worker-1", limit=100)
+
+    assert len(due) == 50
+    assert len(query_counter) == 1
+
+
+@pytest.mark.asyncio
+async def test_claim_returns_only_due_pending_jobs(db_session: AsyncSession):
+    now = datetime.now(timezone.utc)
+    event = OutboxEvent(event_type=EventType.request_submitted, payload=json.dumps({}))
+    fresh, retry_due, waiting, delivered, dead, disabled = subs = [
+        _subscription("fresh"),
+        _subscription("retry-due"),
+        _subscription("waiting"),
+        _subscription("delivered"),
+        _subscription("dead"),
+        _subscription("disabled", enabled=False),
+    ]
+    db_session.add_all([event, *subs])
+    await db_session.flush()
+
+    def job(sub, **kwargs):
+        return DeliveryJob(event_id=event.id, subscription_id=sub.id, **kwargs)
+
+    db_session.add_all(
+        [
+            job(fresh, next_attempt_at=now),
+            job(retry_due, attempt_count=2, next_attempt_at=now - timedelta(seconds=1)),
+            job(waiting, attempt_count=1, next_attempt_at=now + timedelta(minutes=5)),
+            job(delivered, status=DeliveryStatus.delivered, next_attempt_at=now),
+            job(dead, status=DeliveryStatus.dead_lettered, next_attempt_at=now),
+            job(disabled, next_attempt_at=now),
+        ]
+    )
+    await db_session.flush()
+
+    assert await get_next_due_at(db_session) == now - timedelta(seconds=1)
+
+    due = await claim_due_deliveries(db_session, "worker-1")
+
+    assert {sub_id: attempt_number for _, sub_id, attempt_number in due} == {
+        fresh.id: 1,
+        retry_due.id: 3,
+    }
+
+
+def _client(status_code: int) -> httpx.AsyncClient:
+    client = AsyncMock(spec=httpx.AsyncClient)
+    client.post.return_value = httpx.Response(status_code, text="")
+    return client
+
+
+@pytest.mark.asyncio
+async def test_deliver_webhook_writes_outcome_to_job(db_session: AsyncSession):
+    ok, failing, exhausted = subs = [_subscription(n) for n in ("ok", "failing", "exhausted")]
+    db_session.add_all(subs)
+    await db_session.flush()
+    event = await publish_event(db_session, "request_submitted", {"title": "Test"})
+    await claim_due_deliveries(db_session, "worker-1")
+
+    assert await deliver_webhook(db_session, event, ok, _client(200), attempt_number=1)
+    assert not await deliver_webhook(db_session, event, failing, _client(500), attempt_number=1)
+    assert not await deliver_webhook(db_session, event, exhausted, _client(500), attempt_number=5)
+
+    jobs = await _jobs(db_session, event.id)
+    assert jobs[ok.id].status == DeliveryStatus.delivered
+    assert jobs[failing.id].status == DeliveryStatus.pending
+    assert jobs[failing.id].attempt_count == 1
+    assert jobs[failing.id].next_attempt_at > datetime.now(timezone.utc)
+    assert jobs[failing.id].last_error == "HTTP 500"
+    assert jobs[exhausted.id].status == DeliveryStatus.dead_lettered
+    assert all(job.locked_by is None for job in jobs.values())
+
+    dead_letters = await db_session.execute(
+        select(DeadLetter.subscription_id).where(DeadLetter.event_id == event.id)
+    )
+    assert dead_letters.scalars().all() == [exhausted.id]
+
+
+async def _reload(session: AsyncSession, event: OutboxEvent) -> OutboxEvent:
+    result = await session.execute(
+        select(OutboxEvent)
+        .where(OutboxEvent.id == event.id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_event_without_subscribers_completes_on_publish(db_session: AsyncSession):
+    event = await publish_event(db_session, "request_rejected", {"title": "Nobody listens"})
+
+    assert event.pending_jobs == 0
+    assert event.completed_at is not None
+    assert (await get_pending_events(db_session)).items == []
+
+
+@pytest.mark.asyncio
+async def test_event_completes_once_every_job_finishes(db_session: AsyncSession):
+    ok, flaky, exhausted = subs = [_subscription(n) for n in ("ok", "flaky", "exhausted")]
+    db_session.add_all(subs)
+    await db_session.flush()
+    done = await publish_event(db_session, "request_approved", {"title": "Earlier"})
+    event = await publish_event(db_session, "request_submitted", {"title": "Test"})
+    assert event.pending_jobs == 3
+    assert [e.id for e in (await get_pending_events(db_session)).items] == [event.id]
+    assert done.completed_at is not None
+
+    assert await deliver_webhook(db_session, event, ok, _client(200), attempt_number=1)
+    assert not await deliver_webhook(db_session, event, flaky, _client(500), attempt_number=1)
+    assert not await deliver_webhook(db_session, event, exhausted, _client(500), attempt_number=5)
+    event = await _reload(db_session, event)
+    assert (event.pending_jobs, event.completed_at) == (1, None)
+
+    assert await deliver_webhook(db_session, event, flaky, _client(200), attempt_number=2)
+    # A duplicate result for an already finished job must not count twice.
+    assert await deliver_webhook(db_session, event, ok, _client(200), attempt_number=2)
+    event = await _reload(db_session, event)
+    assert event.pending_jobs == 0
+    assert event.completed_at is not None
+    assert (await get_pending_events(db_session)).items == []
+
+
+@pytest.mark.asyncio
+async def test_replayed_dead_letter_reopens_event(db_session: AsyncSession):
+    sub = _subscription("exhausted")
+    db_session.add(sub)
+    await db_session.flush()
+    event = await publish_event(db_session, "request_submitted", {"title": "Test"})
+    await deliver_webhook(db_session, event, sub, _client(500), attempt_number=5)
+    assert (await _reload(db_session, event)).completed_at is not None
+    dead_letter = (
+        await db_session.execute(select(DeadLetter).where(DeadLetter.event_id == event.id))
+    ).scalar_one()
+
+    assert not await replay_dead_letter(db_session, dead_letter.id, _client(500))
+
+    event = await _reload(db_session, event)
+    assert (event.pending_jobs, event.completed_at) == (1, None)
+    assert [e.id for e in (await get_pending_events(db_session)).items] == [event.id]
@@ -0,0 +1,187 @@
+"""Integration tests for multi-worker delivery job leasing."""
+
+import asyncio
+from collections import Counter
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+from sqlalchemy import select, update
+
+from integrations_hub.config import settings
+from integrations_hub.models.tables import DeliveryJob, WebhookSubscription
+from integrations_hub.services.delivery import (
+    claim_due_deliveries,
+    process_outbox,
+    release_deliveries,
+    renew_delivery_leases,
+)
+from integrations_hub.services.outbox import publish_event
+from integrations_hub.services.routing import RoutingTable
+
+
+async def _seed(session_factory, events: int, subscriptions: int = 1) -> None:
+    async with session_factory() as session:
+        session.add_all(
+            WebhookSubscription(
+                url=f"https://example.com/hook/{i}",
+                secret="a-long-enough-secret-key",
+                events=["request_submitted"],
+            )
+            for i in range(subscriptions)
+        )
+        await session.commit()
+        for i in range(events):
+            await publish_event(session, "request_submitted", {"n": i})
+
+
+def _pairs(due) -> set:
+    return {(event.id, sub_id) for event, sub_id, _ in due}
+
+
+@pytest.mark.asyncio
+async def test_workers_claim_disjoint_batches(session_factory):
+    await _seed(session_factory, events=10)
+
+    async with session_factory() as session:
+        first = await claim_due_deliveries(session, "worker-a", limit=6)
+        second = await claim_due_deliveries(session, "worker-b", limit=6)
+        third = await claim_due_deliveries(session, "worker-c", limit=6)
+
+    assert len(first) == 6
+    assert len(second) == 4
+    assert third == []
+    assert not _pairs(first) & _pairs(second)
+
+
+@pytest.mark.asyncio
+async def test_claim_skips_rows_locked_by_another_transaction(session_factory):
+    await _seed(session_factory, events=4)
+
+    async with session_factory() as holder, session_factory() as claimer:
+        locked = await holder.execute(select(DeliveryJob.event_id).limit(3).with_for_update())
+        locked_ids = set(locked.scalars().all())
+
+        claimed = await asyncio.wait_for(claim_due_deliveries(claimer, "worker-b"), timeout=5)
+        await holder.rollback()
+
+    assert len(claimed) == 1
+    assert claimed[0][0].id not in locked_ids
+
+
+@pytest.mark.asyncio
+async def test_expired_lease_is_reclaimed(session_factory):
+    await _seed(session_factory, events=3)
+
+    async with session_factory() as session:
+        crashed = await claim_due_deliveries(session, "worker-a")
+        assert await claim_due_deliveries(session, "worker-b") == []
+
+        # worker-a never reports back; its leases run out.
+        await session.execute(update(DeliveryJob).values(next_attempt_at=DeliveryJob.created_at))
+        await session.commit()
+        reclaimed = await claim_due_deliveries(session, "worker-b")
+
+    assert _pairs(reclaimed) == _pairs(crashed)
+
+
+@pytest.mark.asyncio
+async def test_renew_only_extends_own_leases(session_factory):
+    await _seed(session_factory, events=2)
+
+    async with session_factory() as session:
+        await claim_due_deliveries(session, "worker-a")
+        await session.execute(update(DeliveryJob).values(next_attempt_at=DeliveryJob.created_at))
+        await session.commit()
+
+        await renew_delivery_leases(session, "worker-b")
+        assert len(await claim_due_deliveries(session, "worker-c", limit=1)) == 1
+
+        await renew_delivery_leases(session, "worker-c")
+        assert await claim_due_deliveries(session, "worker-d") != []
+        assert await claim_due_deliveries(session, "worker-e") == []
+
+
+@pytest.mark.asyncio
+async def test_renew_only_extends_the_listed_leases(session_factory):
+    await _seed(session_factory, events=2)
+
+    async with session_factory() as session:
+        held, dropped = await claim_due_deliveries(session, "worker-a")
+        await session.execute(update(DeliveryJob).values(next_attempt_at=DeliveryJob.created_at))
+        await session.commit()
+
+        await renew_delivery_leases(session, "worker-a", [(held[0].id, held[1])])
+        reclaimed = await claim_due_deliveries(session, "worker-b")
+
+    assert _pairs(reclaimed) == _pairs([dropped])
+
+
+@pytest.mark.asyncio
+async def test_released_jobs_are_due_again(session_factory):
+    await _seed(session_factory, events=2)
+
+    async with session_factory() as session:
+        claimed = await claim_due_deliveries(session, "worker-a")
+        await release_deliveries(session, "worker-b", _pairs(claimed))
+        assert await claim_due_deliveries(session, "worker-c") == []
+
+        await release_deliveries(session, "worker-a", _pairs(claimed))
+        assert _pairs(await claim_due_deliveries(session, "worker-c")) == _pairs(claimed)
+
+
+@pytest.mark.asyncio
+async def test_skipped_jobs_are_released(session_factory):
+    await _seed(session_factory, events=2)
+    client = AsyncMock(spec=httpx.AsyncClient)
+
+    with patch.object(RoutingTable, "resolve", AsyncMock(return_value={})):
+        await process_outbox(client, session_factory, "worker-a")
+
+    client.post.assert_not_called()
+    async with session_factory() as session:
+        locks = (await session.execute(select(DeliveryJob.locked_by))).scalars().all()
+    assert locks == [None, None]
+
+
+@pytest.mark.asyncio
+async def test_crashed_delivery_is_released_with_a_backoff(session_factory):
+    await _seed(session_factory, events=1)
+    client = AsyncMock(spec=httpx.AsyncClient)
+
+    with patch(
+        "integrations_hub.services.delivery.deliver_webhook",
+        AsyncMock(side_effect=RuntimeError("boom")),
+    ):
+        await process_outbox(client, session_factory, "worker-a")
+
+    async with session_factory() as session:
+        job = (await session.execute(select(DeliveryJob))).scalar_one()
+    assert job.locked_by is None
+    assert job.next_attempt_at > datetime.now(timezone.utc)
+    assert "boom" in job.last_error
+
+
+@pytest.mark.asyncio
+async def test_concurrent_workers_post_each_pair_once(session_factory):
+    await _seed(session_factory, events=20, subscriptions=3)
+    posts: Counter[tuple[str, str]] = Counter()
+
+    async def fake_post(url, headers, **kwargs):
+        posts[(headers["X-Webhook-Event-Id"], url)] += 1
+        await asyncio.sleep(0.001)
+        return httpx.Response(200, text="OK")
+
+    client = AsyncMock(spec=httpx.AsyncClient)
+    client.post.side_effect = fake_post
+
+    async def worker(worker_id: str) -> None:
+        while await process_outbox(client, session_factory, worker_id):
+            pass
+
+    with patch.object(settings, "delivery_batch_size", 4):
+        await asyncio.gather(*(worker(f"worker-{i}") for i in range(3)))
+
+    assert len(posts) == 60
+    assert set(posts.values()) == {1}
@@ -0,0 +1,94 @@
+"""Unit tests for webhook envelope rendering."""
+
+import json
+import uuid
+from dataclasses import dataclass, field
+from unittest.mock import patch
+
+import integrations_hub.serialization as serialization
+from integrations_hub.config import settings
+from integrations_hub.models.tables import EventType
+from integrations_hub.serialization import dumps
+from integrations_hub.services.envelope import (
+    _parts_cache,
+    render_envelope,
+    render_signed_envelope,
+)
+from integrations_hub.services.signing import Signer, sign_payload
+
+
+@dataclass
+class FakeEvent:
+    id: uuid.UUID = field(default_factory=uuid.uuid4)
+    event_type: EventType = EventType.request_submitted
+    payload: str = json.dumps({"title": "Café access", "items": [1, 2, {"x": None}]})
+
+
+def test_envelope_matches_serializing_the_envelope_dict():
+    event = FakeEvent()
+
+    body = render_envelope(event, 1700000000)
+
+    expected = {
+        "event_id": str(event.id),
+        "event_type": "request_submitted",
+        "timestamp": 1700000000,
+        "data": json.loads(event.payload),
+    }
+    assert body == json.dumps(expected).encode()
+
+
+def test_payload_is_spliced_verbatim():
+    event = FakeEvent(payload=dumps({"title": "Café", "n": 1}))
+
+    body = json.loads(render_envelope(event, 42))
+
+    assert body["data"] == {"title": "Café", "n": 1}
+    assert render_envelope(event, 42).endswith(f', "data": {event.payload}}}'.encode())
+
+
+def test_envelope_is_rendered_once_per_event():
+    event = FakeEvent(payload=json.dumps({"blob": "x" * 100_000}))
+    hits, misses = _parts_cache.hits, _parts_cache.misses
+
+    bodies = {render_envelope(event, ts) for ts in range(50)}
+
+    assert len(bodies) == 50
+    assert _parts_cache.misses - misses == 1
+    assert _parts_cache.hits - hits == 49
+
+
+def test_envelope_cache_is_bounded_by_bytes():
+    events = [FakeEvent(payload=json.dumps({"blob": "x" * 100_000})) for _ in range(5)]
+
+    with patch.object(settings, "envelope_cache_max_bytes", 250_000):
+        for event in events:
+            render_envelope(event, 1)
+        assert _parts_cache.size <= 250_000
+        # The two most recent events fit; older ones were evicted
+        misses = _parts_cache.misses
+        render_envelope(events[-1], 2)
+        render_envelope(events[0], 2)
+        assert _parts_cache.misses - misses == 1
+
+        huge = FakeEvent(payload=json.dumps({"blob": "x" * 300_000}))
+        assert render_envelope(huge, 1).endswith(f', "data": {huge.payload}}}'.encode())
+        assert _parts_cache.size <= 250_000
+
+
+def test_signed_envelope_signs_the_payload():
+    event = FakeEvent()
+
+    body, signature = render_signed_envelope(event, 42, Signer("test-secret-key-1234"))
+
+    assert body == render_envelope(event, 42)
+    assert signature == sign_payload(event.payload, "test-secret-key-1234", 42)[0]
+
+
+def test_dumps_falls_back_to_stdlib_json():
+    with patch.object(serialization, "orjson", None):
+        assert dumps({"a": [1, 2]}) == '{"a": [1, 2]}'
+
+
+def test_dumps_handles_integers_beyond_64_bits():
+    assert dumps({"n": 2**64}) == '{"n": 18446744073709551616}'
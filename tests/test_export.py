@@ -0,0 +1,90 @@
+"""Tests for the streaming NDJSON exports of delivery history."""
+
+import gzip
+import json
+import uuid
+from unittest.mock import patch
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from integrations_hub.config import settings
+from integrations_hub.models.tables import (
+    DeadLetter,
+    DeliveryAttempt,
+    DeliveryStatus,
+    WebhookSubscription,
+)
+from integrations_hub.services.export import export_delivery_attempts
+
+
+async def _seed(session: AsyncSession) -> tuple[WebhookSubscription, WebhookSubscription]:
+    ours, other = (
+        WebhookSubscription(
+            url=f"https://example.com/{name}",
+            secret="a-long-enough-secret-key",
+            events=["request_submitted"],
+        )
+        for name in ("ours", "other")
+    )
+    session.add_all([ours, other])
+    await session.flush()
+    statuses = [DeliveryStatus.failed] * 4 + [DeliveryStatus.delivered]
+    session.add_all(
+        DeliveryAttempt(
+            event_id=uuid.uuid4(), subscription_id=sub.id, attempt_number=1, status=status
+        )
+        for sub in (ours, other)
+        for status in statuses
+    )
+    session.add_all(
+        DeadLetter(event_id=uuid.uuid4(), subscription_id=ours.id, total_attempts=5)
+        for _ in range(3)
+    )
+    await session.flush()
+    return ours, other
+
+
+def _lines(body: bytes) -> list[dict]:
+    return [json.loads(line) for line in body.splitlines()]
+
+
+@pytest.mark.asyncio
+async def test_export_streams_attempts_in_batches(db_session: AsyncSession):
+    ours, _ = await _seed(db_session)
+
+    with patch.object(settings, "export_batch_size", 2):
+        chunks = [
+            chunk
+            async for chunk in export_delivery_attempts(db_session, subscription_id=ours.id)
+        ]
+
+    assert [len(_lines(chunk)) for chunk in chunks] == [2, 2, 1]
+    rows = _lines(b"".join(chunks))
+    assert len({row["id"] for row in rows}) == 5
+    assert {row["subscription_id"] for row in rows} == {str(ours.id)}
+
+
+@pytest.mark.asyncio
+async def test_export_endpoints_filter_and_gzip(client: AsyncClient, db_session: AsyncSession):
+    ours, _ = await _seed(db_session)
+
+    with patch.object(settings, "export_batch_size", 3):
+        resp = await client.get("/api/v1/admin/export/attempts", params={"status": "failed"})
+        assert resp.headers["content-type"] == "application/x-ndjson"
+        assert 'filename="delivery-attempts.ndjson"' in resp.headers["content-disposition"]
+        assert len(_lines(resp.content)) == 8
+
+        resp = await client.get(
+            "/api/v1/admin/export/dead-letters",
+            params={"gzip": "true", "subscription_id": str(ours.id)},
+        )
+    assert resp.headers["content-type"] == "application/gzip"
+    rows = _lines(gzip.decompress(resp.content))
+    assert len(rows) == 3 and set(rows[0]) >= {"event_id", "last_error", "total_attempts"}
+
+    resp = await client.get(
+        "/api/v1/admin/export/attempts", params={"created_before": "2000-01-01T00:00:00Z"}
+    )
+    assert resp.status_code == 200 and resp.content == b""
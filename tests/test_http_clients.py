@@ -0,0 +1,136 @@
+"""Unit tests for the shared outbound HTTP client registry."""
+
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+
+from integrations_hub.config import settings
+from integrations_hub.connectors.slack import post_slack_message, slack_error
+from integrations_hub.http_clients import (
+    RESPONSE_BODY_LIMIT,
+    SLACK,
+    WEBHOOKS,
+    HttpClientRegistry,
+    capped_body,
+    http_clients,
+    limit_response_body,
+)
+from tests.test_slack_connector import _make_event
+
+
+@pytest.mark.asyncio
+async def test_registry_reuses_one_client_per_egress_path():
+    registry = HttpClientRegistry()
+
+    webhooks = registry.get(WEBHOOKS)
+    assert registry.get(WEBHOOKS) is webhooks
+    assert registry.get(SLACK) is not webhooks
+
+    await registry.aclose()
+    assert webhooks.is_closed
+    reopened = registry.get(WEBHOOKS)
+    assert reopened is not webhooks and not reopened.is_closed
+    await registry.aclose()
+
+
+def test_clients_use_configured_pool_and_http2():
+    registry = HttpClientRegistry()
+    with (
+        patch("integrations_hub.http_clients.httpx.AsyncClient") as client_cls,
+        patch("integrations_hub.http_clients._h2_installed", return_value=True),
+        patch.object(settings, "slack_http2_enabled", True),
+        patch.object(settings, "http_max_connections", 7),
+        patch.object(settings, "http_keepalive_expiry_seconds", 12.0),
+    ):
+        registry.get(SLACK)
+        registry.get(WEBHOOKS)
+
+    (slack_call, webhook_call) = client_cls.call_args_list
+    assert slack_call.kwargs["http2"] is True
+    assert webhook_call.kwargs["http2"] is False
+    limits = slack_call.kwargs["limits"]
+    assert limits.max_connections == 7
+    assert limits.keepalive_expiry == 12.0
+
+
+def test_http2_falls_back_without_h2_installed():
+    registry = HttpClientRegistry()
+    with (
+        patch("integrations_hub.http_clients.httpx.AsyncClient") as client_cls,
+        patch("integrations_hub.http_clients._h2_installed", return_value=False),
+        patch.object(settings, "webhook_http2_enabled", True),
+    ):
+        registry.get(WEBHOOKS)
+
+    assert client_cls.call_args.kwargs["http2"] is False
+
+
+@pytest.mark.asyncio
+async def test_slack_messages_share_the_registry_client():
+    shared = AsyncMock(spec=httpx.AsyncClient)
+    shared.post.return_value = httpx.Response(200, json={"ok": True})
+
+    with patch.object(http_clients, "get", return_value=shared) as get_client:
+        for _ in range(3):
+            assert slack_error(await post_slack_message(_make_event())) is None
+
+    get_client.assert_called_with(SLACK)
+    assert shared.post.await_count == 3
+    shared.aclose.assert_not_called()
+
+
+async def _limited_client(handler) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        transport=httpx.MockTransport(handler),
+        event_hooks={"response": [limit_response_body]},
+    )
+
+
+@pytest.mark.asyncio
+async def test_response_bodies_are_read_up_to_the_cap():
+    pulled = []
+
+    async def huge_body():
+        for _ in range(1000):
+            pulled.append(1)
+            yield b"x" * 1024
+
+    async def handler(request):
+        media_type = request.url.params.get("type", "text/html")
+        return httpx.Response(200, headers={"Content-Type": media_type}, content=huge_body())
+
+    with patch.object(settings, "delivery_response_max_bytes", 2500):
+        async with await _limited_client(handler) as client:
+            resp = await client.post("https://receiver.test/")
+            assert (len(resp.content), len(pulled)) == (2500, 3)
+            assert capped_body(resp)[1] is True
+
+            pulled.clear()
+            resp = await client.post(
+                "https://receiver.test/", extensions={RESPONSE_BODY_LIMIT: 10}
+            )
+            assert (resp.text, len(pulled)) == ("x" * 10, 1)
+
+            pulled.clear()
+            resp = await client.post(
+                "https://receiver.test/", extensions={RESPONSE_BODY_LIMIT: 1000 * 1024}
+            )
+            assert (len(resp.content), len(pulled)) == (1000 * 1024, 1000)
+            assert capped_body(resp)[1] is False
+
+            pulled.clear()
+            resp = await client.post("https://receiver.test/?type=application/pdf")
+            assert (resp.content, pulled) == (b"", [])
+
+
+def test_webhook_client_limits_response_bodies():
+    registry = HttpClientRegistry()
+    with patch("integrations_hub.http_clients.httpx.AsyncClient") as client_cls:
+        registry.get(WEBHOOKS)
+        registry.get(SLACK)
+
+    webhook_call, slack_call = client_cls.call_args_list
+    assert webhook_call.kwargs["event_hooks"] == {"response": [limit_response_body]}
+    assert webhook_call.kwargs["headers"] == {"Accept-Encoding": "identity"}
+    assert "event_hooks" not in slack_call.kwargs
@@ -0,0 +1,64 @@
+"""Integration tests for the LISTEN/NOTIFY wakeup of the delivery loop."""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+
+from integrations_hub.config import settings
+from integrations_hub.services.outbox import OUTBOX_CHANNEL, publish_event
+from integrations_hub.worker.listener import NotificationListener, listener_dsn
+from tests.conftest import TEST_DATABASE_URL
+
+
+@pytest.fixture
+async def listener():
+    listener = NotificationListener(listener_dsn(TEST_DATABASE_URL), [OUTBOX_CHANNEL])
+    assert await listener.connect()
+    # Drain the wakeup issued on connect.
+    assert await listener.wait()
+    yield listener
+    await listener.close()
+
+
+def test_listener_dsn_drops_sqlalchemy_driver():
+    dsn = listener_dsn("postgresql+asyncpg://user:pw@db:5432/hub")
+    assert dsn == "postgresql://user:pw@db:5432/hub"
+
+
+@pytest.mark.asyncio
+async def test_publish_wakes_listener(listener, session_factory):
+    async with session_factory() as session:
+        started = time.perf_counter()
+        await publish_event(session, "request_submitted", {"title": "Test"})
+
+    with patch.object(settings, "delivery_fallback_poll_interval_seconds", 5.0):
+        assert await listener.wait() is True
+    assert time.perf_counter() - started < 1.0
+
+
+@pytest.mark.asyncio
+async def test_wait_times_out_without_notifications(listener):
+    with patch.object(settings, "delivery_fallback_poll_interval_seconds", 0.05):
+        assert await listener.wait() is False
+
+
+@pytest.mark.asyncio
+async def test_uncommitted_publish_does_not_wake_listener(listener, db_session):
+    await publish_event(db_session, "request_submitted", {"title": "Rolled back"})
+
+    with patch.object(settings, "delivery_fallback_poll_interval_seconds", 0.2):
+        assert await listener.wait() is False
+
+
+@pytest.mark.asyncio
+async def test_unreachable_database_falls_back_to_polling():
+    listener = NotificationListener("postgresql://postgres@127.0.0.1:1/nope", [OUTBOX_CHANNEL])
+    with patch.object(settings, "delivery_poll_interval_seconds", 0.05):
+        assert await listener.connect() is False
+        started = asyncio.get_running_loop().time()
+        assert await listener.wait() is False
+
+    assert not listener.connected
+    assert asyncio.get_running_loop().time() - started < 1.0
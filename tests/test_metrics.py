@@ -0,0 +1,168 @@
+"""Tests for the Prometheus instrumentation of the API and delivery pipeline."""
+
+import asyncio
+import uuid
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from prometheus_client import REGISTRY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from integrations_hub.config import settings
+from integrations_hub.metrics import track_http_requests
+from integrations_hub.models.tables import WebhookSubscription
+from integrations_hub.services.delivery import process_outbox
+from integrations_hub.services.outbox import get_backlog, publish_event, publish_events
+from integrations_hub.worker import delivery_worker
+
+
+def _sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def _subscription(path: str) -> WebhookSubscription:
+    return WebhookSubscription(
+        url=f"https://example.com/{path}",
+        secret="a-long-enough-secret-key",
+        events=["request_submitted"],
+    )
+
+
+@pytest.mark.asyncio
+async def test_api_requests_are_labelled_by_route(client: AsyncClient):
+    route = "/api/v1/subscriptions/{subscription_id}"
+    before = _sample("http_requests_total", method="GET", path=route, status_code="404")
+
+    for _ in range(2):
+        await client.get(f"/api/v1/subscriptions/{uuid.uuid4()}")
+    await client.get("/metrics")
+
+    assert _sample("http_requests_total", method="GET", path=route, status_code="404") == (
+        before + 2
+    )
+    assert _sample("http_request_duration_seconds_count", method="GET", path=route) >= 2
+    assert _sample("http_requests_total", method="GET", path="/metrics", status_code="200") >= 1
+
+
+@pytest.mark.asyncio
+async def test_requests_that_raise_are_counted_as_500s():
+    app = FastAPI()
+    app.middleware("http")(track_http_requests)
+
+    @app.get("/boom/{item_id}")
+    async def boom(item_id: str):
+        raise RuntimeError("boom")
+
+    route = "/boom/{item_id}"
+    before = _sample("http_requests_total", method="GET", path=route, status_code="500")
+    timed = _sample("http_request_duration_seconds_count", method="GET", path=route)
+    transport = ASGITransport(app=app, raise_app_exceptions=False)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
+        assert (await client.get("/boom/1")).status_code == 500
+
+    assert _sample("http_requests_total", method="GET", path=route, status_code="500") == (
+        before + 1
+    )
+    assert _sample("http_request_duration_seconds_count", method="GET", path=route) == timed + 1
+
+
+@pytest.mark.asyncio
+async def test_deliveries_record_outcomes_and_stage_timings(session_factory):
+    async with session_factory() as session:
+        ok, flaky = _subscription("ok"), _subscription("flaky")
+        session.add_all([ok, flaky])
+        await session.commit()
+        await publish_event(session, "request_submitted", {"title": "Test"})
+
+    async def post(url, **kwargs):
+        return httpx.Response(500 if url.endswith("flaky") else 200, text="")
+
+    client = AsyncMock(spec=httpx.AsyncClient)
+    client.post.side_effect = post
+    stages = ("claim", "routing", "sign", "http", "commit")
+    before = {
+        "delivered": _sample("webhook_deliveries_total", status="delivered"),
+        "failed": _sample("webhook_deliveries_total", status="failed"),
+        "retries": _sample("webhook_delivery_retries_total", subscription_id=str(flaky.id)),
+        "duration": _sample("webhook_delivery_duration_seconds_count"),
+        **{
+            stage: _sample("delivery_stage_duration_seconds_count", stage=stage)
+            for stage in stages
+        },
+    }
+
+    await process_outbox(client, session_factory, "worker-1")
+
+    assert _sample("webhook_deliveries_total", status="delivered") == before["delivered"] + 1
+    assert _sample("webhook_deliveries_total", status="failed") == before["failed"] + 1
+    assert _sample("webhook_delivery_retries_total", subscription_id=str(flaky.id)) == (
+        before["retries"] + 1
+    )
+    assert _sample("webhook_delivery_duration_seconds_count") == before["duration"] + 2
+    # The worker claims again as deliveries finish, but only the first claim
+    # finds jobs to route.
+    assert _sample("delivery_stage_duration_seconds_count", stage="claim") > before["claim"] + 1
+    for stage in stages[1:]:
+        runs = 1 if stage == "routing" else 2
+        assert _sample("delivery_stage_duration_seconds_count", stage=stage) == (
+            before[stage] + runs
+        )
+
+
+@pytest.mark.asyncio
+async def test_dead_letters_are_counted_by_subscription(session_factory):
+    async with session_factory() as session:
+        sub = _subscription("down")
+        session.add(sub)
+        await session.commit()
+        await publish_event(session, "request_submitted", {"title": "Test"})
+    client = AsyncMock(spec=httpx.AsyncClient)
+    client.post.return_value = httpx.Response(500, text="")
+    before = _sample("webhook_dead_letters_total", subscription_id=str(sub.id))
+
+    with patch.object(settings, "delivery_max_attempts", 1):
+        await process_outbox(client, session_factory, "worker-1")
+
+    assert _sample("webhook_dead_letters_total", subscription_id=str(sub.id)) == before + 1
+
+
+@pytest.mark.asyncio
+async def test_backlog_and_published_events(db_session: AsyncSession):
+    assert await get_backlog(db_session) == (0, None)
+    db_session.add(_subscription("hook"))
+    before = _sample("events_published_total", event_type="request_submitted")
+
+    first = await publish_event(db_session, "request_submitted", {"n": 0})
+    await publish_events(db_session, [("request_submitted", {"n": i}) for i in range(1, 3)])
+    await publish_events(db_session, [("request_approved", {"n": 3})])
+
+    assert await get_backlog(db_session) == (3, first.created_at)
+    assert _sample("events_published_total", event_type="request_submitted") == before + 3
+
+
+@pytest.mark.asyncio
+async def test_backlog_gauges_refresh_during_a_long_delivery_cycle():
+    cycle_started = asyncio.Event()
+
+    async def long_cycle(*args, **kwargs):
+        cycle_started.set()
+        await asyncio.Event().wait()
+
+    with (
+        patch.object(delivery_worker, "NotificationListener", MagicMock(return_value=AsyncMock())),
+        patch.object(delivery_worker, "http_clients", MagicMock()),
+        patch.object(delivery_worker, "process_outbox", long_cycle),
+        patch.object(delivery_worker, "_report_backlog", AsyncMock()) as report_backlog,
+        patch.object(settings, "metrics_backlog_interval_seconds", 0.01),
+    ):
+        loop = asyncio.create_task(delivery_worker.run_delivery_loop("worker-1"))
+        await cycle_started.wait()
+        await asyncio.sleep(0.1)
+        loop.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await loop
+
+    assert report_backlog.await_count > 2
@@ -0,0 +1,90 @@
+"""Tests for keyset pagination of the list endpoints."""
+
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from integrations_hub.api.pagination import NEXT_CURSOR_HEADER
+from integrations_hub.models.tables import DeadLetter, WebhookSubscription
+from integrations_hub.pagination import Cursor, decode_cursor, encode_cursor
+
+
+def _subscription(n: int, enabled: bool = True) -> WebhookSubscription:
+    return WebhookSubscription(
+        url=f"https://example.com/{n}",
+        secret="a-long-enough-secret-key",
+        events=["request_approved"],
+        enabled=enabled,
+    )
+
+
+async def _pages(client: AsyncClient, url: str, **params) -> list[list[dict]]:
+    pages, cursor = [], None
+    while True:
+        resp = await client.get(url, params={**params, **({"cursor": cursor} if cursor else {})})
+        assert resp.status_code == 200
+        pages.append(resp.json())
+        cursor = resp.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return pages
+
+
+def test_cursor_round_trip():
+    cursor = Cursor(datetime(2024, 5, 1, 12, 30, 0, 123456, tzinfo=timezone.utc), uuid.uuid4())
+    assert decode_cursor(encode_cursor(cursor)) == cursor
+    for garbage in ("", "not-a-cursor", encode_cursor(cursor)[:-3]):
+        with pytest.raises(ValueError):
+            decode_cursor(garbage)
+
+
+@pytest.mark.asyncio
+async def test_subscriptions_page_through_every_row_once(
+    client: AsyncClient, db_session: AsyncSession
+):
+    # Rows created in one transaction share created_at, so pages split on id.
+    subs = [_subscription(n, enabled=n % 3 != 0) for n in range(7)]
+    db_session.add_all(subs)
+    await db_session.flush()
+
+    pages = await _pages(client, "/api/v1/subscriptions", limit=3)
+    assert [len(page) for page in pages] == [3, 3, 1]
+    seen = [s["id"] for page in pages for s in page]
+    assert sorted(seen) == sorted(str(s.id) for s in subs)
+
+    pages = await _pages(client, "/api/v1/subscriptions", limit=2, enabled="false")
+    disabled = {s["id"] for page in pages for s in page}
+    assert disabled == {str(subs[n].id) for n in (0, 3, 6)}
+
+
+@pytest.mark.asyncio
+async def test_dead_letters_filter_and_page(client: AsyncClient, db_session: AsyncSession):
+    ours, other = _subscription(1), _subscription(2)
+    db_session.add_all([ours, other])
+    await db_session.flush()
+    db_session.add_all(
+        DeadLetter(event_id=uuid.uuid4(), subscription_id=sub.id, total_attempts=5)
+        for sub in [ours] * 5 + [other] * 2
+    )
+    await db_session.flush()
+
+    pages = await _pages(
+        client, "/api/v1/admin/dead-letters", limit=2, subscription_id=str(ours.id)
+    )
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert {d["subscription_id"] for page in pages for d in page} == {str(ours.id)}
+
+    resp = await client.get(
+        "/api/v1/admin/dead-letters", params={"created_before": "2000-01-01T00:00:00Z"}
+    )
+    assert resp.json() == []
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor_is_rejected(client: AsyncClient):
+    resp = await client.get("/api/v1/admin/events/pending", params={"cursor": "bogus"})
+    assert resp.status_code == 400
+    resp = await client.get("/api/v1/subscriptions", params={"limit": 0})
+    assert resp.status_code == 422
@@ -0,0 +1,187 @@
+"""Integration tests for monthly partition maintenance and retention."""
+
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import func, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from integrations_hub.config import settings
+from integrations_hub.models.tables import (
+    DeadLetter,
+    DeliveryAttempt,
+    DeliveryJob,
+    DeliveryStatus,
+    OutboxEvent,
+    WebhookSubscription,
+)
+from integrations_hub.services.partitions import (
+    MAINTENANCE_LOCK_KEY,
+    create_partitions,
+    list_partitions,
+    prune_finished_jobs,
+    prune_partitions,
+    run_partition_maintenance,
+)
+from tests.conftest import engine
+
+
+def _at(year: int, month: int, day: int = 1) -> datetime:
+    return datetime(year, month, day, 12, tzinfo=timezone.utc)
+
+
+async def _add_event(
+    session: AsyncSession, sub: WebhookSubscription, created_at: datetime, finished: bool
+) -> OutboxEvent:
+    event = OutboxEvent(
+        event_type="request_submitted",
+        payload="{}",
+        created_at=created_at,
+        pending_jobs=0 if finished else 1,
+        completed_at=created_at if finished else None,
+    )
+    session.add(event)
+    await session.flush()
+    status = DeliveryStatus.dead_lettered if finished else DeliveryStatus.pending
+    session.add_all(
+        [
+            DeliveryJob(event_id=event.id, subscription_id=sub.id, status=status),
+            DeliveryAttempt(
+                event_id=event.id,
+                subscription_id=sub.id,
+                status=DeliveryStatus.failed,
+                created_at=created_at,
+            ),
+        ]
+    )
+    if finished:
+        session.add(DeadLetter(event_id=event.id, subscription_id=sub.id, total_attempts=1))
+    await session.flush()
+    return event
+
+
+async def _subscription(session: AsyncSession) -> WebhookSubscription:
+    sub = WebhookSubscription(
+        url="https://example.com/hook",
+        secret="a-long-enough-secret-key",
+        events=["request_submitted"],
+    )
+    session.add(sub)
+    await session.flush()
+    return sub
+
+
+@pytest.mark.asyncio
+async def test_create_partitions_premakes_months(db_session: AsyncSession):
+    with patch.object(settings, "partition_premake_months", 2):
+        created = await create_partitions(db_session, now=_at(2030, 11, 15))
+        assert await create_partitions(db_session, now=_at(2030, 11, 15)) == []
+
+    assert sorted(created) == [
+        f"{table}_p{month}"
+        for table in ("delivery_attempts", "outbox_events")
+        for month in ("2030_11", "2030_12", "2031_01")
+    ]
+
+    sub = await _subscription(db_session)
+    event = await _add_event(db_session, sub, _at(2030, 12, 3), finished=True)
+    partition = await db_session.scalar(
+        text("SELECT tableoid::regclass::text FROM outbox_events WHERE id = :id"),
+        {"id": event.id},
+    )
+    assert partition == "outbox_events_p2030_12"
+
+
+@pytest.mark.asyncio
+async def test_prune_drops_expired_months_with_their_jobs(db_session: AsyncSession):
+    await create_partitions(db_session, now=_at(2030, 1))
+    sub = await _subscription(db_session)
+    done = await _add_event(db_session, sub, _at(2030, 1, 10), finished=True)
+    unfinished = await _add_event(db_session, sub, _at(2030, 2, 10), finished=False)
+
+    with patch.object(settings, "retention_days", 30):
+        pruned = await prune_partitions(db_session, now=_at(2030, 6, 15))
+        assert await prune_finished_jobs(db_session, now=_at(2030, 6, 15)) == 2
+
+    assert "outbox_events_p2030_01" in pruned
+    assert "outbox_events_p2030_02" not in pruned
+    assert "delivery_attempts_p2030_02" in pruned
+    assert "outbox_events_p2030_02" in await list_partitions(db_session, "outbox_events")
+    assert await list_partitions(db_session, "delivery_attempts") == {}
+
+    db_session.expunge_all()
+    assert await db_session.get(OutboxEvent, done.id) is None
+    assert await db_session.get(OutboxEvent, unfinished.id) is not None
+    jobs = (await db_session.execute(select(DeliveryJob.event_id))).scalars().all()
+    assert jobs == [unfinished.id]
+    assert await db_session.scalar(select(func.count()).select_from(DeadLetter)) == 0
+
+
+@pytest.mark.asyncio
+async def test_finished_jobs_expire_in_batches(db_session: AsyncSession):
+    sub = await _subscription(db_session)
+    events = [await _add_event(db_session, sub, _at(2030, 1, day), True) for day in (1, 2, 3)]
+    pending = await _add_event(db_session, sub, _at(2030, 1, 4), finished=False)
+    await db_session.execute(
+        update(DeliveryJob)
+        .where(DeliveryJob.event_id != pending.id)
+        .values(status=DeliveryStatus.delivered, updated_at=_at(2030, 1, 5))
+    )
+    # A dead letter still within retention keeps its job, for replays.
+    await db_session.execute(
+        update(DeadLetter)
+        .where(DeadLetter.event_id != events[0].id)
+        .values(created_at=_at(2030, 1, 5))
+    )
+    await db_session.execute(
+        update(DeadLetter)
+        .where(DeadLetter.event_id == events[0].id)
+        .values(created_at=_at(2030, 3, 1))
+    )
+
+    with (
+        patch.object(settings, "retention_days", 30),
+        patch.object(settings, "retention_delete_batch_size", 1),
+    ):
+        assert await prune_finished_jobs(db_session, now=_at(2030, 3, 15)) == 4
+
+    jobs = (await db_session.execute(select(DeliveryJob.event_id))).scalars().all()
+    assert sorted(jobs) == sorted([events[0].id, pending.id])
+    dead_letters = (await db_session.execute(select(DeadLetter.event_id))).scalars().all()
+    assert dead_letters == [events[0].id]
+
+
+@pytest.mark.asyncio
+async def test_archive_mode_detaches_expired_partitions(db_session: AsyncSession):
+    await create_partitions(db_session, now=_at(2030, 1))
+    sub = await _subscription(db_session)
+    await _add_event(db_session, sub, _at(2030, 1, 10), finished=True)
+
+    with (
+        patch.object(settings, "retention_days", 30),
+        patch.object(settings, "retention_archive", True),
+    ):
+        await prune_partitions(db_session, now=_at(2030, 6, 15))
+
+    assert await db_session.scalar(select(func.count()).select_from(OutboxEvent)) == 0
+    archived = await db_session.scalar(text("SELECT count(*) FROM outbox_events_p2030_01"))
+    assert archived == 1
+
+
+@pytest.mark.asyncio
+async def test_retention_is_off_by_default(db_session: AsyncSession):
+    await create_partitions(db_session, now=_at(2030, 1))
+
+    assert settings.retention_days == 0
+    assert await prune_partitions(db_session, now=_at(2040, 1)) == []
+
+
+@pytest.mark.asyncio
+async def test_maintenance_skips_while_another_process_runs_it(db_session: AsyncSession):
+    async with engine.connect() as other:
+        await other.execute(select(func.pg_advisory_lock(MAINTENANCE_LOCK_KEY)))
+        try:
+            assert not await run_partition_maintenance(db_session)
+        finally:
+            await other.execute(select(func.pg_advisory_unlock(MAINTENANCE_LOCK_KEY)))
@@ -0,0 +1,228 @@
+"""Tests for per-subscription rate limiting and throttling receivers."""
+
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from integrations_hub.config import settings
+from integrations_hub.models.tables import (
+    DeliveryAttempt,
+    DeliveryJob,
+    DeliveryStatus,
+    WebhookSubscription,
+)
+from integrations_hub.services.delivery import deliver_webhook, process_outbox
+from integrations_hub.services.outbox import publish_event, publish_events
+from integrations_hub.services.rate_limit import (
+    RateLimiters,
+    TokenBucket,
+    _parse_retry_after,
+    is_throttled,
+    retry_after_seconds,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _subscription(rate: float | None = None, burst: int | None = None) -> WebhookSubscription:
+    return WebhookSubscription(
+        url="https://example.com/hook",
+        secret="a-long-enough-secret-key",
+        events=["request_submitted"],
+        rate_limit_per_second=rate,
+        rate_limit_burst=burst,
+    )
+
+
+def _response(status_code: int, **headers: str) -> httpx.Response:
+    return httpx.Response(status_code, headers=headers, text="")
+
+
+def test_bucket_paces_a_backlog_at_the_configured_rate():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, burst=2, clock=clock)
+
+    delays = [bucket.acquire() for _ in range(6)]
+
+    assert delays == pytest.approx([0, 0, 0.1, 0.2, 0.3, 0.4])
+    clock.now += 0.1
+    assert bucket.acquire() == 0
+
+
+def test_throttling_waits_out_retry_after_and_slows_down():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, clock=clock)
+
+    assert bucket.throttle(5.0) == 5.0
+    assert bucket.effective_rate == 5
+    assert bucket.acquire() == pytest.approx(5.2)
+
+    for _ in range(5):
+        bucket.record_success()
+    assert bucket.effective_rate == 10
+
+
+def test_unlimited_bucket_only_honors_retry_after():
+    clock = FakeClock()
+    bucket = TokenBucket(clock=clock)
+    assert all(bucket.acquire() == 0 for _ in range(100))
+
+    assert bucket.throttle(None) == settings.delivery_backoff_base_seconds
+    clock.now += 1
+    assert bucket.acquire() == settings.delivery_backoff_base_seconds - 1
+    clock.now += settings.delivery_backoff_base_seconds
+    assert bucket.acquire() == 0
+
+
+def test_retry_after_zero_still_backs_off():
+    bucket = TokenBucket(clock=FakeClock())
+
+    for value in ("0", "nan", "inf", "Thu, 01 Jan 1970 00:00:00 GMT"):
+        assert bucket.throttle(_parse_retry_after(value)) >= (
+            settings.delivery_backoff_base_seconds
+        )
+
+
+def test_limiters_follow_subscription_changes():
+    limiters = RateLimiters(FakeClock())
+    sub = _subscription(rate=5)
+    bucket = limiters.for_subscription(sub)
+    assert bucket.burst == 5
+
+    sub.rate_limit_per_second, sub.rate_limit_burst = 1, 3
+    assert limiters.for_subscription(sub) is bucket
+    assert (bucket.rate, bucket.burst) == (1, 3)
+
+
+def test_worker_processes_split_each_rate_limit():
+    limiters = RateLimiters(FakeClock(), share=1 / 4)
+
+    assert limiters.for_subscription(_subscription(rate=8)).rate == 2
+    limited = _subscription(rate=8)
+    limited.rate_limit_burst = 10
+    assert limiters.for_subscription(limited).burst == 2
+    assert limiters.for_subscription(_subscription()).rate is None
+
+
+def test_recognizes_throttling_responses():
+    assert is_throttled(_response(429))
+    assert is_throttled(_response(503, **{"Retry-After": "10"}))
+    assert not is_throttled(_response(503))
+    assert not is_throttled(_response(500, **{"Retry-After": "10"}))
+
+    assert retry_after_seconds(_response(429, **{"Retry-After": "7"})) == 7
+    later = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=60), usegmt=True)
+    assert 55 < retry_after_seconds(_response(429, **{"Retry-After": later})) <= 60
+    assert retry_after_seconds(_response(429, **{"Retry-After": "soon"})) is None
+    assert retry_after_seconds(_response(429, **{"Retry-After": "999999"})) == (
+        settings.rate_limit_max_retry_after_seconds
+    )
+
+
+@pytest.mark.asyncio
+async def test_throttled_delivery_is_deferred_without_spending_an_attempt(
+    db_session: AsyncSession,
+):
+    sub = _subscription()
+    db_session.add(sub)
+    await db_session.flush()
+    event = await publish_event(db_session, "request_submitted", {"title": "Test"})
+    client = AsyncMock(spec=httpx.AsyncClient)
+    client.post.return_value = _response(429, **{"Retry-After": "120"})
+    bucket = TokenBucket(rate=10)
+
+    before = datetime.now(timezone.utc)
+    assert not await deliver_webhook(
+        db_session, event, sub, client, attempt_number=1, limiter=bucket
+    )
+
+    job = await db_session.scalar(
+        select(DeliveryJob).execution_options(populate_existing=True)
+    )
+    assert job.attempt_count == 0
+    assert job.last_error == "HTTP 429"
+    assert job.next_attempt_at >= before + timedelta(seconds=120)
+    assert await db_session.scalar(select(func.count()).select_from(DeliveryAttempt)) == 0
+    assert bucket.effective_rate == 5
+
+
+@pytest.mark.asyncio
+async def test_endless_throttling_is_charged_as_failed_attempts(db_session: AsyncSession):
+    sub = _subscription()
+    db_session.add(sub)
+    await db_session.flush()
+    event = await publish_event(db_session, "request_submitted", {"title": "Test"})
+    client = AsyncMock(spec=httpx.AsyncClient)
+    client.post.return_value = _response(429, **{"Retry-After": "0"})
+
+    with patch.object(settings, "rate_limit_max_throttle_deferrals", 2):
+        for _ in range(3):
+            await deliver_webhook(db_session, event, sub, client, attempt_number=1)
+
+    job = await db_session.scalar(
+        select(DeliveryJob).execution_options(populate_existing=True)
+    )
+    # Two free deferrals, then the third throttle is logged as a failed attempt
+    assert job.attempt_count == 1 and job.throttle_count == 0
+    attempt = await db_session.scalar(select(DeliveryAttempt))
+    assert (attempt.status, attempt.error_message) == (DeliveryStatus.failed, "HTTP 429")
+
+
+@pytest.mark.asyncio
+async def test_worker_sends_at_the_subscription_rate(session_factory):
+    async with session_factory() as session:
+        session.add(_subscription(rate=2, burst=1))
+        await session.commit()
+        await publish_events(session, [("request_submitted", {"n": i}) for i in range(5)])
+    client = AsyncMock(spec=httpx.AsyncClient)
+    client.post.return_value = httpx.Response(200, text="OK")
+
+    with patch.object(settings, "delivery_batch_size", 5):
+        await process_outbox(client, session_factory, "worker-1", limiters=RateLimiters())
+
+    assert client.post.await_count == 1
+    async with session_factory() as session:
+        deferred = (
+            await session.execute(
+                select(DeliveryJob.next_attempt_at)
+                .where(DeliveryJob.attempt_count == 0)
+                .order_by(DeliveryJob.next_attempt_at)
+            )
+        ).scalars().all()
+    assert len(deferred) == 4
+    gaps = [(b - a).total_seconds() for a, b in zip(deferred, deferred[1:])]
+    assert gaps == pytest.approx([0.5] * 3, abs=0.05)
+
+
+@pytest.mark.asyncio
+async def test_subscription_api_accepts_rate_limits(client: AsyncClient):
+    body = {
+        "url": "https://example.com/hook",
+        "secret": "a-long-enough-secret-key",
+        "events": ["request_submitted"],
+        "rate_limit_per_second": 2.5,
+        "rate_limit_burst": 5,
+    }
+    resp = await client.post("/api/v1/subscriptions", json=body)
+    assert resp.status_code == 201
+    assert resp.json()["rate_limit_per_second"] == 2.5
+
+    resp = await client.put(
+        f"/api/v1/subscriptions/{resp.json()['id']}", json={"rate_limit_per_second": None}
+    )
+    assert resp.json()["rate_limit_per_second"] is None
+
+    resp = await client.post("/api/v1/subscriptions", json={**body, "rate_limit_per_second": 0})
+    assert resp.status_code == 422
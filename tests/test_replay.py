@@ -0,0 +1,215 @@
+"""Tests for bulk dead-letter replays."""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from integrations_hub.models.tables import (
+    DeadLetter,
+    DeliveryJob,
+    DeliveryStatus,
+    OutboxEvent,
+    ReplayStatus,
+    WebhookSubscription,
+)
+from integrations_hub.schemas.events import ReplayCreate
+from integrations_hub.services.delivery import claim_due_deliveries, deliver_webhook
+from integrations_hub.services.outbox import publish_event
+from integrations_hub.services.replay import advance_replays, create_replay
+
+
+def _subscription(name: str, event_type: str = "request_submitted") -> WebhookSubscription:
+    return WebhookSubscription(
+        url=f"https://example.com/{name}",
+        secret="a-long-enough-secret-key",
+        events=[event_type],
+    )
+
+
+def _client(status_code: int) -> httpx.AsyncClient:
+    client = AsyncMock(spec=httpx.AsyncClient)
+    client.post.return_value = httpx.Response(status_code, text="")
+    return client
+
+
+async def _dead_letter(session: AsyncSession, sub: WebhookSubscription, status_code: int = 500):
+    event = await publish_event(session, sub.events[0], {"title": "Test"})
+    await deliver_webhook(session, event, sub, _client(status_code), attempt_number=5)
+    return event
+
+
+async def _count(session: AsyncSession, *where) -> int:
+    return await session.scalar(select(func.count()).select_from(DeadLetter).where(*where))
+
+
+@pytest.mark.asyncio
+async def test_replay_requeues_only_matching_dead_letters(db_session: AsyncSession):
+    down = _subscription("down")
+    other = _subscription("other", "request_approved")
+    disabled = _subscription("off", "request_rejected")
+    db_session.add_all([down, other, disabled])
+    await db_session.flush()
+    server_errors = [await _dead_letter(db_session, down) for _ in range(2)]
+    await _dead_letter(db_session, down, status_code=404)
+    await _dead_letter(db_session, other)
+    await _dead_letter(db_session, disabled)
+    disabled.enabled = False
+    await db_session.flush()
+
+    replay = await create_replay(
+        db_session, ReplayCreate(subscription_id=down.id, error_contains="http 500")
+    )
+    assert (replay.status, replay.matched) == (ReplayStatus.running, 2)
+
+    assert await advance_replays(db_session) == 2
+
+    assert await _count(db_session) == 3
+    jobs = (
+        await db_session.execute(select(DeliveryJob).where(DeliveryJob.replay_id == replay.id))
+    ).scalars()
+    assert {(job.event_id, job.status) for job in jobs} == {
+        (event.id, DeliveryStatus.pending) for event in server_errors
+    }
+    reopened = await db_session.scalar(
+        select(func.count()).where(
+            OutboxEvent.id.in_([e.id for e in server_errors]), OutboxEvent.completed_at.is_(None)
+        )
+    )
+    assert reopened == 2
+    # Requeued jobs are due now, and the worker delivers them as usual.
+    due = await claim_due_deliveries(db_session, "worker-1")
+    assert {(event.id, attempt) for event, _, attempt in due} == {
+        (event.id, 6) for event in server_errors
+    }
+
+
+@pytest.mark.asyncio
+async def test_replay_respects_time_range(db_session: AsyncSession):
+    sub = _subscription("down")
+    db_session.add(sub)
+    await db_session.flush()
+    for _ in range(3):
+        await _dead_letter(db_session, sub)
+    now = datetime.now(timezone.utc)
+    await db_session.execute(
+        update(DeadLetter).values(created_at=now - timedelta(days=2)).where(
+            DeadLetter.id.in_(select(DeadLetter.id).limit(1).scalar_subquery())
+        )
+    )
+
+    recent = await create_replay(
+        db_session, ReplayCreate(dead_lettered_after=now - timedelta(days=1))
+    )
+    older = await create_replay(
+        db_session, ReplayCreate(dead_lettered_before=now - timedelta(days=1))
+    )
+
+    assert (recent.matched, older.matched) == (2, 1)
+
+
+@pytest.mark.asyncio
+async def test_replay_is_paced_by_rate_and_concurrency(db_session: AsyncSession):
+    sub = _subscription("down")
+    db_session.add(sub)
+    await db_session.flush()
+    for _ in range(5):
+        await _dead_letter(db_session, sub)
+
+    slow = await create_replay(db_session, ReplayCreate(rate_per_second=1, concurrency=10))
+    assert await advance_replays(db_session) == 1
+    assert await advance_replays(db_session) == 0
+    slow.status = ReplayStatus.cancelled
+
+    replay = await create_replay(db_session, ReplayCreate(rate_per_second=1000, concurrency=2))
+    assert replay.matched == 4
+    assert await advance_replays(db_session) == 2
+    # Nothing more goes out until the requeued jobs settle.
+    assert await advance_replays(db_session) == 0
+    await db_session.execute(
+        update(DeliveryJob)
+        .where(DeliveryJob.replay_id == replay.id)
+        .values(status=DeliveryStatus.delivered)
+    )
+    assert await advance_replays(db_session) == 2
+    await db_session.execute(
+        update(DeliveryJob)
+        .where(DeliveryJob.replay_id == replay.id)
+        .values(status=DeliveryStatus.delivered)
+    )
+
+    assert await advance_replays(db_session) == 0
+    await db_session.refresh(replay)
+    assert (replay.status, replay.requeued) == (ReplayStatus.completed, 4)
+    assert replay.finished_at is not None
+
+
+@pytest.mark.asyncio
+async def test_stalled_replay_does_not_burst_to_catch_up(db_session: AsyncSession):
+    sub = _subscription("down")
+    db_session.add(sub)
+    await db_session.flush()
+    for _ in range(5):
+        await _dead_letter(db_session, sub)
+
+    # As if the worker had been down for an hour since the replay started.
+    await db_session.execute(
+        update(DeadLetter).values(created_at=DeadLetter.created_at - timedelta(hours=2))
+    )
+    replay = await create_replay(db_session, ReplayCreate(rate_per_second=1, concurrency=10))
+    replay.created_at -= timedelta(hours=1)
+    await db_session.flush()
+
+    assert await advance_replays(db_session) == 1
+    assert await advance_replays(db_session) == 1
+
+
+@pytest.mark.asyncio
+async def test_replay_api_reports_progress_and_cancels(
+    client: AsyncClient, db_session: AsyncSession
+):
+    sub = _subscription("down")
+    db_session.add(sub)
+    await db_session.flush()
+    for _ in range(3):
+        await _dead_letter(db_session, sub)
+
+    resp = await client.post(
+        "/api/v1/admin/dead-letters/replay", json={"rate_per_second": 1000, "concurrency": 2}
+    )
+    assert resp.status_code == 202
+    replay = resp.json()
+    assert (replay["status"], replay["matched"], replay["requeued"]) == ("running", 3, 0)
+
+    await advance_replays(db_session)
+    resp = await client.get(f"/api/v1/admin/replays/{replay['id']}")
+    assert (resp.json()["requeued"], resp.json()["pending"]) == (2, 2)
+    assert [r["id"] for r in (await client.get("/api/v1/admin/replays")).json()] == [
+        replay["id"]
+    ]
+
+    resp = await client.post(f"/api/v1/admin/replays/{replay['id']}/cancel")
+    assert resp.json()["status"] == "cancelled"
+    await db_session.execute(update(DeliveryJob).values(status=DeliveryStatus.delivered))
+    assert await advance_replays(db_session) == 0
+    assert await _count(db_session) == 1
+
+
+@pytest.mark.asyncio
+async def test_replay_api_validates_input(client: AsyncClient):
+    resp = await client.post(
+        "/api/v1/admin/dead-letters/replay",
+        json={
+            "dead_lettered_after": "2024-05-02T00:00:00Z",
+            "dead_lettered_before": "2024-05-01T00:00:00Z",
+        },
+    )
+    assert resp.status_code == 422
+    resp = await client.post("/api/v1/admin/dead-letters/replay", json={"concurrency": 0})
+    assert resp.status_code == 422
+    resp = await client.get("/api/v1/admin/replays/00000000-0000-0000-0000-000000000000")
+    assert resp.status_code == 404
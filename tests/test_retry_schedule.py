@@ -0,0 +1,134 @@
+"""Tests for the delivery worker's in-memory retry schedule."""
+
+import random
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from integrations_hub.models.tables import DeliveryJob, DeliveryStatus, WebhookSubscription
+from integrations_hub.services.delivery import get_due_times, process_outbox
+from integrations_hub.services.outbox import publish_event
+from integrations_hub.services.retry_schedule import RetrySchedule
+
+START = datetime(2030, 1, 1, tzinfo=timezone.utc)
+
+
+class VirtualClock:
+    def __init__(self, now: datetime = START):
+        self.now = now
+
+    def __call__(self) -> datetime:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += timedelta(seconds=seconds)
+
+
+def _subscription(name: str, enabled: bool = True) -> WebhookSubscription:
+    return WebhookSubscription(
+        url=f"https://example.com/{name}",
+        secret="a-long-enough-secret-key",
+        events=["request_submitted"],
+        enabled=enabled,
+    )
+
+
+def test_fires_100k_retries_exactly_on_time():
+    clock = VirtualClock()
+    retries = RetrySchedule(horizon_seconds=3600, clock=clock)
+    rng = random.Random(14)
+    due_times = [
+        START + timedelta(microseconds=rng.randrange(3600 * 10**6)) for _ in range(100_000)
+    ]
+    for due_at in due_times:
+        retries.add(due_at)
+
+    wakeups = 0
+    lateness = []
+    while (wait := retries.seconds_until_next()) is not None:
+        # Sleep exactly as long as the worker would, then fire what is due.
+        clock.advance(wait)
+        wakeups += 1
+        lateness.extend((clock.now - due_at).total_seconds() for due_at in retries.pop_due())
+
+    assert len(lateness) == 100_000
+    assert max(lateness) == 0
+    assert wakeups == len(set(due_times))
+
+
+def test_new_retry_moves_the_wakeup_forward():
+    clock = VirtualClock()
+    retries = RetrySchedule(clock=clock)
+    retries.add(START + timedelta(seconds=10))
+    assert retries.seconds_until_next() == 10
+
+    retries.add(START + timedelta(seconds=3))
+    assert retries.seconds_until_next() == 3
+
+    clock.advance(5)
+    assert retries.seconds_until_next() == 0
+    assert retries.pop_due() == [START + timedelta(seconds=3)]
+    assert retries.seconds_until_next() == 5
+
+
+def test_resyncs_once_per_horizon():
+    clock = VirtualClock()
+    retries = RetrySchedule(horizon_seconds=30, clock=clock)
+    assert retries.stale
+
+    retries.add(START + timedelta(seconds=90))
+    retries.load([START + timedelta(seconds=20), START + timedelta(seconds=5)])
+    assert not retries.stale
+    assert len(retries) == 2
+    assert retries.seconds_until_next() == 5
+
+    clock.advance(30)
+    assert retries.stale
+
+
+@pytest.mark.asyncio
+async def test_due_times_cover_pending_jobs_within_horizon(db_session: AsyncSession):
+    subs = {name: _subscription(name) for name in ("soon", "later", "overdue", "done")}
+    subs["off"] = _subscription("off", enabled=False)
+    db_session.add_all(subs.values())
+    event = await publish_event(db_session, "request_submitted", {"title": "Test"})
+    now = event.created_at
+    offsets = {"soon": 5, "later": 300, "overdue": -5, "done": 5, "off": 5}
+    for name, seconds in offsets.items():
+        await db_session.execute(
+            DeliveryJob.__table__.update()
+            .where(DeliveryJob.subscription_id == subs[name].id)
+            .values(
+                next_attempt_at=now + timedelta(seconds=seconds),
+                status=DeliveryStatus.delivered if name == "done" else DeliveryStatus.pending,
+            )
+        )
+
+    assert await get_due_times(db_session, timedelta(seconds=30)) == [
+        now + timedelta(seconds=5)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_failed_deliveries_schedule_their_retries(session_factory):
+    async with session_factory() as session:
+        session.add_all([_subscription("a"), _subscription("b")])
+        await session.commit()
+        await publish_event(session, "request_submitted", {"title": "Test"})
+    client = AsyncMock(spec=httpx.AsyncClient)
+    client.post.return_value = httpx.Response(503, text="busy")
+    clock = VirtualClock(datetime.now(timezone.utc))
+    retries = RetrySchedule(clock=clock)
+
+    assert await process_outbox(client, session_factory, "worker-1", retries=retries) == 2
+
+    # The first retry backs off by 2s from when the attempt failed.
+    assert 2 <= retries.seconds_until_next() < 3
+    clock.advance(3)
+    async with session_factory() as session:
+        scheduled = (await session.execute(select(DeliveryJob.next_attempt_at))).scalars()
+        assert retries.pop_due() == sorted(scheduled)
@@ -0,0 +1,179 @@
+"""Integration tests for the delivery worker's in-memory routing table."""
+
+import time
+from unittest.mock import AsyncMock
+
+import httpx
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from integrations_hub.models.tables import WebhookSubscription
+from integrations_hub.schemas.subscriptions import SubscriptionCreate, SubscriptionUpdate
+from integrations_hub.services.delivery import process_outbox
+from integrations_hub.services.outbox import publish_event
+from integrations_hub.services.routing import RoutingTable
+from integrations_hub.services.subscriptions import (
+    SUBSCRIPTIONS_CHANNEL,
+    create_subscription,
+    delete_subscription,
+    update_subscription,
+)
+from integrations_hub.worker.listener import NotificationListener, listener_dsn
+from tests.conftest import TEST_DATABASE_URL
+
+
+def _subscription(name: str, *events: str, enabled: bool = True) -> WebhookSubscription:
+    return WebhookSubscription(
+        url=f"https://example.com/{name}",
+        secret="a-long-enough-secret-key",
+        events=list(events) or ["request_submitted"],
+        enabled=enabled,
+    )
+
+
+@pytest.mark.asyncio
+async def test_resolve_is_free_once_loaded(db_session: AsyncSession, query_counter):
+    subs = [_subscription(f"s{i}") for i in range(3)]
+    db_session.add_all(subs)
+    await db_session.flush()
+    routes = RoutingTable()
+
+    await routes.resolve(db_session, [subs[0].id])
+    query_counter.clear()
+    for _ in range(10):
+        resolved = await routes.resolve(db_session, [sub.id for sub in subs])
+
+    assert set(resolved) == {sub.id for sub in subs}
+    assert query_counter == []
+
+
+@pytest.mark.asyncio
+async def test_notified_change_reloads_only_that_subscription(
+    db_session: AsyncSession, query_counter
+):
+    subs = [_subscription(f"s{i}") for i in range(3)]
+    db_session.add_all(subs)
+    await db_session.flush()
+    routes = RoutingTable()
+    await routes.refresh(db_session)
+
+    subs[0].enabled = False
+    await db_session.flush()
+    routes.invalidate(str(subs[0].id))
+    query_counter.clear()
+    resolved = await routes.resolve(db_session, [sub.id for sub in subs])
+
+    assert set(resolved) == {subs[1].id, subs[2].id}
+    [reload] = query_counter
+    assert "webhook_subscriptions.id IN" in reload
+    assert not routes.stale
+
+    # A payload that isn't an id falls back to a full reload.
+    routes.invalidate("garbled")
+    assert routes.stale
+
+
+@pytest.mark.asyncio
+async def test_unknown_subscription_triggers_one_reload(db_session: AsyncSession, query_counter):
+    first = _subscription("first")
+    db_session.add(first)
+    await db_session.flush()
+    routes = RoutingTable()
+    await routes.refresh(db_session)
+
+    second = _subscription("second")
+    db_session.add(second)
+    await db_session.flush()
+    query_counter.clear()
+
+    resolved = await routes.resolve(db_session, [first.id, second.id])
+
+    assert set(resolved) == {first.id, second.id}
+    assert len(query_counter) == 1
+
+
+@pytest.mark.asyncio
+async def test_invalidate_and_staleness_force_a_reload(db_session: AsyncSession):
+    sub = _subscription("toggled")
+    db_session.add(sub)
+    await db_session.flush()
+    routes = RoutingTable()
+    await routes.refresh(db_session)
+
+    sub.enabled = False
+    await db_session.flush()
+    assert sub.id in await routes.resolve(db_session, [sub.id])
+
+    routes.invalidate()
+    assert await routes.resolve(db_session, [sub.id]) == {}
+
+    sub.enabled = True
+    await db_session.flush()
+    expiring = RoutingTable(max_staleness_seconds=0)
+    await expiring.refresh(db_session)
+    assert expiring.stale
+    assert sub.id in await expiring.resolve(db_session, [sub.id])
+
+
+@pytest.mark.asyncio
+async def test_subscription_changes_invalidate_listening_worker(session_factory):
+    routes = RoutingTable()
+    listener = NotificationListener(
+        listener_dsn(TEST_DATABASE_URL),
+        [SUBSCRIPTIONS_CHANNEL],
+        handlers={SUBSCRIPTIONS_CHANNEL: routes.invalidate},
+    )
+    assert await listener.connect()
+    assert await listener.wait()
+    try:
+        async with session_factory() as session:
+            await routes.refresh(session)
+            sub = await create_subscription(
+                session,
+                SubscriptionCreate(
+                    url="https://example.com/hook",
+                    secret="a-long-enough-secret-key",
+                    events=["request_submitted"],
+                ),
+            )
+
+
+            def toggle(enabled: bool):
+                return lambda: update_subscription(
+                    session, sub.id, SubscriptionUpdate(enabled=enabled)
+                )
+
+            for change, enabled in (
+                (toggle(False), False),
+                (toggle(True), True),
+                (lambda: delete_subscription(session, sub.id), False),
+            ):
+                await routes.refresh(session)
+                started = time.perf_counter()
+                await change()
+                assert await listener.wait(timeout=1.0)
+                assert time.perf_counter() - started < 1.0
+                assert (sub.id in await routes.resolve(session, [sub.id])) is enabled
+                assert not routes.stale
+    finally:
+        await listener.close()
+
+
+@pytest.mark.asyncio
+async def test_process_outbox_serves_subscriptions_from_routes(session_factory, query_counter):
+    async with session_factory() as session:
+        session.add(_subscription("hook"))
+        await session.commit()
+        for i in range(3):
+            await publish_event(session, "request_submitted", {"n": i})
+    client = AsyncMock(spec=httpx.AsyncClient)
+    client.post.return_value = httpx.Response(200, text="OK")
+    routes = RoutingTable()
+    async with session_factory() as session:
+        await routes.refresh(session)
+
+    query_counter.clear()
+    assert await process_outbox(client, session_factory, "worker-1", routes) == 3
+
+    assert client.post.await_count == 3
+    assert not [sql for sql in query_counter if sql.startswith("SELECT webhook_subscriptions.")]
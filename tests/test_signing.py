@@ -1,4 +1,18 @@
-from integrations_hub.services.signing import sign_payload, verify_signature
+import hashlib
+import hmac
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient
+
+from integrations_hub.models.tables import WebhookSubscription
+from integrations_hub.services.signing import (
+    Signer,
+    sign_payload,
+    signer_for,
+    verify_signature,
+)
 
 
 def test_sign_and_verify():
@@ -44,3 +58,65 @@ def test_different_timestamps_produce_different_signatures():
     sig2, _ = sign_payload(payload, secret, timestamp=1000001)
 
     assert sig1 != sig2
+
+
+def test_signer_signs_with_every_secret():
+    payload = '{"event": "test"}'
+    expected, _ = sign_payload(payload, "new-secret-key-123456", timestamp=1000000)
+    previous, _ = sign_payload(payload, "old-secret-key-123456", timestamp=1000000)
+
+    signer = Signer("new-secret-key-123456", "old-secret-key-123456")
+    header = signer.sign(memoryview(payload.encode()), 1000000)
+    assert header == f"{expected},{previous}"
+    # The keyed state is copied, never consumed, so signing again gives the same
+    assert signer.sign(payload.encode(), 1000000) == header
+    assert verify_signature(payload, "old-secret-key-123456", header, 1000000)
+    assert not verify_signature(payload, "other-secret-key-1234", header, 1000000)
+
+    for secret in ("test-secret-key-1234", "k" * 200):
+        reference = hmac.new(secret.encode(), b"7.{}", hashlib.sha256).hexdigest()
+        assert Signer(secret).sign(b"{}", 7) == sign_payload("{}", secret, 7)[0] == reference
+
+
+def test_signer_for_keeps_the_previous_secret_until_it_expires():
+    now = datetime(2030, 1, 1, tzinfo=timezone.utc)
+    sub = WebhookSubscription(
+        id=uuid.uuid4(),
+        secret="new-secret-key-123456",
+        secret_version=2,
+        previous_secret="old-secret-key-123456",
+        previous_secret_expires_at=now + timedelta(hours=1),
+    )
+
+    rotating = signer_for(sub, now)
+    assert signer_for(sub, now) is rotating
+    assert len(rotating.sign(b"{}", 1).split(",")) == 2
+
+    expired = signer_for(sub, now + timedelta(hours=2))
+    assert expired.sign(b"{}", 1) == sign_payload("{}", "new-secret-key-123456", 1)[0]
+
+
+@pytest.mark.asyncio
+async def test_changing_the_secret_starts_a_rotation(client: AsyncClient):
+    resp = await client.post(
+        "/api/v1/subscriptions",
+        json={
+            "url": "https://example.com/hook",
+            "secret": "a-long-enough-secret-key",
+            "events": ["request_submitted"],
+        },
+    )
+    sub = resp.json()
+    assert sub["secret_version"] == 1 and sub["previous_secret_expires_at"] is None
+
+    resp = await client.put(
+        f"/api/v1/subscriptions/{sub['id']}", json={"secret": "a-brand-new-secret-key"}
+    )
+    assert resp.json()["secret_version"] == 2
+    assert resp.json()["previous_secret_expires_at"] is not None
+
+    # Resubmitting the same secret is not a rotation
+    resp = await client.put(
+        f"/api/v1/subscriptions/{sub['id']}", json={"secret": "a-brand-new-secret-key"}
+    )
+    assert resp.json()["secret_version"] == 2
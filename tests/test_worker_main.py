@@ -0,0 +1,129 @@
+"""Tests for the standalone worker entry point and API-only mode."""
+
+import asyncio
+import importlib
+import os
+import signal
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from integrations_hub import main as api_main
+from integrations_hub.config import settings
+from integrations_hub.main import app
+from integrations_hub.worker import main as worker_main
+
+
+async def _forever(**kwargs):
+    await asyncio.Event().wait()
+
+
+async def _crash(**kwargs):
+    raise RuntimeError("listener unavailable")
+
+
+def _patched_worker(delivery=_forever, maintenance=_forever):
+    return (
+        patch.object(worker_main, "run_delivery_loop", delivery),
+        patch.object(worker_main, "run_maintenance_loop", maintenance),
+        patch.object(worker_main, "run_replay_loop", _forever),
+        patch.object(worker_main, "http_clients", AsyncMock()),
+        patch.object(worker_main, "engine", AsyncMock()),
+    )
+
+
+@pytest.mark.asyncio
+async def test_worker_shuts_down_cleanly_on_sigterm():
+    delivery, maintenance, replay, clients, engine = _patched_worker()
+    with delivery, maintenance, replay, clients as http_clients, engine:
+        asyncio.get_running_loop().call_later(0.05, os.kill, os.getpid(), signal.SIGTERM)
+        await asyncio.wait_for(worker_main.run_worker(), timeout=5)
+
+    http_clients.aclose.assert_awaited_once()
+    assert signal.getsignal(signal.SIGTERM) == signal.SIG_DFL
+
+
+@pytest.mark.asyncio
+async def test_worker_exits_when_a_loop_crashes():
+    delivery, maintenance, replay, clients, engine = _patched_worker(delivery=_crash)
+    with delivery, maintenance, replay, clients as http_clients, engine as db_engine:
+        with pytest.raises(RuntimeError, match="listener unavailable"):
+            await asyncio.wait_for(worker_main.run_worker(), timeout=5)
+
+    http_clients.aclose.assert_awaited_once()
+    db_engine.dispose.assert_awaited_once()
+
+
+@pytest.mark.parametrize(
+    ("argv", "processes"), [([], 1), (["--processes", "3"], 3), (["--processes", "0"], 8)]
+)
+def test_cli_picks_single_or_multi_process_mode(argv, processes):
+    with (
+        patch.object(worker_main, "run_worker", MagicMock()) as run_worker,
+        patch.object(worker_main.asyncio, "run") as run,
+        patch.object(worker_main, "run_processes") as run_processes,
+        patch.object(worker_main.os, "cpu_count", return_value=8),
+        patch.object(worker_main, "start_http_server") as start_http_server,
+    ):
+        worker_main.main(argv)
+
+    if processes == 1:
+        run.assert_called_once_with(run_worker.return_value)
+        run_processes.assert_not_called()
+        start_http_server.assert_called_once_with(settings.worker_metrics_port)
+    else:
+        run_processes.assert_called_once_with(processes)
+        start_http_server.assert_not_called()
+
+
+def test_process_metrics_are_served_from_a_shared_directory():
+    with (
+        patch.dict(os.environ),
+        patch.object(worker_main, "start_http_server") as start_http_server,
+    ):
+        metrics_dir = worker_main._serve_process_metrics()
+        try:
+            assert os.environ["PROMETHEUS_MULTIPROC_DIR"] == metrics_dir
+            assert os.listdir(metrics_dir) == []
+        finally:
+            os.rmdir(metrics_dir)
+
+    [(port,), kwargs] = start_http_server.call_args
+    assert port == settings.worker_metrics_port
+    assert kwargs["registry"].collect()
+
+
+def test_cli_rejects_negative_process_count():
+    with pytest.raises(SystemExit):
+        worker_main.main(["--processes", "-1"])
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("embedded", [True, False])
+async def test_api_only_mode_starts_no_worker(embedded):
+    with (
+        patch.object(settings, "worker_embedded", embedded),
+        patch("integrations_hub.main.ensure_slack_subscription", AsyncMock()),
+        patch("integrations_hub.main.start_worker_tasks", return_value=[]) as start,
+        patch("integrations_hub.main.http_clients", AsyncMock()),
+    ):
+        async with app.router.lifespan_context(app):
+            pass
+
+    assert start.called is embedded
+
+
+def test_api_only_mode_serves_no_circuit_endpoints():
+    def circuit_routes() -> set[str]:
+        return {path for path in api_main.app.openapi()["paths"] if "/circuits" in path}
+
+    try:
+        with patch.object(settings, "worker_embedded", False):
+            importlib.reload(api_main)
+            assert circuit_routes() == set()
+    finally:
+        importlib.reload(api_main)
+    assert circuit_routes() == {
+        "/api/v1/admin/circuits",
+        "/api/v1/admin/circuits/{host}/reset",
+    }